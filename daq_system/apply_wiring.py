@@ -0,0 +1,60 @@
+"""
+Push wiring spreadsheet edits to the running system.
+
+Diffs each device's workbooks against the wiring last applied to it and
+reconfigures only the tasks whose rows changed:
+
+    python -m daq_system.apply_wiring --dry-run
+    python -m daq_system.apply_wiring --device Dev5
+"""
+
+import argparse
+import logging
+
+from daq_system.config.settings import DAQConfig
+from daq_system.core.daq_system import DAQSystem
+from daq_system.utils.exceptions import DAQError
+from daq_system.utils.logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply only the wiring rows that changed since the last apply"
+    )
+    parser.add_argument(
+        "--device",
+        action="append",
+        help="Device location to apply (repeatable). Defaults to every device.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the plan without applying it"
+    )
+    args = parser.parse_args()
+
+    config = DAQConfig()
+    daq_system = DAQSystem(config)
+
+    device_paths = daq_system.discovery.wiring_paths()
+    if args.device:
+        missing = [name for name in args.device if name not in device_paths]
+        if missing:
+            raise DAQError(f"No device with wiring files: {', '.join(missing)}")
+        device_paths = {name: device_paths[name] for name in args.device}
+
+    failed = []
+    for device_name, paths in device_paths.items():
+        try:
+            daq_system.apply_wiring_changes(device_name, paths, dry_run=args.dry_run)
+        except Exception as e:
+            logger.error(f"Applying wiring to {device_name} failed: {e}", exc_info=True)
+            failed.append(device_name)
+
+    if failed:
+        raise DAQError(f"Wiring apply failed for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,13 @@ import pandas as pd
 from pathlib import Path
 import logging
 
+try:
+    from daq_system.utils.workbook_cache import read_sheet
+except ImportError:
+    # Running outside the project environment: read the workbook directly
+    def read_sheet(path, sheet_name):
+        return pd.read_excel(path, sheet_name=sheet_name)
+
 # Common Synnax client
 sy_client = sy.Synnax(
     host= "192.168.2.59",
@@ -15,11 +22,11 @@ sy_client = sy.Synnax(
 def get_synnax_client():
     return sy_client
 
-telem_config_df = pd.read_excel(Path(__file__).parent / 'CMS_Avionics_Channels.xlsx', sheet_name='telem_channels')
+telem_config_df = read_sheet(Path(__file__).parent / 'CMS_Avionics_Channels.xlsx', 'telem_channels')
 def get_telem_configs():
     return telem_config_df
 
-command_config_df = pd.read_excel(Path(__file__).parent / 'CMS_Avionics_Channels.xlsx', sheet_name='command_channels')
+command_config_df = read_sheet(Path(__file__).parent / 'CMS_Avionics_Channels.xlsx', 'command_channels')
 def get_command_configs():
     return command_config_df
 
@@ -2,6 +2,22 @@
 Configuration module for DAQ system settings.
 """
 
-from .settings import DAQConfig, DeviceWiringPaths, DEFAULT_DEVICE_PATHS
+from .settings import (
+    DAQConfig,
+    DeviceWiringPaths,
+    DeviceRateConfig,
+    ChannelGroupRate,
+    SimulationConfig,
+    WaveformConfig,
+    DEFAULT_DEVICE_PATHS,
+)
 
-__all__ = ["DAQConfig", "DeviceWiringPaths", "DEFAULT_DEVICE_PATHS"]
+__all__ = [
+    "DAQConfig",
+    "DeviceWiringPaths",
+    "DeviceRateConfig",
+    "ChannelGroupRate",
+    "SimulationConfig",
+    "WaveformConfig",
+    "DEFAULT_DEVICE_PATHS",
+]
@@ -1,6 +1,59 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ChannelGroupRate:
+    """Sample rate needed by the channels whose names match a pattern"""
+
+    pattern: str  # fnmatch pattern, e.g. "PT_CHAMBER*" or "TC_*"
+    sample_rate: int  # Hz
+
+
+@dataclass
+class DeviceRateConfig:
+    """Rate overrides for one device. Unset values fall back to DAQConfig."""
+
+    sample_rate: Optional[int] = None  # Hz, AI and DI
+    stream_rate: Optional[int] = None  # Hz, picked by the rate planner if unset
+    state_rate: Optional[int] = None  # Hz, DO state feedback
+    groups: List[ChannelGroupRate] = field(default_factory=list)
+
+
+@dataclass
+class WaveformConfig:
+    """Synthetic signal generated for simulated input channels"""
+
+    kind: str = "sine"  # "sine", "square", "ramp", "noise" or "constant"
+    amplitude: float = 1.0
+    offset: float = 0.0
+    frequency: float = 0.5  # Hz, for sine, square and ramp
+    noise: float = 0.0  # Standard deviation of added Gaussian noise
+
+
+@dataclass
+class SimulationConfig:
+    """Behaviour of the in-process simulated Synnax backend"""
+
+    devices: List[str] = field(default_factory=lambda: ["Dev5", "Dev6"])
+    device_model: str = "USB-6343"
+    # Waveforms keyed by fnmatch pattern on the channel name. The first match
+    # wins; unmatched channels use analog_waveform or digital_waveform.
+    waveforms: Dict[str, WaveformConfig] = field(default_factory=dict)
+    analog_waveform: WaveformConfig = field(
+        default_factory=lambda: WaveformConfig(amplitude=10.0, offset=100.0, noise=0.5)
+    )
+    digital_waveform: WaveformConfig = field(
+        default_factory=lambda: WaveformConfig(kind="square", frequency=0.1)
+    )
+    rpc_latency: float = 0.0  # seconds added to every client call
+    configure_delay: float = 0.0  # seconds for the "driver" to accept a task
+    state_latency: float = 0.0  # seconds from a DO command to its state update
+    # Publish a DO state as soon as it changes. When False, states only go out
+    # on the task's state-rate tick, which is how the NI driver behaves.
+    emit_state_on_change: bool = False
+    seed: Optional[int] = None
 
 
 @dataclass
@@ -9,10 +62,46 @@ class DAQConfig:
 
     sample_rate: int = 100  # Hz
     stream_rate: int = 10  # Hz
+    max_stream_latency: float = 0.1  # seconds between streamed frames
+    # Per-device rate overrides keyed by device location, e.g.
+    # {"Dev5": DeviceRateConfig(groups=[ChannelGroupRate("PT_CHAMBER*", 2000)])}
+    device_rates: Dict[str, DeviceRateConfig] = field(default_factory=dict)
+    backend: str = "synnax"  # "synnax" or "simulated" (in-process, no hardware)
+    simulation: SimulationConfig = field(default_factory=SimulationConfig)
     host: str = "10.165.89.240"
     port: int = 2701
     username: str = "Bill"
     password: str = "Bill"
+    device_model: str = "USB-6343"  # Model of the cards to discover on the rack
+    discovery_ttl: float = 30  # seconds to reuse the discovered device list
+    # Wiring workbooks, matched to devices by location or serial in {device}
+    wiring_dir: str = "daq_system/inputs"
+    data_wiring_pattern: str = "CMS_Master_Data_Wiring_{device}.xlsx"
+    control_wiring_pattern: str = "CMS_Master_Control_Wiring_{device}.xlsx"
+    parallel_setup: bool = True  # Bring up each device on its own worker
+    reconcile_tasks: bool = True  # Only touch server tasks whose config changed
+    configure_timeout: float = 10  # seconds per configure attempt
+    configure_retries: int = 3
+    configure_retry_delay: float = 2  # seconds, doubled after each timeout
+    safe_state_timeout: float = 5  # seconds for DO states to confirm DEENERGIZED
+    # Low-latency DO mode: publish valve states at low_latency_state_rate rather
+    # than the sample rate, so confirmations follow the hardware closely.
+    # A device's own DeviceRateConfig.state_rate still takes precedence.
+    low_latency_do: bool = False
+    low_latency_state_rate: int = 1000  # Hz
+    valve_latency_window: int = 100  # command-to-state samples kept per valve
+    # Client-side least-squares slopes, published as <channel>_SLOPE
+    slope_sources: List[str] = field(default_factory=lambda: ["PT_*"])  # fnmatch
+    slope_window: float = 5.0  # seconds
+    # Range export: index groups are read concurrently, each retried on failure
+    export_workers: int = 4
+    export_retries: int = 3
+    export_retry_delay: float = 1  # seconds, doubled after each failed attempt
+    # Resumable export: each group is written in shards of this many seconds of
+    # range and a rerun continues from the last finished shard. 0 disables.
+    export_shard_span: float = 0
+    profile_startup: bool = True  # Time each bring-up phase and count its RPCs
+    startup_trace_dir: Optional[str] = "logs"  # JSON trace output, None to skip
 
 
 @dataclass
@@ -23,7 +112,8 @@ class DeviceWiringPaths:
     control_wiring: Path
 
 
-# Default device configurations
+# Default device configurations. main() discovers devices and wiring files
+# instead; see core/discovery.py.
 DEFAULT_DEVICE_PATHS: Dict[str, DeviceWiringPaths] = {
     "Dev5": DeviceWiringPaths(
         data_wiring=Path("daq_system/inputs/CMS_Master_Data_Wiring_Dev5.xlsx"),
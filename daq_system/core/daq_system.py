@@ -1,18 +1,38 @@
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, List, Union
 import logging
 import synnax as sy
 from synnax import ni
-import pandas as pd
-import json
 import time
 
-from ..config.settings import DAQConfig
-from ..utils.exceptions import ConnectionError, TaskError
+from ..config.settings import DAQConfig, DeviceWiringPaths
+from ..utils.exceptions import ConfigurationError, ConnectionError, TaskError
+from ..utils.synnax_client import connect
+from ..utils.workbook_cache import CACHE_DIR_NAME
 from ..processing.channel_factory import ChannelFactory
+from ..processing.channel_registry import ChannelRegistry
 from ..processing.analog import process_analog_input
 from ..processing.digital import process_digital_input, process_digital_output
+from ..processing.wiring import DeviceWiring, WiringSource, load_device_wiring
+from ..processing.wiring_diff import (
+    TABLES as WIRING_TABLES,
+    WiringDiff,
+    diff_wiring,
+    load_snapshot,
+    save_snapshot,
+)
+from . import task_reconcile
+from .discovery import DeviceDiscovery, device_properties
+from .profiler import StartupProfiler
+from .rate_planner import DeviceRatePlan, TaskRatePlan, plan_device_rates
 from ..utils.logging_config import setup_logging
 
+# Any of the NI tasks created for a device
+DeviceTask = Union[ni.AnalogReadTask, ni.DigitalWriteTask, ni.DigitalReadTask]
+
 # DEFINE STATES
 ENERGIZED = 0
 DEENERGIZED = 1
@@ -22,23 +42,58 @@ setup_logging()
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DeviceSetupResult:
+    """Outcome of bringing up a single device"""
+
+    device_name: str
+    tasks: Optional[
+        Tuple[ni.AnalogReadTask, ni.DigitalWriteTask, ni.DigitalReadTask]
+    ] = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0  # seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class TaskConfigureResult:
+    """Outcome of configuring a single task"""
+
+    task_type: str
+    configured: bool  # False if the task was skipped or failed
+    attempts: int = 0
+    error: Optional[Exception] = None
+    elapsed: float = 0.0  # seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class DAQSystem:
     """Main DAQ system class handling device management and task creation"""
 
     def __init__(self, config: DAQConfig):
         self.config = config
         self.client = self._connect_to_synnax()
-        self.channel_factory = ChannelFactory(self.client)
+        # Per-phase wall time and RPC counts for the bring-up
+        self.profiler = StartupProfiler(enabled=config.profile_startup)
+        self.profiler.instrument(self.client)
+        # Devices on the rack, fetched in one query and cached
+        self.discovery = DeviceDiscovery(self.client, config)
+        # Channels resolved during this run, shared by the AI, DI and DO paths
+        self.channel_registry = ChannelRegistry()
+        self.channel_factory = ChannelFactory(self.client, self.channel_registry)
 
     def _connect_to_synnax(self) -> sy.Synnax:
-        """Establish connection to Synnax server"""
+        """Establish connection to Synnax server (or the simulated backend)"""
         try:
-            return sy.Synnax(
-                host=self.config.host,
-                port=self.config.port,
-                username=self.config.username,
-                password=self.config.password,
-            )
+            return connect(self.config)
+        except ConfigurationError:
+            raise
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Synnax: {e}")
 
@@ -57,7 +112,7 @@ class DAQSystem:
                 )
                 # Try to verify driver status by attempting to retrieve devices
                 try:
-                    self.client.devices.retrieve(location="Dev5")
+                    self.discovery.devices(refresh=True)
                     return True
                 except Exception as e:
                     logger.error(f"Failed to verify driver status: {e}")
@@ -88,12 +143,8 @@ class DAQSystem:
                     "Synnax driver is not running. Please ensure the driver is started and accessible."
                 )
 
-            # Try to retrieve both devices
-            device_5 = self.client.hardware.devices.retrieve(location="Dev5")
-            device_6 = self.client.hardware.devices.retrieve(location="Dev6")
-
-            devices = [device_5, device_6]
-            found_devices = [d for d in devices if d is not None]
+            # Retrieve every device on the rack in one query
+            found_devices = self.discovery.devices(refresh=True)
 
             if not found_devices:
                 raise ConnectionError(
@@ -112,21 +163,19 @@ class DAQSystem:
                 logger.info(f"Rack: {device.rack}")
 
                 # Log device properties
-                if hasattr(device, "properties"):
-                    try:
-                        props = json.loads(device.properties)
-                        logger.info("\nDevice Properties:")
-                        for key, value in props.items():
-                            logger.info(f"  {key}: {value}")
-
-                            # Additional validation for simulation mode
-                            if key == "is_simulated" and value:
-                                logger.warning("Device is running in simulation mode!")
-
-                    except json.JSONDecodeError:
-                        logger.warning(
-                            f"Could not parse device properties: {device.properties}"
-                        )
+                props = device_properties(device)
+                if props:
+                    logger.info("\nDevice Properties:")
+                    for key, value in props.items():
+                        logger.info(f"  {key}: {value}")
+
+                        # Additional validation for simulation mode
+                        if key == "is_simulated" and value:
+                            logger.warning("Device is running in simulation mode!")
+                elif getattr(device, "properties", None):
+                    logger.warning(
+                        f"Could not parse device properties: {device.properties}"
+                    )
 
             logger.info("-" * 50)
             logger.info("Device validation completed successfully.")
@@ -140,11 +189,7 @@ class DAQSystem:
         Returns a dictionary containing device details.
         """
         try:
-            device_5 = self.client.hardware.devices.retrieve(location="Dev5")
-            device_6 = self.client.hardware.devices.retrieve(location="Dev6")
-
-            devices = [device_5, device_6]
-            found_devices = [d for d in devices if d is not None]
+            found_devices = self.discovery.devices()
 
             if not found_devices:
                 return {"error": "No devices found"}
@@ -160,11 +205,10 @@ class DAQSystem:
                     "rack": device.rack,
                 }
 
-                if hasattr(device, "properties"):
-                    try:
-                        device_info["properties"] = json.loads(device.properties)
-                    except json.JSONDecodeError:
-                        device_info["properties"] = device.properties
+                if getattr(device, "properties", None):
+                    device_info["properties"] = (
+                        device_properties(device) or device.properties
+                    )
 
                 info[device.location] = device_info
 
@@ -188,58 +232,71 @@ class DAQSystem:
         except Exception as e:
             logger.debug(f"No existing task found for {task_name}: {e}")
 
+    def _default_rate_plan(self, device_name: str) -> DeviceRatePlan:
+        """Rate plan using only the global config rates"""
+        rates = TaskRatePlan(self.config.sample_rate, self.config.stream_rate)
+        return DeviceRatePlan(device_name, rates, rates, self.config.sample_rate)
+
     def _create_analog_read_task(
-        self, card_name: str, device_key: str
+        self, card_name: str, device_key: str, rate_plan: DeviceRatePlan
     ) -> ni.AnalogReadTask:
         """Create an analog read task"""
         return ni.AnalogReadTask(
             name=f"{card_name} AI",
             device=device_key,
-            sample_rate=sy.Rate.HZ * self.config.sample_rate,
-            stream_rate=sy.Rate.HZ * self.config.stream_rate,
+            sample_rate=sy.Rate.HZ * rate_plan.analog.sample_rate,
+            stream_rate=sy.Rate.HZ * rate_plan.analog.stream_rate,
             data_saving=True,
             channels=[],
         )
 
     def _create_digital_write_task(
-        self, card_name: str, device_key: str
+        self, card_name: str, device_key: str, rate_plan: DeviceRatePlan
     ) -> ni.DigitalWriteTask:
         """Create a digital write task"""
         return ni.DigitalWriteTask(
             name=f"{card_name} DO",
             device=device_key,
-            state_rate=sy.Rate.HZ * self.config.sample_rate,
+            state_rate=sy.Rate.HZ * rate_plan.state_rate,
             data_saving=True,
             channels=[],
         )
 
     def _create_digital_read_task(
-        self, card_name: str, device_key: str
+        self, card_name: str, device_key: str, rate_plan: DeviceRatePlan
     ) -> ni.DigitalReadTask:
         """Create a digital read task"""
         return ni.DigitalReadTask(
             name=f"{card_name} DI",
             device=device_key,
-            sample_rate=sy.Rate.HZ * self.config.sample_rate,
-            stream_rate=sy.Rate.HZ * self.config.stream_rate,
+            sample_rate=sy.Rate.HZ * rate_plan.digital.sample_rate,
+            stream_rate=sy.Rate.HZ * rate_plan.digital.stream_rate,
             data_saving=True,
             channels=[],
         )
 
     def create_device_tasks(
-        self, device: sy.Device
+        self,
+        device: sy.Device,
+        delete_existing: bool = True,
+        rate_plan: Optional[DeviceRatePlan] = None,
     ) -> Tuple[ni.AnalogReadTask, ni.DigitalWriteTask, ni.DigitalReadTask]:
         """
         Create all tasks for a device, deleting any existing tasks with the same names.
 
         Args:
             device: Synnax device object
+            delete_existing: Delete server tasks with the same names first. Pass
+                False when the tasks will be reconciled with reconcile_tasks.
+            rate_plan: Rates for the tasks. Defaults to the global config rates.
 
         Returns:
             Tuple of (AnalogReadTask, DigitalWriteTask, DigitalReadTask)
         """
         card_name = device.location
         tasks: List[ni.Task] = []
+        if rate_plan is None:
+            rate_plan = self._default_rate_plan(card_name)
 
         # Define task configurations
         task_configs = [
@@ -254,11 +311,12 @@ class DAQSystem:
             logger.info(f"Setting up task: {task_name}")
 
             # Delete existing task if it exists
-            self._delete_existing_task(task_name)
+            if delete_existing:
+                self._delete_existing_task(task_name)
 
             # Create new task
             try:
-                task = creator_func(card_name, device.key)
+                task = creator_func(card_name, device.key, rate_plan)
                 tasks.append(task)
                 logger.info(f"Successfully created task: {task_name}")
             except Exception as e:
@@ -266,6 +324,86 @@ class DAQSystem:
 
         return tuple(tasks)
 
+    def reconcile_tasks(self, tasks: List[DeviceTask]) -> List[str]:
+        """
+        Compare fully built tasks against the tasks already on the server.
+
+        Server tasks are looked up by name in a single request. Tasks that will
+        be kept or patched are bound to their server counterpart so that a later
+        configure updates them in place. Tasks that need recreating (or no longer
+        have channels) are deleted here.
+
+        Args:
+            tasks: Tasks with their channels already added
+
+        Returns:
+            One task_reconcile action per task, in the order given
+        """
+        names = [task.name for task in tasks]
+        existing = {}
+        try:
+            for server_task in self.client.hardware.tasks.retrieve(names=names):
+                existing.setdefault(server_task.name, server_task)
+        except Exception as e:
+            logger.debug(f"Could not retrieve existing tasks {names}: {e}")
+
+        actions = []
+        for task in tasks:
+            server_task = existing.get(task.name)
+            action = task_reconcile.reconcile_action(task.config, server_task)
+
+            if action in (task_reconcile.UNCHANGED, task_reconcile.PATCH):
+                if server_task is not None:
+                    task.set_internal(server_task)
+            elif action in (task_reconcile.RECREATE, task_reconcile.DELETE):
+                logger.info(f"Deleting existing task: {task.name}")
+                self.client.hardware.tasks.delete(server_task.key)
+
+            logger.info(f"Reconciled task {task.name}: {action}")
+            actions.append(action)
+
+        return actions
+
+    def _configure_with_retry(self, task, task_type: str) -> int:
+        """
+        Configure a single task, retrying timeouts with exponential backoff.
+
+        Returns:
+            Number of attempts made
+
+        Raises:
+            TaskError: If the task could not be configured. Its `attempts`
+                attribute is the number of attempts made.
+        """
+        # At least one attempt, whatever configure_retries says
+        max_retries = max(1, self.config.configure_retries)
+        retry_delay = self.config.configure_retry_delay  # seconds
+
+        for attempt in range(max_retries):
+            try:
+                self.client.hardware.tasks.configure(
+                    task=task, timeout=self.config.configure_timeout
+                )
+                logger.info(f"Successfully configured {task_type} task.")
+                return attempt + 1
+            except TimeoutError as e:
+                if attempt < max_retries - 1:
+                    delay = retry_delay * 2**attempt
+                    logger.warning(
+                        f"{task_type} configuration attempt {attempt + 1} failed, retrying in {delay} seconds..."
+                    )
+                    time.sleep(delay)
+                else:
+                    error = TaskError(
+                        f"Failed to configure {task_type} task after {max_retries} attempts: {e}"
+                    )
+                    error.attempts = attempt + 1
+                    raise error
+            except Exception as e:
+                error = TaskError(f"Failed to configure {task_type} task: {e}")
+                error.attempts = attempt + 1
+                raise error
+
     def configure_task(self, task, task_type: str) -> None:
         """Configure a task if it has channels"""
         if not task or not task.config.channels:
@@ -281,28 +419,136 @@ class DAQSystem:
                     "Cannot configure task: Synnax driver is not running. Please ensure the driver is started and accessible."
                 )
 
-            # Add retry logic for task configuration
-            max_retries = 3
-            retry_delay = 2  # seconds
-
-            for attempt in range(max_retries):
-                try:
-                    self.client.hardware.tasks.configure(task=task, timeout=10)
-                    logger.info(f"Successfully configured {task_type} task.")
-                    return
-                except TimeoutError as e:
-                    if attempt < max_retries - 1:
-                        logger.warning(
-                            f"Configuration attempt {attempt + 1} failed, retrying in {retry_delay} seconds..."
-                        )
-                        time.sleep(retry_delay)
-                    else:
-                        raise TaskError(
-                            f"Failed to configure {task_type} task after {max_retries} attempts: {e}"
-                        )
+            self._configure_with_retry(task, task_type)
         except Exception as e:
             raise TaskError(f"Failed to configure {task_type} task: {e}")
 
+    def _configure_and_report(self, task, task_type: str) -> TaskConfigureResult:
+        """Configure a task and capture the outcome instead of raising"""
+        start = time.perf_counter()
+        try:
+            with self.profiler.phase(None, task_type):
+                attempts = self._configure_with_retry(task, task_type)
+            return TaskConfigureResult(
+                task_type,
+                configured=True,
+                attempts=attempts,
+                elapsed=time.perf_counter() - start,
+            )
+        except TaskError as e:
+            return TaskConfigureResult(
+                task_type,
+                configured=False,
+                attempts=getattr(e, "attempts", 1),
+                error=e,
+                elapsed=time.perf_counter() - start,
+            )
+
+    def configure_tasks(
+        self, tasks: List[Tuple[DeviceTask, str]]
+    ) -> List[TaskConfigureResult]:
+        """
+        Configure several tasks concurrently after a single driver status check.
+
+        Each task is retried independently, so a slow or failing task does not
+        hold up the others. Tasks without channels are skipped.
+
+        Args:
+            tasks: (task, task_type) pairs, e.g. (analog_read_task, "Analog Read")
+
+        Returns:
+            One TaskConfigureResult per task, in the order given
+
+        Raises:
+            TaskError: If the Synnax driver is not running
+        """
+        results: List[Optional[TaskConfigureResult]] = [None] * len(tasks)
+        pending = []
+        for i, (task, task_type) in enumerate(tasks):
+            if not task or not task.config.channels:
+                logger.info(f"No channels added to {task_type} task.")
+                results[i] = TaskConfigureResult(task_type, configured=False)
+            else:
+                pending.append(i)
+
+        if not pending:
+            return results
+
+        # One driver check covers every task in the batch
+        if not self._check_driver_status():
+            raise TaskError(
+                "Cannot configure tasks: Synnax driver is not running. Please ensure the driver is started and accessible."
+            )
+
+        logger.info(
+            f"Configuring {', '.join(tasks[i][1] for i in pending)} tasks concurrently..."
+        )
+        with ThreadPoolExecutor(
+            max_workers=len(pending), thread_name_prefix="task-configure"
+        ) as executor:
+            # Each worker runs in a copy of this context so that its calls are
+            # attributed to the caller's profiler phase
+            futures = {
+                i: executor.submit(
+                    copy_context().run, self._configure_and_report, *tasks[i]
+                )
+                for i in pending
+            }
+            for i, future in futures.items():
+                results[i] = future.result()
+
+        return results
+
+    def initialize_safe_state(
+        self,
+        task_name: str,
+        cmd_channels: List[int],
+        state_channels: List[int],
+        timeout: Optional[float] = None,
+    ) -> List[int]:
+        """
+        Drive every digital output to DEENERGIZED in a single control session.
+
+        All safe states are written in one frame, then the state channels are
+        watched with a single wait_until until they all report DEENERGIZED.
+
+        Args:
+            task_name: Name of the digital write task, used to label the session
+            cmd_channels: Command channel keys to write
+            state_channels: State channel keys matching cmd_channels
+            timeout: Seconds to wait for the states to converge.
+                Defaults to config.safe_state_timeout
+
+        Returns:
+            Command channel keys whose state did not converge
+        """
+        if timeout is None:
+            timeout = self.config.safe_state_timeout
+
+        pairs = list(zip(cmd_channels, state_channels))
+        try:
+            with self.client.control.acquire(
+                name=f"Initialize {task_name}",
+                write=cmd_channels,
+                read=state_channels,
+                write_authorities=255,
+            ) as ctrl:
+                ctrl.set({cmd: DEENERGIZED for cmd in cmd_channels})
+                logger.info(f"Wrote DEENERGIZED to {len(cmd_channels)} channels")
+
+                converged = ctrl.wait_until(
+                    lambda c: all(
+                        c.get(state) == DEENERGIZED for state in state_channels
+                    ),
+                    timeout=timeout,
+                )
+                if converged:
+                    return []
+                return [cmd for cmd, state in pairs if ctrl.get(state) != DEENERGIZED]
+        except Exception as e:
+            logger.error(f"Failed to initialize {task_name} outputs: {e}")
+            return list(cmd_channels)
+
     def start_digital_output_task(
         self, digital_write_task: ni.DigitalWriteTask
     ) -> None:
@@ -311,6 +557,10 @@ class DAQSystem:
 
         Args:
             digital_write_task: The digital write task to start
+
+        Raises:
+            TaskError: If the task fails to start, or any output does not
+                confirm DEENERGIZED
         """
         if not digital_write_task or not digital_write_task.config.channels:
             logger.info("No digital output task or channels to start.")
@@ -350,91 +600,348 @@ class DAQSystem:
                 cmd_channels = cmd_channels[:min_length]
                 state_channels = state_channels[:min_length]
 
-            # Set all digital outputs to deenergized state one by one to avoid issues
-            for i, (cmd_channel, state_channel) in enumerate(
-                zip(cmd_channels, state_channels)
-            ):
-                try:
-                    with self.client.control.acquire(
-                        name=f"Initialize channel {i} in {digital_write_task.name}",
-                        write=[cmd_channel],
-                        read=[state_channel],
-                        write_authorities=255,
-                    ) as ctrl:
-                        ctrl[cmd_channel] = DEENERGIZED
-                        logger.info(f"Set channel {cmd_channel} to DEENERGIZED")
-                except Exception as e:
-                    logger.error(f"Failed to set channel {cmd_channel}: {e}")
-                    # Continue with other channels
-
-            logger.info(
-                f"Successfully started digital output task: {digital_write_task.name}"
+            failed = self.initialize_safe_state(
+                digital_write_task.name, cmd_channels, state_channels
             )
         except Exception as e:
             raise TaskError(f"Failed to start digital output task: {e}")
 
+        # Outputs that may still be energized must fail the bring-up
+        if failed:
+            raise TaskError(
+                f"{len(failed)} channel(s) of {digital_write_task.name} did not "
+                f"reach DEENERGIZED: {failed}"
+            )
+
+        logger.info(
+            f"Successfully started digital output task: {digital_write_task.name}"
+        )
+
     def setup_device(
         self,
         device: sy.Device,
-        data_wiring: pd.ExcelFile,
-        control_wiring: pd.ExcelFile,
+        data_wiring: WiringSource,
+        control_wiring: WiringSource,
         device_name: str,
-    ) -> None:
+    ) -> Tuple[ni.AnalogReadTask, ni.DigitalWriteTask, ni.DigitalReadTask]:
         """
         Complete device setup in the correct sequence:
-        1. Create tasks
-        2. Process device data to add channels
-        3. Configure tasks
-        4. Start digital output task
+        1. Parse and validate the wiring sheets
+        2. Create tasks
+        3. Process device data to add channels
+        4. Configure tasks
+        5. Start digital output task
 
         Args:
             device: Synnax device object
-            data_wiring: Excel file containing data wiring information
-            control_wiring: Excel file containing control wiring information
+            data_wiring: Excel file (or path) containing data wiring information
+            control_wiring: Excel file (or path) containing control wiring information
         """
         logger.info(f"Setting up device: {device.location}")
 
-        # Step 1: Create tasks
-        analog_read_task, digital_write_task, digital_read_task = (
-            self.create_device_tasks(device)
-        )
+        # Step 1: Parse every sheet up front so bad rows fail before anything changes
+        with self.profiler.phase(device_name, "parse_wiring"):
+            wiring = load_device_wiring(data_wiring, control_wiring)
+            rate_plan = plan_device_rates(self.config, device_name, wiring)
 
-        # Step 2: Process device data to add channels to the tasks
+        tasks = self._apply_device_tasks(device, device_name, wiring, rate_plan)
+
+        logger.info(f"Device setup complete: {device.location}")
+
+        return tasks
+
+    def _apply_device_tasks(
+        self,
+        device: sy.Device,
+        device_name: str,
+        wiring: DeviceWiring,
+        rate_plan: DeviceRatePlan,
+        only: Optional[List[str]] = None,
+    ) -> Tuple[ni.AnalogReadTask, ni.DigitalWriteTask, ni.DigitalReadTask]:
+        """
+        Steps 2-5 of setup_device, then record the applied wiring snapshot.
+
+        Args:
+            device: Synnax device object
+            device_name: Device location, e.g. "Dev5"
+            wiring: Parsed wiring tables of the device
+            rate_plan: Rates for the device's tasks
+            only: Suffixes ("AI", "DI", "DO") of the tasks to apply. Other tasks
+                are left untouched on the server. Defaults to every task.
+        """
+        profile = self.profiler.phase
+        selected = set(only) if only is not None else {"AI", "DI", "DO"}
+
+        # Step 2: Create tasks. When reconciling, existing tasks are only
+        # touched once the desired channels are known. A partial apply always
+        # reconciles, since deleting would also drop the untouched tasks.
+        reconcile = self.config.reconcile_tasks or only is not None
+        with profile(device_name, "create_tasks"):
+            analog_read_task, digital_write_task, digital_read_task = (
+                self.create_device_tasks(
+                    device, delete_existing=not reconcile, rate_plan=rate_plan
+                )
+            )
+
+        # Step 3: Process device data to add channels to the tasks
         logger.info(f"Processing device data for {device.location}")
-        process_analog_input(
-            data_wiring,
-            analog_read_task,
-            device,
-            self.channel_factory,
-            self.config.stream_rate,
-            device_name,
+        if "AI" in selected:
+            with profile(device_name, "channels_ai"):
+                process_analog_input(
+                    wiring.analog_inputs,
+                    analog_read_task,
+                    device,
+                    self.channel_factory,
+                    rate_plan.analog.stream_rate,
+                    device_name,
+                )
+
+        if "DI" in selected:
+            with profile(device_name, "channels_di"):
+                process_digital_input(
+                    wiring.digital_inputs,
+                    digital_read_task,
+                    device,
+                    self.channel_factory,
+                )
+
+        if "DO" in selected:
+            with profile(device_name, "channels_do"):
+                process_digital_output(
+                    wiring.digital_outputs,
+                    digital_write_task,
+                    device,
+                    self.channel_factory,
+                    rate_plan.state_rate,
+                    device_name,
+                )
+        logger.info(f"Completed processing device data for {device.location}")
+
+        # Step 4: Configure tasks with their channels
+        to_configure = [
+            (task, task_type)
+            for task, task_type, suffix in (
+                (analog_read_task, "Analog Read", "AI"),
+                (digital_write_task, "Digital Write", "DO"),
+                (digital_read_task, "Digital Read", "DI"),
+            )
+            if suffix in selected
+        ]
+        if reconcile:
+            with profile(device_name, "reconcile_tasks"):
+                actions = self.reconcile_tasks([task for task, _ in to_configure])
+            # Leave matching tasks alone so acquisition is not interrupted
+            to_configure = [
+                pair
+                for pair, action in zip(to_configure, actions)
+                if action not in (task_reconcile.UNCHANGED, task_reconcile.DELETE)
+            ]
+
+        with profile(device_name, "configure_tasks"):
+            results = self.configure_tasks(to_configure)
+        failed = [r for r in results if not r.ok]
+        if failed:
+            raise TaskError("; ".join(str(r.error) for r in failed))
+
+        # Step 5: Start the digital output task to set all outputs to deenergized state
+        if "DO" in selected:
+            with profile(device_name, "start_do"):
+                self.start_digital_output_task(digital_write_task)
+
+        self._save_applied_wiring(device_name, wiring, rate_plan, only)
+
+        return analog_read_task, digital_write_task, digital_read_task
+
+    def _snapshot_path(self, device_name: str) -> Path:
+        """Applied wiring snapshot of a device on the configured server"""
+        backend = self.config.backend
+        target = self.config.host if backend == "synnax" else backend
+        return (
+            Path(self.config.wiring_dir)
+            / CACHE_DIR_NAME
+            / f"applied_{target}_{device_name}.json"
         )
 
-        process_digital_input(
-            data_wiring,
-            digital_read_task,
-            device,
-            self.channel_factory,
+    def _save_applied_wiring(
+        self,
+        device_name: str,
+        wiring: DeviceWiring,
+        rate_plan: DeviceRatePlan,
+        only: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Record what is now applied to a device. After a partial apply, the
+        tables and rates of the untouched tasks keep their snapshot values.
+        """
+        path = self._snapshot_path(device_name)
+        rates = rate_plan.task_rates()
+        previous = load_snapshot(path) if only is not None else None
+        if previous is not None:
+            old_wiring, old_rates = previous
+            tables = {}
+            for table, (suffix, _) in WIRING_TABLES.items():
+                source = wiring if suffix in only else old_wiring
+                tables[table] = getattr(source, table)
+                if suffix not in only and suffix in old_rates:
+                    rates[suffix] = old_rates[suffix]
+            wiring = DeviceWiring(**tables)
+        save_snapshot(path, wiring, rates)
+
+    def plan_wiring_changes(
+        self, device_name: str, paths: DeviceWiringPaths
+    ) -> Tuple[WiringDiff, DeviceWiring, DeviceRatePlan]:
+        """
+        Diff a device's wiring workbooks against the wiring last applied to it.
+
+        Args:
+            device_name: Device location, e.g. "Dev5"
+            paths: Wiring file paths of the device
+
+        Returns:
+            Tuple of (WiringDiff, parsed wiring, rate plan)
+        """
+        with self.profiler.phase(device_name, "parse_wiring"):
+            wiring = load_device_wiring(paths.data_wiring, paths.control_wiring)
+            rate_plan = plan_device_rates(self.config, device_name, wiring)
+
+        snapshot = load_snapshot(self._snapshot_path(device_name))
+        old_wiring, old_rates = snapshot if snapshot is not None else (None, None)
+        diff = diff_wiring(
+            device_name, old_wiring, wiring, old_rates, rate_plan.task_rates()
         )
+        return diff, wiring, rate_plan
+
+    def apply_wiring_changes(
+        self, device_name: str, paths: DeviceWiringPaths, dry_run: bool = False
+    ) -> WiringDiff:
+        """
+        Push only the wiring rows that changed since the last apply.
 
-        process_digital_output(
-            control_wiring,
-            digital_write_task,
+        Only the tasks whose rows or rates changed are rebuilt, reconciled and
+        reconfigured; the others keep acquiring. Rows deleted from a workbook
+        are dropped from their task, but their channels are kept so that their
+        history stays readable. Without a snapshot every task is applied.
+
+        Args:
+            device_name: Device location, e.g. "Dev5"
+            paths: Wiring file paths of the device
+            dry_run: Only work out and log the plan
+
+        Returns:
+            The WiringDiff that was (or would be) applied
+        """
+        diff, wiring, rate_plan = self.plan_wiring_changes(device_name, paths)
+        for line in diff.describe():
+            logger.info(line)
+
+        if dry_run or diff.empty:
+            return diff
+
+        with self.profiler.phase(device_name, "retrieve_device"):
+            device = self.discovery.get(device_name)
+
+        self._apply_device_tasks(
             device,
-            self.channel_factory,
-            self.config.sample_rate,
             device_name,
+            wiring,
+            rate_plan,
+            only=None if not diff.has_snapshot else diff.tasks,
         )
-        logger.info(f"Completed processing device data for {device.location}")
+        logger.info(
+            f"Applied wiring changes to {device_name}: "
+            f"{', '.join(diff.tasks) or 'nothing'}"
+        )
+        return diff
 
-        # Step 3: Configure tasks with their channels
-        self.configure_task(analog_read_task, "Analog Read")
-        self.configure_task(digital_write_task, "Digital Write")
-        self.configure_task(digital_read_task, "Digital Read")
+    def _setup_device_from_paths(
+        self, device_name: str, paths: DeviceWiringPaths
+    ) -> DeviceSetupResult:
+        """Run the full bring-up pipeline for one device and capture the outcome"""
+        start = time.perf_counter()
+        try:
+            logger.info(f"Processing {device_name}...")
 
-        # Step 4: Start the digital output task to set all outputs to deenergized state
-        self.start_digital_output_task(digital_write_task)
+            with self.profiler.phase(device_name, "retrieve_device"):
+                device = self.discovery.get(device_name)
 
-        logger.info(f"Device setup complete: {device.location}")
+            tasks = self.setup_device(
+                device, paths.data_wiring, paths.control_wiring, device_name
+            )
+            return DeviceSetupResult(
+                device_name, tasks=tasks, elapsed=time.perf_counter() - start
+            )
+        except Exception as e:
+            logger.error(f"Setup failed for {device_name}: {e}", exc_info=True)
+            return DeviceSetupResult(
+                device_name, error=e, elapsed=time.perf_counter() - start
+            )
 
-        return analog_read_task, digital_write_task, digital_read_task
+    def setup_devices(
+        self,
+        device_paths: Dict[str, DeviceWiringPaths],
+        parallel: Optional[bool] = None,
+    ) -> Dict[str, DeviceSetupResult]:
+        """
+        Set up several devices, optionally bringing each one up on its own worker.
+
+        All workers share this system's client and channel registry. A failure on
+        one device does not stop the others; every outcome is collected instead.
+
+        Args:
+            device_paths: Wiring file paths keyed by device location
+            parallel: Run devices concurrently. Defaults to config.parallel_setup
+
+        Returns:
+            Dictionary mapping device name to its setup result
+        """
+        if parallel is None:
+            parallel = self.config.parallel_setup
+
+        if parallel and len(device_paths) > 1:
+            with ThreadPoolExecutor(
+                max_workers=len(device_paths), thread_name_prefix="device-setup"
+            ) as executor:
+                futures = {
+                    name: executor.submit(self._setup_device_from_paths, name, paths)
+                    for name, paths in device_paths.items()
+                }
+                results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {
+                name: self._setup_device_from_paths(name, paths)
+                for name, paths in device_paths.items()
+            }
+
+        self._log_setup_report(results)
+        return results
+
+    def report_startup_profile(self) -> Optional[str]:
+        """
+        Log the startup profile summary and write its JSON trace.
+
+        Returns:
+            Path of the trace file, or None if profiling or the trace is disabled
+        """
+        if not self.profiler.enabled:
+            return None
+
+        logger.info("Startup profile:\n" + self.profiler.summary_table())
+        if self.config.startup_trace_dir is None:
+            return None
+
+        try:
+            trace_file = self.profiler.write_trace(self.config.startup_trace_dir)
+        except OSError as e:
+            logger.warning(f"Could not write startup trace: {e}")
+            return None
+        logger.info(f"Startup trace written to {trace_file}")
+        return str(trace_file)
+
+    def _log_setup_report(self, results: Dict[str, DeviceSetupResult]) -> None:
+        """Log a per-device summary of a multi-device setup"""
+        logger.info("-" * 50)
+        logger.info("Device setup report:")
+        for name, result in results.items():
+            status = "OK" if result.ok else f"FAILED ({result.error})"
+            logger.info(f"  {name}: {status} in {result.elapsed:.2f} s")
+        logger.info("-" * 50)
@@ -0,0 +1,193 @@
+"""
+Discovery of the NI devices on the rack and the wiring files that belong to them.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import json
+import logging
+import re
+import threading
+import time
+
+import synnax as sy
+
+from ..config.settings import DAQConfig, DeviceWiringPaths
+from ..processing.wiring import load_device_wiring
+from ..utils.exceptions import DeviceError
+
+logger = logging.getLogger(__name__)
+
+DEVICE_PLACEHOLDER = "{device}"
+
+
+def device_properties(device: sy.Device) -> dict:
+    """Device properties as a dict (older clients return them as a JSON string)"""
+    properties = getattr(device, "properties", None) or {}
+    if isinstance(properties, str):
+        try:
+            properties = json.loads(properties)
+        except json.JSONDecodeError:
+            return {}
+    return properties if isinstance(properties, dict) else {}
+
+
+def device_identifiers(device: sy.Device) -> Set[str]:
+    """Names a wiring file may use for a device: location, key or serial number"""
+    properties = device_properties(device)
+    candidates = {
+        device.location,
+        device.key,
+        properties.get("serial_number"),
+        properties.get("identifier"),
+    }
+    return {str(c) for c in candidates if c}
+
+
+def _files_by_id(wiring_dir: Path, pattern: str) -> Dict[str, Path]:
+    """Map the {device} part of every file matching pattern to its path"""
+    prefix, _, suffix = pattern.partition(DEVICE_PLACEHOLDER)
+    regex = re.compile(re.escape(prefix) + r"(.+)" + re.escape(suffix) + r"$")
+    found = {}
+    for path in sorted(wiring_dir.glob(prefix + "*" + suffix)):
+        match = regex.match(path.name)
+        if match:
+            found[match.group(1)] = path
+    return found
+
+
+def find_wiring_files(config: DAQConfig) -> Dict[str, DeviceWiringPaths]:
+    """
+    Find every pair of data and control wiring workbooks in config.wiring_dir.
+
+    File names follow config.data_wiring_pattern and config.control_wiring_pattern,
+    where {device} is the device location (e.g. "Dev5") or serial number.
+    A device with only one of the two workbooks is skipped with a warning.
+
+    Returns:
+        Wiring paths keyed by the {device} part of the file names
+    """
+    wiring_dir = Path(config.wiring_dir)
+    data_files = _files_by_id(wiring_dir, config.data_wiring_pattern)
+    control_files = _files_by_id(wiring_dir, config.control_wiring_pattern)
+
+    for device_id in sorted(set(data_files) ^ set(control_files)):
+        logger.warning(
+            f"Skipping {device_id}: needs both a data and a control wiring file in {wiring_dir}"
+        )
+
+    return {
+        device_id: DeviceWiringPaths(
+            data_wiring=data_files[device_id],
+            control_wiring=control_files[device_id],
+        )
+        for device_id in sorted(set(data_files) & set(control_files))
+    }
+
+
+def wired_analog_channels(config: DAQConfig) -> List[str]:
+    """AI channel names of every device with wiring files in config.wiring_dir"""
+    names: List[str] = []
+    for paths in find_wiring_files(config).values():
+        wiring = load_device_wiring(paths.data_wiring, paths.control_wiring)
+        names.extend(wiring.analog_inputs["name"])
+    return names
+
+
+class DeviceDiscovery:
+    """
+    Inventory of the devices on the rack, fetched in one query and cached.
+
+    Every lookup is served from the cache until it is older than the TTL, so
+    adding more chassis does not add more round trips to the server.
+    """
+
+    def __init__(self, client: sy.Synnax, config: DAQConfig):
+        self.client = client
+        self.config = config
+        self._lock = threading.Lock()
+        self._devices: Optional[List[sy.Device]] = None
+        self._fetched_at = 0.0
+
+    def devices(self, refresh: bool = False) -> List[sy.Device]:
+        """
+        Every device of config.device_model on the rack.
+
+        Args:
+            refresh: Query the server even if the cache has not expired
+
+        Returns:
+            Devices sorted by location
+        """
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            if refresh or self._devices is None or age > self.config.discovery_ttl:
+                devices = self.client.devices.retrieve(
+                    models=[self.config.device_model]
+                )
+                self._devices = sorted(devices or [], key=lambda d: d.location)
+                self._fetched_at = time.monotonic()
+                logger.debug(
+                    f"Discovered {len(self._devices)} {self.config.device_model} "
+                    f"device(s): {', '.join(d.location for d in self._devices)}"
+                )
+            return list(self._devices)
+
+    def invalidate(self) -> None:
+        """Drop the cached inventory so the next lookup queries the server"""
+        with self._lock:
+            self._devices = None
+
+    def by_location(self) -> Dict[str, sy.Device]:
+        return {device.location: device for device in self.devices()}
+
+    def get(self, location: str) -> sy.Device:
+        """
+        Look up a device by location (e.g. "Dev5").
+
+        Raises:
+            DeviceError: If no such device is on the rack
+        """
+        device = self.by_location().get(location)
+        if device is None:
+            raise DeviceError(
+                f"No {self.config.device_model} found at location {location}"
+            )
+        return device
+
+    def wiring_paths(
+        self, wiring_files: Optional[Dict[str, DeviceWiringPaths]] = None
+    ) -> Dict[str, DeviceWiringPaths]:
+        """
+        Match the devices on the rack to their wiring files.
+
+        A wiring file may name its device by location, key or serial number.
+        Devices without wiring and wiring without a device are logged and left
+        out.
+
+        Args:
+            wiring_files: Wiring paths keyed by device identifier.
+                Defaults to find_wiring_files(config).
+
+        Returns:
+            Wiring paths keyed by device location
+        """
+        if wiring_files is None:
+            wiring_files = find_wiring_files(self.config)
+
+        matched: Dict[str, DeviceWiringPaths] = {}
+        used: Set[str] = set()
+        for device in self.devices():
+            ids = device_identifiers(device) & set(wiring_files)
+            if not ids:
+                logger.warning(f"No wiring files found for device {device.location}")
+                continue
+            # Prefer the location, which is what the channel names are built from
+            device_id = device.location if device.location in ids else sorted(ids)[0]
+            matched[device.location] = wiring_files[device_id]
+            used.update(ids)
+
+        for device_id in sorted(set(wiring_files) - used):
+            logger.warning(f"Wiring files for {device_id} do not match any device")
+
+        return matched
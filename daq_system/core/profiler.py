@@ -0,0 +1,264 @@
+"""
+Startup profiler for the DAQ bring-up pipeline.
+
+Records the wall time and the number of Synnax client calls (RPCs) made in each
+phase of a device's bring-up, e.g. wiring parsing, channel creation, task
+configuration and DO initialization. At the end of a run the phases are
+summarized as a table and written out as a JSON trace so bring-up times can be
+compared from one test day to the next.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import functools
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+UNATTRIBUTED = "-"  # Device/phase label for calls made outside any phase
+
+# Client calls counted as RPCs, as (path to sub-client, method names)
+INSTRUMENTED_CALLS = (
+    ("channels", ("create", "retrieve", "delete")),
+    ("hardware.tasks", ("create", "retrieve", "delete", "configure")),
+    ("hardware.devices", ("retrieve",)),
+    ("devices", ("retrieve",)),
+    ("control", ("acquire",)),
+)
+
+# (device, phase) of the phase running in the current thread or task
+_current_phase: ContextVar[Optional[Tuple[str, str]]] = ContextVar(
+    "current_phase", default=None
+)
+
+
+@dataclass
+class PhaseRecord:
+    """Accumulated totals for one phase of one device"""
+
+    device: str
+    phase: str
+    calls: int = 0  # Times the phase was entered
+    elapsed: float = 0.0  # seconds, summed over calls
+    rpcs: int = 0
+    rpc_methods: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def nested(self) -> bool:
+        """True for a sub-phase, whose time is already part of its parent"""
+        return "/" in self.phase
+
+
+@dataclass
+class PhaseEvent:
+    """A single run of a phase, relative to the start of the profile"""
+
+    device: str
+    phase: str
+    start: float  # seconds since the profiler was created
+    elapsed: float  # seconds
+    rpcs: int
+
+
+class StartupProfiler:
+    """Collects per-device phase timings and RPC counts for one run"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._records: Dict[Tuple[str, str], PhaseRecord] = {}
+        self._events: List[PhaseEvent] = []
+
+    def _record(self, key: Tuple[str, str]) -> PhaseRecord:
+        # Callers hold self._lock
+        if key not in self._records:
+            self._records[key] = PhaseRecord(*key)
+        return self._records[key]
+
+    @contextmanager
+    def phase(self, device: Optional[str], name: str) -> Iterator[None]:
+        """
+        Time a phase and attribute the client calls made inside it.
+
+        Phases can be nested. A nested phase is recorded as "parent/name" and
+        its calls are counted against it rather than the parent.
+
+        Args:
+            device: Device the phase belongs to. None inherits the device of
+                the enclosing phase.
+            name: Phase name, e.g. "parse_wiring"
+        """
+        if not self.enabled:
+            yield
+            return
+
+        parent = _current_phase.get()
+        if parent is not None:
+            if device is None:
+                device = parent[0]
+            if device == parent[0]:
+                name = f"{parent[1]}/{name}"
+        key = (device or UNATTRIBUTED, name)
+
+        with self._lock:
+            rpcs_before = self._record(key).rpcs
+
+        token = _current_phase.set(key)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_phase.reset(token)
+            with self._lock:
+                record = self._record(key)
+                record.calls += 1
+                record.elapsed += elapsed
+                self._events.append(
+                    PhaseEvent(
+                        device=key[0],
+                        phase=key[1],
+                        start=start - self._start,
+                        elapsed=elapsed,
+                        rpcs=record.rpcs - rpcs_before,
+                    )
+                )
+
+    def count_rpc(self, method: str) -> None:
+        """Count one client call against the phase running in this context"""
+        key = _current_phase.get() or (UNATTRIBUTED, UNATTRIBUTED)
+        with self._lock:
+            record = self._record(key)
+            record.rpcs += 1
+            record.rpc_methods[method] = record.rpc_methods.get(method, 0) + 1
+
+    def instrument(self, client) -> None:
+        """
+        Wrap the Synnax client methods in INSTRUMENTED_CALLS so every call is
+        counted against the current phase.
+
+        Only this client instance is affected. Sub-clients reachable through
+        more than one path (e.g. client.devices and client.hardware.devices)
+        are wrapped once.
+        """
+        if not self.enabled:
+            return
+
+        wrapped = set()
+        for path, methods in INSTRUMENTED_CALLS:
+            target = client
+            for attr in path.split("."):
+                target = getattr(target, attr, None)
+                if target is None:
+                    break
+            if target is None or id(target) in wrapped:
+                continue
+            wrapped.add(id(target))
+
+            for method in methods:
+                original = getattr(target, method, None)
+                if callable(original):
+                    setattr(
+                        target, method, self._counted(f"{path}.{method}", original)
+                    )
+
+    def _counted(self, label: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.count_rpc(label)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    @property
+    def records(self) -> List[PhaseRecord]:
+        """Phase records in the order the phases first started"""
+        with self._lock:
+            return list(self._records.values())
+
+    def device_totals(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Wall time and RPC count per device.
+
+        Time is summed over top-level phases only, since nested phases are
+        already included in their parent. RPCs are counted over every phase.
+        """
+        totals: Dict[str, Tuple[float, int]] = {}
+        for record in self.records:
+            elapsed, rpcs = totals.get(record.device, (0.0, 0))
+            if not record.nested:
+                elapsed += record.elapsed
+            totals[record.device] = (elapsed, rpcs + record.rpcs)
+        return totals
+
+    def summary_table(self) -> str:
+        """Format the phase records as a fixed-width text table"""
+        header = f"{'Device':<8} {'Phase':<32} {'Calls':>5} {'Time (s)':>9} {'RPCs':>5}"
+        lines = [header, "-" * len(header)]
+
+        totals = self.device_totals()
+        records = self.records
+        for device in totals:
+            for record in records:
+                if record.device != device:
+                    continue
+                phase = record.phase
+                if record.nested:
+                    phase = "  " + phase.rsplit("/", 1)[1]
+                lines.append(
+                    f"{device:<8} {phase:<32} {record.calls:>5} "
+                    f"{record.elapsed:>9.3f} {record.rpcs:>5}"
+                )
+            elapsed, rpcs = totals[device]
+            lines.append(f"{device:<8} {'total':<32} {'':>5} {elapsed:>9.3f} {rpcs:>5}")
+            lines.append("")
+
+        wall = time.perf_counter() - self._start
+        lines.append(f"Run wall time: {wall:.3f} s")
+        return "\n".join(lines)
+
+    def to_trace(self) -> dict:
+        """Machine-readable trace of the run"""
+        with self._lock:
+            events = [asdict(event) for event in self._events]
+        totals = self.device_totals()
+        return {
+            "started_at": self.started_at.isoformat(),
+            "wall_time": time.perf_counter() - self._start,
+            "devices": {
+                device: {"elapsed": elapsed, "rpcs": rpcs}
+                for device, (elapsed, rpcs) in totals.items()
+            },
+            "phases": [asdict(record) for record in self.records],
+            "events": sorted(events, key=lambda e: e["start"]),
+        }
+
+    def write_trace(self, directory: str) -> Path:
+        """
+        Write the JSON trace to a timestamped file, plus a copy that is
+        overwritten every run.
+
+        Args:
+            directory: Directory to write the trace files to
+
+        Returns:
+            Path of the timestamped trace file
+        """
+        trace_dir = Path(directory)
+        trace_dir.mkdir(parents=True, exist_ok=True)
+
+        timestamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+        trace_file = trace_dir / f"startup_trace_{timestamp}.json"
+        contents = json.dumps(self.to_trace(), indent=2)
+        trace_file.write_text(contents, encoding="utf-8")
+        (trace_dir / "startup_trace_latest.json").write_text(contents, encoding="utf-8")
+        return trace_file
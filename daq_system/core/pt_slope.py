@@ -1,108 +1,64 @@
-import synnax as sy
-from synnax import DataType
-import os
-
-# --- 1. CONFIGURATION (User-Provided) ---
-HOST = "10.165.89.106" 
-PORT = 2701
-USERNAME = "Bill" 
-PASSWORD = "Bill" 
+"""
+Provision the server-side derived channels (PT slopes, moving averages,
+differential pressures, mass flows) declared in config/derived_channels.yaml.
 
-# Define the base channel whose slope we want to calculate
-BASE_PRESSURE_CHANNEL_NAME = "PT-FU-04" 
+Usage:
+    python -m daq_system.core.pt_slope [--spec path] [--dry-run]
+"""
 
-# --- 2. LUA EXPRESSION FOR 5-SECOND SLOPE ---
-# Note: The Lua expression *must* still use the channel name (e.g., 'PT-FU-04')
-# because that's how Synnax's Lua environment references channels.
+import argparse
+from pathlib import Path
 
-LUA_SLOPE_EXPRESSION = f"""
--- Time window is 5 seconds in nanoseconds (5 * 10^9)
-local window_size_ns = 5000000000 
-local pressure_channel = channels["{BASE_PRESSURE_CHANNEL_NAME}"]
+import synnax as sy
 
--- Get all samples in the last 5 seconds
-local pressure_window = pressure_channel:window(
-    window_size_ns, 
-    time - window_size_ns, 
-    time
+from ..config.settings import DAQConfig
+from ..processing.derived_channels import (
+    UNCHANGED,
+    build_derived_channels,
+    load_derived_spec,
+    provision_derived_channels,
 )
+from ..utils.exceptions import DAQError
+from ..utils.synnax_client import connect
+from .discovery import wired_analog_channels
 
-local oldest_sample = pressure_window:first()
-local newest_sample = pressure_window:last()
+DEFAULT_SPEC = Path(__file__).resolve().parent.parent / "config" / "derived_channels.yaml"
 
-if oldest_sample == nil or newest_sample == nil then
-    return nil
-end
 
-local delta_pressure = newest_sample.value - oldest_sample.value
-
-local delta_time_ns = newest_sample.time - oldest_sample.time
-local delta_time_s = delta_time_ns / 1000000000 
-
-if delta_time_s == 0 then
-    return nil
-end
-
-local slope = delta_pressure / delta_time_s
-
-return slope
-"""
-
-# --- 3. CHANNEL CREATION SCRIPT (FIXED FOR INTEGER KEY REQUIREMENT) ---
-
-def create_slope_calculated_channel():
+def create_derived_channels(spec_path: Path, dry_run: bool = False) -> None:
     """
-    Connects to Synnax, retrieves the key for the base channel, and creates 
-    the 5-second slope calculated channel using the key.
+    Connects to Synnax and creates or updates every derived channel in the spec
+    in one batch.
     """
     try:
-        # Initialize the Synnax client
-        client = sy.Synnax(
-            host=HOST,
-            port=PORT,
-            username=USERNAME,
-            password=PASSWORD,
-        )
-
-        # 🎯 FIX STEP 1: RETRIEVE THE CHANNEL KEY (ID)
-        print(f"Retrieving key for base channel: {BASE_PRESSURE_CHANNEL_NAME}...")
-        
-        # Use .retrieve() to get the existing Channel object
-        base_channel = client.channels.retrieve(BASE_PRESSURE_CHANNEL_NAME)
-        
-        # Extract the integer key
-        base_channel_key = base_channel.key 
-        print(f"Found channel key: {base_channel_key}")
-
-
-        # 🎯 FIX STEP 2: USE THE INTEGER KEY IN THE 'requires' LIST
-        channel_data = {
-            "name": f"{BASE_PRESSURE_CHANNEL_NAME}_SLOPE_5S",
-            "data_type": DataType.FLOAT64,
-            "expression": LUA_SLOPE_EXPRESSION,
-            # PASS THE INTEGER KEY, NOT THE STRING NAME, to satisfy the ValidationError
-            "requires": [base_channel_key], 
-        }
-
-        # Initialize a basic Channel object using the data dictionary.
-        calculated_channel = sy.Channel(**channel_data)
-
-        # Create the channel on the Synnax cluster
-        created_channel = client.channels.create(calculated_channel)
-        
-        print("\n✅ Successfully created Calculated Channel:")
-        print(f"   Name: {created_channel.name}")
-        print(f"   Key: {created_channel.key}")
-        print(f"   Status: Active and calculating slope for {BASE_PRESSURE_CHANNEL_NAME}.")
-
-    # Catch specific exceptions for better debugging
-    except sy.exceptions.SynnaxError as e:
+        config = DAQConfig()
+        specs = load_derived_spec(spec_path)
+        channels = build_derived_channels(specs, wired_analog_channels(config))
+        print(f"{len(channels)} derived channels in {spec_path}")
+
+        client = connect(config)
+        actions = provision_derived_channels(client, channels, dry_run=dry_run)
+
+        changed = {n: a for n, a in actions.items() if a != UNCHANGED}
+        verb = "Would apply" if dry_run else "Applied"
+        print(f"\n✅ {verb} {len(changed)} change(s), {len(actions) - len(changed)} unchanged:")
+        for name, action in changed.items():
+            print(f"   {action:<9} {name}")
+
+    except DAQError as e:
+        print(f"❌ {e}")
+    except (sy.exceptions.ValidationError, sy.exceptions.QueryError) as e:
         print(f"❌ Synnax API Error: {e}")
     except Exception as e:
-        # This will now catch the ValidationError from the failed 'requires' check, 
-        # or any other connection/runtime errors.
-        print(f"❌ An error occurred during channel creation. Check Synnax server status or permissions.")
+        print("❌ An error occurred during channel creation. Check Synnax server status or permissions.")
         print(f"   Error Details: {type(e).__name__}: {e}")
 
-if __name__ == '__main__':
-    create_slope_calculated_channel()
\ No newline at end of file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provision derived channels")
+    parser.add_argument("--spec", type=Path, default=DEFAULT_SPEC)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Show the changes without applying them"
+    )
+    args = parser.parse_args()
+    create_derived_channels(args.spec, args.dry_run)
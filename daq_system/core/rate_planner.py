@@ -0,0 +1,164 @@
+"""
+Per-device sample/stream rate planning for the USB-6343 cards.
+"""
+
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatchcase
+from typing import Dict, List
+import logging
+import math
+
+from ..config.settings import DAQConfig, DeviceRateConfig
+from ..processing.wiring import DeviceWiring
+from ..utils.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# USB-6343 limits. The card has a single AI timing engine, so every AI channel
+# on a card is sampled at the same rate and shares the aggregate rate.
+USB_6343_AI_AGGREGATE_RATE = 500_000  # S/s across all AI channels
+SYNNAX_MAX_TASK_RATE = 50_000  # Hz, upper bound accepted by Synnax NI tasks
+
+
+@dataclass
+class TaskRatePlan:
+    """Sample and stream rate for one read task"""
+
+    sample_rate: int  # Hz
+    stream_rate: int  # Hz
+
+    @property
+    def latency(self) -> float:
+        """Worst-case time between streamed frames, in seconds"""
+        return 1 / self.stream_rate
+
+
+@dataclass
+class DeviceRatePlan:
+    """Validated rates for every task on one device"""
+
+    device_name: str
+    analog: TaskRatePlan
+    digital: TaskRatePlan
+    state_rate: int  # Hz, DO state feedback
+    notes: List[str] = field(default_factory=list)
+
+    def task_rates(self) -> Dict[str, dict]:
+        """Rates of each task, keyed by task suffix"""
+        return {
+            "AI": asdict(self.analog),
+            "DI": asdict(self.digital),
+            "DO": {"state_rate": self.state_rate},
+        }
+
+
+def _stream_rate(sample_rate: int, requested: int, max_latency: float) -> int:
+    """
+    Pick a stream rate that keeps latency under max_latency.
+
+    The result is the smallest divisor of sample_rate that is at least the
+    requested rate and 1 / max_latency, so every frame holds a whole number of
+    samples. It never exceeds the sample rate.
+    """
+    target = max(requested, math.ceil(1 / max_latency))
+    if target >= sample_rate:
+        return sample_rate
+    for rate in range(target, sample_rate + 1):
+        if sample_rate % rate == 0:
+            return rate
+    return sample_rate
+
+
+def _group_rate(
+    rates: DeviceRateConfig, names: List[str], default: int, notes: List[str]
+) -> int:
+    """Highest rate requested by any group that matches one of names"""
+    matches = []
+    for group in rates.groups:
+        matched = [name for name in names if fnmatchcase(name, group.pattern)]
+        if matched:
+            matches.append((group, matched))
+
+    rate = max([default] + [group.sample_rate for group, _ in matches])
+    for group, matched in matches:
+        if group.sample_rate < rate:
+            notes.append(
+                f"{group.pattern} asks for {group.sample_rate} Hz but shares the "
+                f"card clock, so {len(matched)} channel(s) run at {rate} Hz"
+            )
+    return rate
+
+
+def plan_device_rates(
+    config: DAQConfig, device_name: str, wiring: DeviceWiring
+) -> DeviceRatePlan:
+    """
+    Build and validate the rate plan for one device.
+
+    The AI rate is the highest of the device default and every channel group
+    that matches an AI channel on the card. Stream rates are chosen so that
+    frames arrive at least every config.max_stream_latency seconds.
+
+    Args:
+        config: System configuration, including config.device_rates
+        device_name: Device location, e.g. "Dev5"
+        wiring: Parsed wiring tables for the device
+
+    Returns:
+        DeviceRatePlan for the device
+
+    Raises:
+        ConfigurationError: If the plan exceeds the USB-6343 or Synnax limits
+    """
+    rates = config.device_rates.get(device_name, DeviceRateConfig())
+    notes: List[str] = []
+
+    base_sample = rates.sample_rate or config.sample_rate
+    base_stream = rates.stream_rate or config.stream_rate
+
+    ai_names = list(wiring.analog_inputs["name"])
+    di_names = list(wiring.digital_inputs["name"])
+
+    ai_rate = _group_rate(rates, ai_names, base_sample, notes)
+    di_rate = _group_rate(rates, di_names, base_sample, notes)
+    if rates.state_rate:
+        state_rate = rates.state_rate
+    elif config.low_latency_do:
+        state_rate = config.low_latency_state_rate
+    else:
+        state_rate = base_sample
+
+    for label, rate in (("AI", ai_rate), ("DI", di_rate), ("DO state", state_rate)):
+        if rate <= 0 or rate > SYNNAX_MAX_TASK_RATE:
+            raise ConfigurationError(
+                f"{device_name} {label} rate {rate} Hz is outside 1-{SYNNAX_MAX_TASK_RATE} Hz"
+            )
+
+    ai_aggregate = ai_rate * len(ai_names)
+    if ai_aggregate > USB_6343_AI_AGGREGATE_RATE:
+        raise ConfigurationError(
+            f"{device_name} AI needs {ai_aggregate} S/s ({len(ai_names)} channels at "
+            f"{ai_rate} Hz), above the USB-6343 limit of {USB_6343_AI_AGGREGATE_RATE} S/s"
+        )
+
+    plan = DeviceRatePlan(
+        device_name=device_name,
+        analog=TaskRatePlan(
+            ai_rate, _stream_rate(ai_rate, base_stream, config.max_stream_latency)
+        ),
+        digital=TaskRatePlan(
+            di_rate, _stream_rate(di_rate, base_stream, config.max_stream_latency)
+        ),
+        state_rate=state_rate,
+        notes=notes,
+    )
+
+    logger.info(
+        f"{device_name} rates: AI {plan.analog.sample_rate}/{plan.analog.stream_rate} Hz "
+        f"({ai_aggregate} S/s), DI {plan.digital.sample_rate}/{plan.digital.stream_rate} Hz, "
+        f"DO state {plan.state_rate} Hz"
+    )
+    for note in notes:
+        logger.warning(f"{device_name}: {note}")
+
+    return plan
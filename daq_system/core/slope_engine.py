@@ -0,0 +1,291 @@
+"""
+Client-side rate of change of streamed channels.
+
+SlidingSlope keeps the least-squares slope of the samples in a time window.
+Running sums of t, y, t*t and t*y are updated as samples enter and leave a
+ring buffer, so each sample costs O(1) no matter how long the window is.
+Unlike a first/last difference, every sample in the window contributes, which
+makes the slope far less sensitive to noise.
+
+SlopeEngine streams a set of channels, feeds each one's SlidingSlope and
+publishes one `{name}_SLOPE` sample per received frame, i.e. at stream rate.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import threading
+
+import numpy as np
+import synnax as sy
+
+from ..processing.channel_factory import ChannelFactory, ChannelSpec
+from ..utils.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+STREAM_TIMEOUT = 0.5  # seconds between checks for stop()
+SLOPE_SUFFIX = "_SLOPE"
+
+
+class SlidingSlope:
+    """Least-squares slope of (t, y) samples over the last `window` seconds"""
+
+    def __init__(self, window: float, capacity: int = 1024, min_samples: int = 2):
+        """
+        Args:
+            window: Window length in seconds
+            capacity: Initial ring buffer size. It doubles if the window holds more.
+            min_samples: Fewest samples for which slope is defined
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.min_samples = max(2, min_samples)
+        self._t = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._head = 0  # Index of the oldest sample
+        self._count = 0
+        self._t0 = 0.0  # Times are summed relative to t0 to keep precision
+        self._since_rebase = 0
+        self._reset_sums()
+
+    def _reset_sums(self) -> None:
+        self._st = self._sy = self._stt = self._sty = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self) -> None:
+        order = (self._head + np.arange(self._count)) % len(self._t)
+        self._t = np.concatenate([self._t[order], np.empty(len(self._t))])
+        self._y = np.concatenate([self._y[order], np.empty(len(self._y))])
+        self._head = 0
+
+    def _rebase(self) -> None:
+        """Recompute the sums exactly, relative to the oldest sample"""
+        order = (self._head + np.arange(self._count)) % len(self._t)
+        t = self._t[order]
+        y = self._y[order]
+        self._t0 = float(t[0]) if len(t) else 0.0
+        dt = t - self._t0
+        self._st = float(dt.sum())
+        self._sy = float(y.sum())
+        self._stt = float((dt * dt).sum())
+        self._sty = float((dt * y).sum())
+        self._since_rebase = 0
+
+    def update(self, t: float, y: float) -> None:
+        """
+        Add one sample and drop the samples that fell out of the window.
+
+        Args:
+            t: Sample time in seconds. Must not decrease.
+            y: Sample value
+        """
+        if not math.isfinite(y):
+            return
+        if self._count == len(self._t):
+            self._grow()
+        if self._count == 0:
+            self._t0 = t
+            self._reset_sums()
+
+        tail = (self._head + self._count) % len(self._t)
+        self._t[tail] = t
+        self._y[tail] = y
+        self._count += 1
+        dt = t - self._t0
+        self._st += dt
+        self._sy += y
+        self._stt += dt * dt
+        self._sty += dt * y
+
+        cutoff = t - self.window
+        while self._count and self._t[self._head] < cutoff:
+            dt = self._t[self._head] - self._t0
+            old = self._y[self._head]
+            self._st -= dt
+            self._sy -= old
+            self._stt -= dt * dt
+            self._sty -= dt * old
+            self._head = (self._head + 1) % len(self._t)
+            self._count -= 1
+            self._since_rebase += 1
+
+        # Removing samples accumulates rounding error and lets t - t0 grow;
+        # an exact recompute once per buffer length keeps the cost O(1) amortized
+        if self._since_rebase >= len(self._t):
+            self._rebase()
+
+    def extend(self, t: np.ndarray, y: np.ndarray) -> None:
+        """Add samples in time order"""
+        for ti, yi in zip(t.tolist(), y.tolist()):
+            self.update(ti, yi)
+
+    @property
+    def slope(self) -> Optional[float]:
+        """Slope in units per second, or None if there are too few samples"""
+        n = self._count
+        if n < self.min_samples:
+            return None
+        denominator = n * self._stt - self._st * self._st
+        if denominator <= 0:
+            return None
+        return (n * self._sty - self._st * self._sy) / denominator
+
+
+class SlopeEngine:
+    """
+    Publish the sliding-window slope of streamed channels as `{name}_SLOPE`.
+
+    Usage:
+        engine = SlopeEngine(client, channel_factory, ["PT_OX_02", "PT_FU_02"])
+        engine.start()
+        ...
+        engine.stop()
+    """
+
+    def __init__(
+        self,
+        client: sy.Synnax,
+        channel_factory: ChannelFactory,
+        sources: List[str],
+        window: float = 5.0,
+        min_samples: int = 2,
+    ):
+        """
+        Args:
+            client: Synnax client
+            channel_factory: Factory used to create the slope channels
+            sources: Names of the channels to differentiate
+            window: Least-squares window in seconds
+            min_samples: Fewest samples in the window before a slope is published
+        """
+        self.client = client
+        self.channel_factory = channel_factory
+        self.sources = list(sources)
+        self.window = window
+        self.min_samples = min_samples
+
+        self.slopes: Dict[str, SlidingSlope] = {}
+        self._inputs: Dict[int, Tuple[str, int]] = {}  # data key -> (name, index key)
+        self._outputs: Dict[str, Tuple[int, int]] = {}  # name -> (index, slope) keys
+        self._writer = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _create_channels(self) -> None:
+        """Look up the sources and create their slope channels in one batch"""
+        found = {ch.name: ch for ch in self.client.channels.retrieve(self.sources)}
+        missing = [name for name in self.sources if name not in found]
+        if missing:
+            logger.warning(f"Slope engine cannot find channels: {', '.join(missing)}")
+
+        specs = []
+        for name, channel in found.items():
+            if not channel.index or channel.is_index:
+                logger.warning(f"Skipping {name}: slope needs an indexed channel")
+                continue
+            self._inputs[channel.key] = (name, channel.index)
+            self.slopes[name] = SlidingSlope(self.window, min_samples=self.min_samples)
+            specs.append(
+                ChannelSpec(
+                    name=f"{name}{SLOPE_SUFFIX}_time",
+                    data_type=sy.DataType.TIMESTAMP,
+                    is_index=True,
+                )
+            )
+            specs.append(
+                ChannelSpec(
+                    name=f"{name}{SLOPE_SUFFIX}",
+                    data_type=sy.DataType.FLOAT64,
+                    index=f"{name}{SLOPE_SUFFIX}_time",
+                )
+            )
+
+        channels = self.channel_factory.create_channels(specs)
+        self._outputs = {
+            name: (
+                channels[f"{name}{SLOPE_SUFFIX}_time"].key,
+                channels[f"{name}{SLOPE_SUFFIX}"].key,
+            )
+            for name in self.slopes
+        }
+
+    def start(self) -> None:
+        """Create the slope channels and start streaming in a background thread"""
+        self._create_channels()
+        if not self._inputs:
+            raise ConfigurationError("No indexed source channels for the slope engine")
+
+        keys = set(self._inputs)
+        keys.update(index for _, index in self._inputs.values())
+        streamer = self.client.open_streamer(sorted(keys))
+        self._writer = self.client.open_writer(
+            start=sy.TimeStamp.now(),
+            channels=[key for pair in self._outputs.values() for key in pair],
+            enable_auto_commit=True,
+        )
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(streamer,), name="slope-engine", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Publishing {self.window:g} s slopes of {len(self._inputs)} channels"
+        )
+
+    def stop(self) -> None:
+        """Stop streaming and close the slope writer"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * STREAM_TIMEOUT + 1)
+            self._thread = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _run(self, streamer) -> None:
+        try:
+            while not self._stop.is_set():
+                frame = streamer.read(timeout=STREAM_TIMEOUT)
+                if frame is None:
+                    continue
+                data = self.handle_frame(frame)
+                if data:
+                    self._writer.write(data)
+        except Exception as e:
+            logger.error(f"Slope engine stopped: {e}", exc_info=True)
+        finally:
+            streamer.close()
+
+    def handle_frame(self, frame: sy.Frame) -> Dict[int, np.ndarray]:
+        """
+        Feed one streamed frame into the slopes.
+
+        Returns:
+            Data to write, keyed by output channel key: the latest slope of
+            every source in the frame, stamped with its newest sample time
+        """
+        series = {key: np.asarray(s) for key, s in zip(frame.channels, frame.series)}
+        out: Dict[int, np.ndarray] = {}
+        for key, (name, index_key) in self._inputs.items():
+            values = series.get(key)
+            stamps = series.get(index_key)
+            if values is None or stamps is None or len(values) == 0:
+                continue
+            if len(stamps) != len(values):
+                logger.debug(f"Skipping {name} frame: {len(stamps)} stamps, {len(values)} values")
+                continue
+
+            slope_calc = self.slopes[name]
+            slope_calc.extend(stamps.astype(np.int64) / 1e9, values.astype(np.float64))
+            slope = slope_calc.slope
+            if slope is None:
+                continue
+            index_out, slope_out = self._outputs[name]
+            out[index_out] = np.array([int(stamps[-1])], dtype=np.int64)
+            out[slope_out] = np.array([slope], dtype=np.float64)
+        return out
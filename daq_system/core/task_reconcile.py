@@ -0,0 +1,73 @@
+"""
+Comparison of desired task configurations against the tasks on the server.
+"""
+
+from typing import Optional, Tuple
+import json
+
+import synnax as sy
+from pydantic import BaseModel
+
+# Reconcile actions
+CREATE = "create"  # No task on the server yet
+UNCHANGED = "unchanged"  # Server task already matches, leave it running
+PATCH = "patch"  # Same device and rates, update the channels in place
+RECREATE = "recreate"  # Device or rate changed, delete and create again
+DELETE = "delete"  # Task no longer has any channels
+
+# Settings that require a fresh task when they change
+RECREATE_FIELDS = ("device", "sample_rate", "stream_rate", "state_rate")
+
+
+def task_signature(config: BaseModel) -> Tuple[dict, list]:
+    """
+    Reduce a task config to a comparable (settings, channels) pair.
+
+    Channel keys are random per build, so they are dropped, and channels are
+    compared as an order-independent list.
+    """
+    dumped = config.model_dump(mode="json")
+    channels = dumped.pop("channels", [])
+    for channel in channels:
+        channel.pop("key", None)
+    return dumped, sorted(json.dumps(c, sort_keys=True) for c in channels)
+
+
+def reconcile_action(desired: BaseModel, existing: Optional[sy.Task]) -> str:
+    """
+    Decide what has to happen for the server to match a desired task config.
+
+    Args:
+        desired: Config of the task built from the wiring sheets
+        existing: Task with the same name on the server, if any
+
+    Returns:
+        One of CREATE, UNCHANGED, PATCH, RECREATE or DELETE
+    """
+    has_channels = bool(desired.channels)
+
+    if existing is None:
+        return CREATE if has_channels else UNCHANGED
+    if not has_channels:
+        return DELETE
+
+    config = existing.config
+    if not isinstance(config, str):
+        config = json.dumps(config)
+
+    try:
+        current = type(desired).model_validate_json(config)
+    except Exception:
+        # Not the same kind of task (or an unreadable config): start over
+        return RECREATE
+
+    desired_settings, desired_channels = task_signature(desired)
+    current_settings, current_channels = task_signature(current)
+
+    if any(
+        desired_settings.get(f) != current_settings.get(f) for f in RECREATE_FIELDS
+    ):
+        return RECREATE
+    if desired_settings != current_settings or desired_channels != current_channels:
+        return PATCH
+    return UNCHANGED
@@ -0,0 +1,254 @@
+"""
+Command-to-state latency of every valve on the DO tasks.
+
+The monitor streams each valve's `{name}_cmd` and `{name}_state` channels.
+When a command asks for a value the state does not already have, it times how
+long the state takes to report that value. Both ends are timestamped when the
+frame reaches the monitor, so the figure is the delay an autosequence's
+wait_until sees: driver write, state rate tick, and streaming.
+
+Each measurement is published to `{name}_latency` (ms), indexed by
+`{name}_latency_time`, and kept in a rolling window for summary statistics.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+import numpy as np
+import synnax as sy
+
+from ..processing.channel_factory import ChannelFactory, ChannelSpec
+from ..utils.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+STREAM_TIMEOUT = 0.5  # seconds between checks for stop()
+
+
+@dataclass
+class ValveLatencyStats:
+    """Summary of the recent command-to-state latencies of one valve, in ms"""
+
+    valve: str
+    count: int
+    last: float
+    mean: float
+    p50: float
+    p95: float
+    max: float
+
+
+class ValveLatencyMonitor:
+    """
+    Measure and publish the command-to-state latency of DO valves.
+
+    Usage:
+        monitor = ValveLatencyMonitor(client, channel_factory, ["PV_FU_02"])
+        monitor.start()
+        ...
+        logger.info(monitor.summary_table())
+        monitor.stop()
+    """
+
+    def __init__(
+        self,
+        client: sy.Synnax,
+        channel_factory: ChannelFactory,
+        valves: List[str],
+        window: int = 100,
+        publish: bool = True,
+    ):
+        """
+        Args:
+            client: Synnax client
+            channel_factory: Factory used to create the latency channels
+            valves: DO channel names, as in the control wiring sheet
+            window: Number of recent measurements kept per valve
+            publish: Write every measurement to the valve's latency channel
+        """
+        self.client = client
+        self.channel_factory = channel_factory
+        self.valves = list(valves)
+        self.publish = publish
+
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {
+            valve: deque(maxlen=window) for valve in self.valves
+        }
+        self._state: Dict[str, int] = {}
+        self._pending: Dict[str, Tuple[int, int]] = {}  # valve -> (value, ns)
+        self._roles: Dict[int, Tuple[str, str]] = {}  # key -> (valve, cmd|state)
+        self._latency_keys: Dict[str, Tuple[int, int]] = {}  # valve -> (index, data)
+        self._writer = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _create_channels(self) -> None:
+        """Look up the cmd/state channels and create the latency channels"""
+        if self.publish:
+            specs = []
+            for valve in self.valves:
+                specs.append(
+                    ChannelSpec(
+                        name=f"{valve}_latency_time",
+                        data_type=sy.DataType.TIMESTAMP,
+                        is_index=True,
+                    )
+                )
+                specs.append(
+                    ChannelSpec(
+                        name=f"{valve}_latency",
+                        data_type=sy.DataType.FLOAT32,
+                        index=f"{valve}_latency_time",
+                    )
+                )
+            channels = self.channel_factory.create_channels(specs)
+            self._latency_keys = {
+                valve: (
+                    channels[f"{valve}_latency_time"].key,
+                    channels[f"{valve}_latency"].key,
+                )
+                for valve in self.valves
+            }
+
+        names = [f"{v}_cmd" for v in self.valves] + [f"{v}_state" for v in self.valves]
+        for channel in self.client.channels.retrieve(names):
+            valve, _, role = channel.name.rpartition("_")
+            self._roles[channel.key] = (valve, role)
+
+        missing = set(names) - {f"{v}_{r}" for v, r in self._roles.values()}
+        if missing:
+            logger.warning(
+                f"Latency monitor cannot find channels: {', '.join(sorted(missing))}"
+            )
+
+    def start(self) -> None:
+        """Create the channels and start streaming in a background thread"""
+        self._create_channels()
+        if not self._roles:
+            raise ConfigurationError("No cmd/state channels to monitor")
+
+        streamer = self.client.open_streamer(list(self._roles))
+        if self._latency_keys:
+            keys = [key for pair in self._latency_keys.values() for key in pair]
+            self._writer = self.client.open_writer(
+                start=sy.TimeStamp.now(), channels=keys, enable_auto_commit=True
+            )
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(streamer,), name="valve-latency", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Monitoring command-to-state latency of {len(self.valves)} valves")
+
+    def stop(self) -> None:
+        """Stop streaming and close the latency writer"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * STREAM_TIMEOUT + 1)
+            self._thread = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _run(self, streamer) -> None:
+        try:
+            while not self._stop.is_set():
+                frame = streamer.read(timeout=STREAM_TIMEOUT)
+                if frame is None:
+                    continue
+                self.handle_frame(frame, time.time_ns())
+        except Exception as e:
+            logger.error(f"Valve latency monitor stopped: {e}", exc_info=True)
+        finally:
+            streamer.close()
+
+    def handle_frame(self, frame: sy.Frame, received_ns: int) -> None:
+        """
+        Update the pending commands and measurements from one streamed frame.
+
+        Args:
+            frame: Frame holding cmd and/or state series
+            received_ns: When the frame arrived, in ns since the epoch
+        """
+        measured: List[Tuple[str, float]] = []
+        with self._lock:
+            for key, series in zip(frame.channels, frame.series):
+                role = self._roles.get(key)
+                if role is None or len(series) == 0:
+                    continue
+                valve, kind = role
+                value = int(np.asarray(series)[-1])
+
+                if kind == "cmd":
+                    if self._state.get(valve) != value:
+                        self._pending[valve] = (value, received_ns)
+                    else:
+                        self._pending.pop(valve, None)
+                    continue
+
+                self._state[valve] = value
+                pending = self._pending.get(valve)
+                if pending is not None and pending[0] == value:
+                    latency = (received_ns - pending[1]) / 1e6
+                    self._samples[valve].append(latency)
+                    del self._pending[valve]
+                    measured.append((valve, latency))
+
+        if measured and self._writer is not None:
+            self._publish(measured, received_ns)
+
+    def _publish(self, measured: List[Tuple[str, float]], stamp: int) -> None:
+        data = {}
+        for valve, latency in measured:
+            index_key, data_key = self._latency_keys[valve]
+            data[index_key] = np.array([stamp], dtype=np.int64)
+            data[data_key] = np.array([latency], dtype=np.float32)
+        try:
+            self._writer.write(data)
+        except Exception as e:
+            logger.warning(f"Could not publish valve latency: {e}")
+
+    def stats(self) -> List[ValveLatencyStats]:
+        """Statistics of every valve with at least one measurement"""
+        with self._lock:
+            samples = {v: list(s) for v, s in self._samples.items() if s}
+
+        result = []
+        for valve, values in samples.items():
+            arr = np.asarray(values)
+            result.append(
+                ValveLatencyStats(
+                    valve=valve,
+                    count=len(arr),
+                    last=float(arr[-1]),
+                    mean=float(arr.mean()),
+                    p50=float(np.percentile(arr, 50)),
+                    p95=float(np.percentile(arr, 95)),
+                    max=float(arr.max()),
+                )
+            )
+        return result
+
+    def summary_table(self) -> str:
+        """Plain-text table of stats(), one row per valve"""
+        rows = self.stats()
+        if not rows:
+            return "No command-to-state latencies measured yet"
+
+        width = max(len("Valve"), *(len(r.valve) for r in rows))
+        lines = [
+            f"{'Valve':<{width}}  {'n':>5}  {'last':>8}  {'mean':>8}  "
+            f"{'p50':>8}  {'p95':>8}  {'max':>8}  (ms)"
+        ]
+        for r in rows:
+            lines.append(
+                f"{r.valve:<{width}}  {r.count:>5}  {r.last:>8.2f}  {r.mean:>8.2f}  "
+                f"{r.p50:>8.2f}  {r.p95:>8.2f}  {r.max:>8.2f}"
+            )
+        return "\n".join(lines)
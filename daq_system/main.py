@@ -1,6 +1,5 @@
-import pandas as pd  # type: ignore
 import logging
-from daq_system.config.settings import DAQConfig, DEFAULT_DEVICE_PATHS
+from daq_system.config.settings import DAQConfig
 from daq_system.core.daq_system import DAQSystem
 from daq_system.utils.exceptions import DAQError
 from daq_system.utils.logging_config import setup_logging
@@ -21,21 +20,20 @@ def main():
         config = DAQConfig()
         daq_system = DAQSystem(config)
 
-        # Process each device
-        for device_name, paths in DEFAULT_DEVICE_PATHS.items():
-            logger.info(f"\nProcessing {device_name}...")
-
-            # Get device
-            device = daq_system.client.devices.retrieve(
-                model="USB-6343", location=device_name
+        # Match every device on the rack to its wiring files
+        device_paths = daq_system.discovery.wiring_paths()
+        if not device_paths:
+            raise DAQError(
+                f"No {config.device_model} devices with wiring files in {config.wiring_dir}"
             )
 
-            # Read configuration files
-            data_wiring = pd.ExcelFile(paths.data_wiring)
-            control_wiring = pd.ExcelFile(paths.control_wiring)
+        # Bring up every device (concurrently unless config.parallel_setup is off)
+        results = daq_system.setup_devices(device_paths)
+        daq_system.report_startup_profile()
 
-            # Use the new setup_device method which handles everything
-            daq_system.setup_device(device, data_wiring, control_wiring, device_name)
+        failed = [name for name, result in results.items() if not result.ok]
+        if failed:
+            raise DAQError(f"Device setup failed for: {', '.join(failed)}")
 
     except DAQError as e:
         logger.error(f"DAQ Error: {e}")
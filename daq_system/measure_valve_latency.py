@@ -0,0 +1,79 @@
+"""
+Watch the command-to-state latency of every valve until interrupted.
+
+Latencies are published to `{valve}_latency` channels (ms) and a summary is
+logged periodically:
+
+    python -m daq_system.measure_valve_latency --device Dev5 --interval 30
+"""
+
+import argparse
+import logging
+import time
+
+from daq_system.config.settings import DAQConfig
+from daq_system.core.daq_system import DAQSystem
+from daq_system.core.valve_latency import ValveLatencyMonitor
+from daq_system.processing.wiring import load_device_wiring
+from daq_system.utils.exceptions import DAQError
+from daq_system.utils.logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure and publish DO command-to-state latency per valve"
+    )
+    parser.add_argument(
+        "--device",
+        action="append",
+        help="Device location to monitor (repeatable). Defaults to every device.",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=10, help="Seconds between summaries"
+    )
+    parser.add_argument(
+        "--no-publish",
+        action="store_true",
+        help="Only log the summaries, do not write latency channels",
+    )
+    args = parser.parse_args()
+
+    config = DAQConfig()
+    daq_system = DAQSystem(config)
+
+    device_paths = daq_system.discovery.wiring_paths()
+    if args.device:
+        device_paths = {
+            name: paths for name, paths in device_paths.items() if name in args.device
+        }
+    if not device_paths:
+        raise DAQError("No devices with wiring files to monitor")
+
+    valves = []
+    for paths in device_paths.values():
+        wiring = load_device_wiring(paths.data_wiring, paths.control_wiring)
+        valves.extend(wiring.digital_outputs["name"])
+
+    monitor = ValveLatencyMonitor(
+        daq_system.client,
+        daq_system.channel_factory,
+        valves,
+        window=config.valve_latency_window,
+        publish=not args.no_publish,
+    )
+    monitor.start()
+    try:
+        while True:
+            time.sleep(args.interval)
+            logger.info("Command-to-state latency:\n" + monitor.summary_table())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+
+
+if __name__ == "__main__":
+    main()
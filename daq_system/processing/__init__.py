@@ -4,11 +4,30 @@ Data processing modules for different types of inputs and outputs.
 
 from .analog import process_analog_input
 from .digital import process_digital_input, process_digital_output
-from .channel_factory import ChannelFactory
+from .channel_factory import ChannelFactory, ChannelSpec
+from .channel_registry import ChannelRegistry
+from .wiring import DeviceWiring, load_device_wiring
+from .wiring_diff import WiringDiff, diff_wiring
+from .derived_channels import (
+    DerivedChannelSpec,
+    build_derived_channels,
+    load_derived_spec,
+    provision_derived_channels,
+)
 
 __all__ = [
     "process_analog_input",
     "process_digital_input",
     "process_digital_output",
     "ChannelFactory",
+    "ChannelSpec",
+    "ChannelRegistry",
+    "DeviceWiring",
+    "load_device_wiring",
+    "WiringDiff",
+    "diff_wiring",
+    "DerivedChannelSpec",
+    "build_derived_channels",
+    "load_derived_spec",
+    "provision_derived_channels",
 ]
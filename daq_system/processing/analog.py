@@ -1,47 +1,56 @@
 import pandas as pd
 import synnax as sy
 from synnax import ni
-from .channel_factory import ChannelFactory
+from .channel_factory import ChannelFactory, ChannelSpec
 
 
 def process_analog_input(
-    data: pd.ExcelFile,
+    sensors: pd.DataFrame,
     analog_read_task: ni.AnalogReadTask,
     device: sy.Device,
     channel_factory: ChannelFactory,
     stream_rate: int,
     device_name: str,
 ):
-    """Process analog input configuration"""
-    sensors = data.parse("AI_slope-offset")
-
-    for _, row in sensors.iterrows():
-        # Create timestamp channel
-        
-        bcls_ai_time = channel_factory.create_timestamp_channel(f"{device_name}_BCLS_ai_time")
-
-        # Create sensor channel
-        sensor_channel = channel_factory.create_data_channel(
-            name=row["Name"],
-            data_type=sy.DataType.FLOAT32,
-            index_key=bcls_ai_time.key,
-        )
+    """
+    Process analog input configuration
+
+    Args:
+        sensors: Analog input table from wiring.parse_analog_inputs
+    """
+    # Without AI rows there is nothing to index, so no ai_time channel either
+    if sensors.empty:
+        return
+
+    # Every AI channel on a card shares one timestamp index
+    ai_time_name = f"{device_name}_BCLS_ai_time"
+
+    specs = [
+        ChannelSpec(name=ai_time_name, data_type=sy.DataType.TIMESTAMP, is_index=True)
+    ]
+    specs += [
+        ChannelSpec(name=name, data_type=sy.DataType.FLOAT32, index=ai_time_name)
+        for name in sensors["name"]
+    ]
+
+    # Create or retrieve every channel for the device in one batch
+    channels = channel_factory.create_channels(specs)
 
-        # Extract channel number
-        channel_num = int(row["Channel"].split("/")[-1][2:])
+    for row in sensors.itertuples(index=False):
+        sensor_channel = channels[row.name]
 
         # Create AI voltage channel
         ai_chan = ni.AIVoltageChan(
-            min_val=row["min Volts"],
-            max_val=row["max Volts"] * row["Slope"] + row["Offset"] - 0.001,
+            min_val=row.min_volts,
+            max_val=row.max_volts * row.slope + row.offset - 0.001,
             channel=sensor_channel.key,
-            port=channel_num,
+            port=int(row.port),
             device=device.key,
             custom_scale=ni.LinScale(
-                slope=row["Slope"],
-                y_intercept=row["Offset"],
+                slope=row.slope,
+                y_intercept=row.offset,
                 pre_scaled_units="Volts",
-                scaled_units=row["Engineering Units"],
+                scaled_units=row.units,
             ),
             terminal_config="Diff",
         )
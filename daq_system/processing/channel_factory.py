@@ -1,38 +1,155 @@
 import synnax as sy
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..utils.exceptions import ConfigurationError
+from .channel_registry import ChannelRegistry
+
+
+@dataclass
+class ChannelSpec:
+    """Description of a channel to be created or retrieved in bulk"""
+
+    name: str
+    data_type: sy.DataType
+    is_index: bool = False
+    index: Optional[str] = None  # Name of the index channel, resolved to a key
+    virtual: bool = False
 
 
 class ChannelFactory:
     """Factory class for creating Synnax channels"""
 
-    def __init__(self, client: sy.Synnax):
+    def __init__(self, client: sy.Synnax, registry: Optional[ChannelRegistry] = None):
         self.client = client
+        self.registry = registry if registry is not None else ChannelRegistry()
 
     def create_timestamp_channel(self, name: str) -> sy.Channel:
         """Create a timestamp channel that can be used as an index"""
-        return self.client.channels.create(
+        cached = self.registry.get(name)
+        if cached is not None:
+            return cached
+
+        channel = self.client.channels.create(
             name=name,
             is_index=True,
             data_type=sy.DataType.TIMESTAMP,
             retrieve_if_name_exists=True,
         )
+        self.registry.add([channel])
+        return channel
 
     def create_data_channel(
         self, name: str, data_type: sy.DataType, index_key: str
     ) -> sy.Channel:
         """Create a data channel with an index"""
-        return self.client.channels.create(
+        cached = self.registry.get(name)
+        if cached is not None:
+            return cached
+
+        channel = self.client.channels.create(
             name=name,
             data_type=data_type,
             index=index_key,
             retrieve_if_name_exists=True,
         )
+        self.registry.add([channel])
+        return channel
 
     def create_virtual_channel(self, name: str, data_type: sy.DataType) -> sy.Channel:
         """Create a virtual channel (for commands)"""
-        return self.client.channels.create(
+        cached = self.registry.get(name)
+        if cached is not None:
+            return cached
+
+        channel = self.client.channels.create(
             name=name,
             data_type=data_type,
             retrieve_if_name_exists=True,
             virtual=True,
         )
+        self.registry.add([channel])
+        return channel
+
+    def create_channels(self, specs: List[ChannelSpec]) -> Dict[str, sy.Channel]:
+        """
+        Create or retrieve a batch of channels in as few round trips as possible.
+
+        Channels already in the registry are not sent to the server at all. The
+        remaining existing channels are retrieved by name in a single request.
+        Missing index and virtual channels are then created together, followed by
+        every missing data channel once the keys of their indexes are known.
+
+        Args:
+            specs: Channel specifications. Duplicate names are only created once.
+
+        Returns:
+            Dictionary mapping channel name to the created or retrieved channel
+        """
+        unique: Dict[str, ChannelSpec] = {}
+        for spec in specs:
+            unique.setdefault(spec.name, spec)
+
+        if not unique:
+            return {}
+
+        # Index channels referenced by a spec but not declared in the batch still
+        # have to be looked up so their keys can be used.
+        names = list(unique)
+        names += sorted(
+            {s.index for s in unique.values() if s.index and s.index not in unique}
+        )
+
+        resolved: Dict[str, sy.Channel] = {}
+        for name in names:
+            cached = self.registry.get(name)
+            if cached is not None:
+                resolved[name] = cached
+
+        to_retrieve = [name for name in names if name not in resolved]
+        if to_retrieve:
+            retrieved = self.client.channels.retrieve(to_retrieve)
+            self.registry.add(retrieved)
+            resolved.update({ch.name: ch for ch in retrieved})
+
+        missing = [s for s in unique.values() if s.name not in resolved]
+        independent = [s for s in missing if s.index is None]
+        dependent = [s for s in missing if s.index is not None]
+
+        # Indexes (and virtual channels) first, then anything that depends on them
+        self._create_batch(independent, resolved)
+        self._create_batch(dependent, resolved)
+
+        return {name: resolved[name] for name in unique}
+
+    def _create_batch(
+        self, specs: List[ChannelSpec], resolved: Dict[str, sy.Channel]
+    ) -> None:
+        """Create a batch of channels in one request and add them to resolved"""
+        if not specs:
+            return
+
+        channels = []
+        for spec in specs:
+            index_key = 0
+            if spec.index is not None:
+                if spec.index not in resolved:
+                    raise ConfigurationError(
+                        f"Index channel '{spec.index}' for '{spec.name}' could not be resolved"
+                    )
+                index_key = resolved[spec.index].key
+
+            channels.append(
+                sy.Channel(
+                    name=spec.name,
+                    data_type=spec.data_type,
+                    is_index=spec.is_index,
+                    index=index_key,
+                    virtual=spec.virtual,
+                )
+            )
+
+        created = self.client.channels.create(channels)
+        self.registry.add(created)
+        for channel in created:
+            resolved[channel.name] = channel
@@ -0,0 +1,35 @@
+import threading
+import synnax as sy
+from typing import Dict, Iterable, Optional
+
+
+class ChannelRegistry:
+    """Per-run cache of resolved Synnax channels, keyed by channel name"""
+
+    def __init__(self):
+        self._channels: Dict[str, sy.Channel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[sy.Channel]:
+        """Return the resolved channel with the given name, if any"""
+        with self._lock:
+            return self._channels.get(name)
+
+    def add(self, channels: Iterable[sy.Channel]) -> None:
+        """Record resolved channels so later lookups skip the server"""
+        with self._lock:
+            for channel in channels:
+                self._channels[channel.name] = channel
+
+    def clear(self) -> None:
+        """Forget every resolved channel"""
+        with self._lock:
+            self._channels.clear()
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._channels
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._channels)
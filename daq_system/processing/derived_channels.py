@@ -0,0 +1,326 @@
+"""
+Server-side derived (calculated) channels declared in a YAML spec.
+
+Each entry of the spec describes one kind of derived signal and the channels it
+applies to. Sources may be glob patterns, so one entry can cover every tank PT:
+
+    defaults:
+      window: 5            # seconds
+    derived:
+      - kind: slope
+        sources: ["PT_OX_*", "PT_FU_*"]
+      - kind: moving_average
+        sources: ["PT_CHAMBER"]
+        window: 0.5
+      - kind: differential
+        name: DP_OX_INJECTOR
+        upstream: PT_OX_04
+        downstream: PT_CHAMBER
+      - kind: mass_flow
+        name: MDOT_OX
+        upstream: PT_OX_04
+        downstream: PT_CHAMBER
+        cd: 0.62
+        area: 3.1e-5       # m^2
+        density: 1141      # kg/m^3
+
+provision_derived_channels creates or updates every channel of the spec in one
+batch after resolving all of their source channels in a single request.
+"""
+
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+import os
+import re
+
+import synnax as sy
+import yaml
+
+from ..utils.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 5.0  # seconds
+PSI_TO_PA = 6894.757
+
+CREATE = "create"
+UPDATE = "update"
+UNCHANGED = "unchanged"
+
+# Default names of the channels derived from one source
+NAME_TEMPLATES = {
+    "slope": "{source}_SLOPE_{window:g}S",
+    "moving_average": "{source}_AVG_{window:g}S",
+}
+
+# Channels read through Lua globals must have identifier names
+_LUA_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Slope between the first and last sample of the window, as in the original
+# single-channel pt_slope.py script
+_SLOPE_LUA = """
+local window_size_ns = {window_ns}
+local pressure_channel = channels["{source}"]
+
+local pressure_window = pressure_channel:window(
+    window_size_ns,
+    time - window_size_ns,
+    time
+)
+
+local oldest_sample = pressure_window:first()
+local newest_sample = pressure_window:last()
+
+if oldest_sample == nil or newest_sample == nil then
+    return nil
+end
+
+local delta_time_s = (newest_sample.time - oldest_sample.time) / 1000000000
+if delta_time_s == 0 then
+    return nil
+end
+
+return (newest_sample.value - oldest_sample.value) / delta_time_s
+"""
+
+_MASS_FLOW_LUA = """
+local dp = ({upstream} - {downstream}) * {psi_to_pa}
+if dp <= 0 then
+    return 0
+end
+return {cd} * {area} * math.sqrt(2 * {density} * dp)
+"""
+
+
+@dataclass
+class DerivedChannelSpec:
+    """One entry of the derived channel spec"""
+
+    kind: str  # "slope", "moving_average", "differential" or "mass_flow"
+    sources: List[str] = field(default_factory=list)  # Names or glob patterns
+    name: Optional[str] = None  # Template with {source} and {window}
+    window: float = DEFAULT_WINDOW  # seconds
+    upstream: Optional[str] = None
+    downstream: Optional[str] = None
+    cd: float = 1.0  # Discharge coefficient
+    area: float = 0.0  # m^2
+    density: float = 0.0  # kg/m^3
+
+
+@dataclass
+class DerivedChannel:
+    """A calculated channel ready to be created on the server"""
+
+    name: str
+    expression: str
+    requires: List[str]  # Source channel names
+    data_type: sy.DataType = sy.DataType.FLOAT64
+    operations: Optional[List[sy.channel.Operation]] = None
+
+
+def load_derived_spec(path: Union[str, os.PathLike]) -> List[DerivedChannelSpec]:
+    """
+    Read a derived channel spec from YAML.
+
+    Raises:
+        ConfigurationError: If the file is missing or an entry is invalid
+    """
+    try:
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        raise ConfigurationError(f"Cannot read derived channel spec {path}: {e}")
+
+    defaults = data.get("defaults", {})
+    specs = []
+    for i, entry in enumerate(data.get("derived", [])):
+        entry = {**defaults, **entry}
+        if isinstance(entry.get("sources"), str):
+            entry["sources"] = [entry["sources"]]
+        try:
+            specs.append(DerivedChannelSpec(**entry))
+        except TypeError as e:
+            raise ConfigurationError(f"{path}: derived entry {i + 1}: {e}")
+    return specs
+
+
+def _expand_sources(patterns: List[str], available: Iterable[str]) -> List[str]:
+    """Expand glob patterns against the available channel names, keeping order"""
+    available = list(available)
+    expanded: List[str] = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            matches = [name for name in available if fnmatchcase(name, pattern)]
+            if not matches:
+                logger.warning(f"Derived channel pattern {pattern} matches no channels")
+        else:
+            matches = [pattern]
+        expanded += [m for m in matches if m not in expanded]
+    return expanded
+
+
+def _lua_name(name: str, spec: DerivedChannelSpec) -> str:
+    if not _LUA_NAME.match(name):
+        raise ConfigurationError(
+            f"{spec.kind} channel {spec.name}: source {name} is not a valid Lua name"
+        )
+    return name
+
+
+def build_derived_channels(
+    specs: List[DerivedChannelSpec], available: Iterable[str] = ()
+) -> List[DerivedChannel]:
+    """
+    Turn spec entries into concrete calculated channels.
+
+    Args:
+        specs: Entries from load_derived_spec
+        available: Channel names that glob patterns in sources are matched against
+
+    Returns:
+        Derived channels in spec order
+
+    Raises:
+        ConfigurationError: For an unknown kind or missing parameters
+    """
+    available = list(available)
+    channels: List[DerivedChannel] = []
+    for spec in specs:
+        if spec.window <= 0:
+            raise ConfigurationError(f"{spec.kind} window must be positive")
+
+        if spec.kind in NAME_TEMPLATES:
+            template = spec.name or NAME_TEMPLATES[spec.kind]
+            for source in _expand_sources(spec.sources, available):
+                name = template.format(source=source, window=spec.window)
+                if spec.kind == "slope":
+                    expression = _SLOPE_LUA.format(
+                        window_ns=int(spec.window * 1e9), source=source
+                    )
+                    operations = None
+                else:
+                    # Averaging is done by the server's aggregation operation
+                    expression = f"return {_lua_name(source, spec)}"
+                    operations = [
+                        sy.channel.Operation(
+                            type="avg", duration=sy.TimeSpan(int(spec.window * 1e9))
+                        )
+                    ]
+                channels.append(
+                    DerivedChannel(name, expression.strip(), [source], operations=operations)
+                )
+
+        elif spec.kind in ("differential", "mass_flow"):
+            if not (spec.name and spec.upstream and spec.downstream):
+                raise ConfigurationError(
+                    f"{spec.kind} channels need a name, upstream and downstream"
+                )
+            upstream = _lua_name(spec.upstream, spec)
+            downstream = _lua_name(spec.downstream, spec)
+            if spec.kind == "differential":
+                expression = f"return {upstream} - {downstream}"
+            else:
+                if spec.area <= 0 or spec.density <= 0:
+                    raise ConfigurationError(
+                        f"mass_flow channel {spec.name} needs a positive area and density"
+                    )
+                expression = _MASS_FLOW_LUA.format(
+                    upstream=upstream,
+                    downstream=downstream,
+                    psi_to_pa=PSI_TO_PA,
+                    cd=spec.cd,
+                    area=spec.area,
+                    density=spec.density,
+                ).strip()
+            channels.append(DerivedChannel(spec.name, expression, [upstream, downstream]))
+
+        else:
+            raise ConfigurationError(f"Unknown derived channel kind: {spec.kind}")
+
+    names = [c.name for c in channels]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ConfigurationError(
+            f"Derived channel names are not unique: {', '.join(duplicates)}"
+        )
+    return channels
+
+
+def _same_definition(existing: sy.Channel, derived: DerivedChannel) -> bool:
+    def dump(operations):
+        return [op.model_dump() for op in operations or []]
+
+    return (
+        (existing.expression or "") == derived.expression
+        and sy.DataType(existing.data_type) == derived.data_type
+        and dump(existing.operations) == dump(derived.operations)
+    )
+
+
+def provision_derived_channels(
+    client: sy.Synnax, channels: List[DerivedChannel], dry_run: bool = False
+) -> Dict[str, str]:
+    """
+    Create or update derived channels on the server in one batch.
+
+    Every source channel and every existing derived channel is looked up in a
+    single request. Nothing is created unless all sources exist. Existing
+    channels whose expression, data type or operations differ are redefined in
+    place, keeping their keys.
+
+    Args:
+        client: Synnax client
+        channels: Channels from build_derived_channels
+        dry_run: Work out the actions without changing anything
+
+    Returns:
+        Dictionary mapping channel name to CREATE, UPDATE or UNCHANGED
+
+    Raises:
+        ConfigurationError: If source channels are missing
+    """
+    if not channels:
+        return {}
+
+    sources = sorted({name for c in channels for name in c.requires})
+    derived_names = [c.name for c in channels]
+    found = {ch.name: ch for ch in client.channels.retrieve(sources + derived_names)}
+
+    missing = [name for name in sources if name not in found]
+    if missing:
+        raise ConfigurationError(
+            f"Derived channels need missing source channels: {', '.join(missing)}"
+        )
+
+    actions: Dict[str, str] = {}
+    batch: List[sy.Channel] = []
+    for derived in channels:
+        existing = found.get(derived.name)
+        if existing is not None and not existing.expression:
+            raise ConfigurationError(
+                f"{derived.name} already exists and is not a calculated channel"
+            )
+        if existing is not None and _same_definition(existing, derived):
+            actions[derived.name] = UNCHANGED
+            continue
+
+        actions[derived.name] = CREATE if existing is None else UPDATE
+        # Passing the key of an existing calculated channel redefines it
+        batch.append(
+            sy.Channel(
+                name=derived.name,
+                key=existing.key if existing is not None else 0,
+                data_type=derived.data_type,
+                expression=derived.expression,
+                operations=derived.operations,
+            )
+        )
+
+    if batch and not dry_run:
+        client.channels.create(batch)
+
+    for name, action in actions.items():
+        logger.info(f"Derived channel {name}: {action}")
+    return actions
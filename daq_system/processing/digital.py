@@ -1,105 +1,108 @@
 import pandas as pd
 import synnax as sy
 from synnax import ni
-from .channel_factory import ChannelFactory
-
-STATE_RATE = 1000  # Hz
+from .channel_factory import ChannelFactory, ChannelSpec
 
 
 def process_digital_input(
-    data: pd.ExcelFile,
+    sensors: pd.DataFrame,
     digital_read_task: ni.DigitalReadTask,
     device: sy.Device,
     channel_factory: ChannelFactory,
 ):
-    """Process digital input configuration"""
-
-    sensors = data.parse("DI")
-
-    for _, row in sensors.iterrows():
-
-        # Create timestamp channel
-
-        name = row["Name"]
-
-        bcls_di_time = channel_factory.create_timestamp_channel(f"BCLS_di_time_{name}")
-
-        # Create sensor channel - note: no units for digital channels
-
-        sensor_channel = channel_factory.create_data_channel(
-            name=row["Name"],
-            data_type=sy.DataType.UINT8,
-            index_key=bcls_di_time.key,
+    """
+    Process digital input configuration
+
+    Args:
+        sensors: Digital input table from wiring.parse_digital_inputs
+    """
+
+    # Each DI channel has its own timestamp index
+    specs = []
+    for name in sensors["name"]:
+        specs.append(
+            ChannelSpec(
+                name=f"BCLS_di_time_{name}",
+                data_type=sy.DataType.TIMESTAMP,
+                is_index=True,
+            )
+        )
+        # Sensor channel - note: no units for digital channels
+        specs.append(
+            ChannelSpec(
+                name=name,
+                data_type=sy.DataType.UINT8,
+                index=f"BCLS_di_time_{name}",
+            )
         )
 
-        # Extract channel number
+    # Create or retrieve every channel for the device in one batch
+    channels = channel_factory.create_channels(specs)
+
+    for row in sensors.itertuples(index=False):
 
-        channel_num = int("".join(filter(str.isdigit, row["Channel"].split("/")[-1])))
+        sensor_channel = channels[row.name]
 
         # Create DI channel
 
         di_chan = ni.DIChan(
             channel=sensor_channel.key,
-            port=0,
-            line=channel_num,
+            port=int(row.port),
+            line=int(row.line),
         )
 
         digital_read_task.config.channels.append(di_chan)
 
 
 def process_digital_output(
-    data: pd.ExcelFile,
+    sensors: pd.DataFrame,
     digital_write_task: ni.DigitalWriteTask,
     device: sy.Device,
     channel_factory: ChannelFactory,
-    sample_rate: int,
+    state_rate: int,
     device_name: str,
 ):
+    """
+    Process digital output configuration
 
-    state_time_chan = channel_factory.client.channels.create(
-        name=f"{device_name}_state_time",
-        is_index=True,
-        data_type=sy.DataType.TIMESTAMP,
-        retrieve_if_name_exists=True,
-    )
-
-    """Process digital output configuration"""
-    sensors = data.parse("DO")
-    for _, row in sensors.iterrows():
-        name = row["Name"]
-
-        # 1. Create command channel (virtual) - no index or rate for virtual channels
-        cmd_chan = channel_factory.client.channels.create(
-            name=f"{name}_cmd",
-            data_type=sy.DataType.UINT8,
-            retrieve_if_name_exists=True,
-            virtual=True,
+    Args:
+        sensors: Digital output table from wiring.parse_digital_outputs
+    """
+    state_time_name = f"{device_name}_state_time"
+
+    specs = [
+        ChannelSpec(
+            name=state_time_name, data_type=sy.DataType.TIMESTAMP, is_index=True
+        )
+    ]
+    for name in sensors["name"]:
+        # 1. Command channel (virtual) - no index or rate for virtual channels
+        specs.append(
+            ChannelSpec(name=f"{name}_cmd", data_type=sy.DataType.UINT8, virtual=True)
         )
 
-        # 3. Create state channel with index pointing to the timestamp channel
-        state_chan = channel_factory.client.channels.create(
-            name=f"{name}_state",
-            data_type=sy.DataType.UINT8,
-            index= state_time_chan.key,
-            retrieve_if_name_exists=True,
+        # 2. State channel with index pointing to the timestamp channel
+        specs.append(
+            ChannelSpec(
+                name=f"{name}_state",
+                data_type=sy.DataType.UINT8,
+                index=state_time_name,
+            )
         )
 
-        # Extract line number correctly
-        if "line" in row:
-            line = int(row["line"])
-        else:
-            # Extract from channel string as fallback
-            try:
-                line = int(row["Channel"].split("/")[-1][4:])
-            except (IndexError, ValueError):
-                line = int("".join(filter(str.isdigit, row["Channel"].split("/")[-1])))
+    # Create or retrieve every channel for the device in one batch
+    channels = channel_factory.create_channels(specs)
+
+    for row in sensors.itertuples(index=False):
+        cmd_chan = channels[f"{row.name}_cmd"]
+        state_chan = channels[f"{row.name}_state"]
 
         # Create DO channel configuration
         do_chan = ni.DOChan(
             cmd_channel=cmd_chan.key,
             state_channel=state_chan.key,
-            port=0,
-            line=line,
+            port=int(row.port),
+            line=int(row.line),
         )
 
         # Add the channel to the task
@@ -0,0 +1,209 @@
+"""
+Typed wiring model parsed from the CMS wiring workbooks.
+
+Each sheet is parsed once with vectorized pandas operations into a table with
+fixed columns and dtypes. Bad rows are reported when the sheet is parsed rather
+than partway through task creation.
+"""
+
+from dataclasses import dataclass
+from typing import List, Union
+import os
+import re
+
+import pandas as pd
+
+from ..utils.exceptions import ConfigurationError
+from ..utils.workbook_cache import read_sheet
+
+WiringSource = Union[str, os.PathLike, pd.ExcelFile]
+
+AI_SHEET = "AI_slope-offset"
+DI_SHEET = "DI"
+DO_SHEET = "DO"
+
+# Columns and dtypes of the parsed tables
+AI_COLUMNS = {
+    "name": "string",
+    "port": "int64",
+    "slope": "float64",
+    "offset": "float64",
+    "min_volts": "float64",
+    "max_volts": "float64",
+    "units": "string",
+}
+DIGITAL_COLUMNS = {
+    "name": "string",
+    "port": "int64",
+    "line": "int64",
+}
+
+
+@dataclass
+class DeviceWiring:
+    """Parsed wiring tables for a single device"""
+
+    analog_inputs: pd.DataFrame
+    digital_inputs: pd.DataFrame
+    digital_outputs: pd.DataFrame
+
+
+def _empty(columns: dict) -> pd.DataFrame:
+    return pd.DataFrame({col: pd.Series(dtype=dt) for col, dt in columns.items()})
+
+
+def _drop_blank_rows(sheet: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows with neither a name nor a channel (spacer rows in the workbook)"""
+    return sheet[sheet["Name"].notna() | sheet["Channel"].notna()]
+
+
+def _row_labels(sheet: pd.DataFrame, mask: pd.Series) -> List[str]:
+    # +2 turns the zero-based index into the spreadsheet row (header is row 1)
+    return [f"row {i + 2} ({name})" for i, name in sheet.loc[mask, "Name"].items()]
+
+
+def _check(
+    sheet: pd.DataFrame, mask: pd.Series, sheet_name: str, problem: str
+) -> None:
+    """Raise ConfigurationError listing every row where mask is True"""
+    if mask.any():
+        raise ConfigurationError(
+            f"{sheet_name}: {problem}: {', '.join(_row_labels(sheet, mask))}"
+        )
+
+
+def _check_unique(
+    sheet: pd.DataFrame,
+    values: Union[pd.Series, pd.DataFrame],
+    sheet_name: str,
+    what: str,
+) -> None:
+    _check(sheet, values.duplicated(keep=False), sheet_name, f"duplicate {what}")
+
+
+def _last_segment_number(channel: pd.Series) -> pd.Series:
+    """
+    Digits of the last segment of a physical channel,
+    e.g. 'Dev5/ai12' -> 12, 'Dev5/port0/line9' -> 9
+    """
+    digits = channel.str.split("/").str[-1].str.replace(r"\D", "", regex=True)
+    return pd.to_numeric(digits.replace("", pd.NA), errors="coerce")
+
+
+def parse_analog_inputs(sheet: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse the AI_slope-offset sheet into a typed analog input table.
+
+    Args:
+        sheet: Raw sheet as read from the workbook
+
+    Returns:
+        DataFrame with the columns in AI_COLUMNS, one row per channel
+    """
+    sheet = _drop_blank_rows(sheet)
+    if sheet.empty:
+        return _empty(AI_COLUMNS)
+
+    names = sheet["Name"].astype("string").str.strip()
+    ports = _last_segment_number(sheet["Channel"].astype("string").str.strip())
+
+    numeric = sheet[["Slope", "Offset", "min Volts", "max Volts"]].apply(
+        pd.to_numeric, errors="coerce"
+    )
+
+    _check(sheet, names.isna() | (names == ""), AI_SHEET, "missing name")
+    _check(sheet, ports.isna(), AI_SHEET, "unreadable channel")
+    _check(
+        sheet,
+        numeric.isna().any(axis=1),
+        AI_SHEET,
+        "missing or non-numeric slope/offset/limits",
+    )
+    _check(
+        sheet,
+        numeric["min Volts"] >= numeric["max Volts"],
+        AI_SHEET,
+        "min Volts must be below max Volts",
+    )
+    _check_unique(sheet, names, AI_SHEET, "names")
+    _check_unique(sheet, ports, AI_SHEET, "ports")
+
+    table = pd.DataFrame(
+        {
+            "name": names,
+            "port": ports,
+            "slope": numeric["Slope"],
+            "offset": numeric["Offset"],
+            "min_volts": numeric["min Volts"],
+            "max_volts": numeric["max Volts"],
+            "units": sheet["Engineering Units"].astype("string").str.strip(),
+        }
+    )
+    return table.astype(AI_COLUMNS).reset_index(drop=True)
+
+
+def _parse_digital(sheet: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
+    sheet = _drop_blank_rows(sheet)
+    if sheet.empty:
+        return _empty(DIGITAL_COLUMNS)
+
+    names = sheet["Name"].astype("string").str.strip()
+    channel = sheet["Channel"].astype("string").str.strip()
+
+    # Physical port, e.g. 'Dev5/port0/line9' -> 0. Defaults to port 0.
+    ports = pd.to_numeric(
+        channel.str.extract(r"port(\d+)", flags=re.IGNORECASE, expand=False),
+        errors="coerce",
+    ).fillna(0)
+
+    # An explicit 'line' column takes precedence over the channel string
+    if "line" in sheet.columns:
+        lines = pd.to_numeric(sheet["line"], errors="coerce")
+    else:
+        lines = _last_segment_number(channel)
+
+    _check(sheet, names.isna() | (names == ""), sheet_name, "missing name")
+    _check(sheet, lines.isna(), sheet_name, "unreadable line")
+    _check_unique(sheet, names, sheet_name, "names")
+    _check_unique(
+        sheet, pd.DataFrame({"port": ports, "line": lines}), sheet_name, "lines"
+    )
+
+    table = pd.DataFrame({"name": names, "port": ports, "line": lines})
+    return table.astype(DIGITAL_COLUMNS).reset_index(drop=True)
+
+
+def parse_digital_inputs(sheet: pd.DataFrame) -> pd.DataFrame:
+    """Parse the DI sheet into a typed table with the columns in DIGITAL_COLUMNS"""
+    return _parse_digital(sheet, DI_SHEET)
+
+
+def parse_digital_outputs(sheet: pd.DataFrame) -> pd.DataFrame:
+    """Parse the DO sheet into a typed table with the columns in DIGITAL_COLUMNS"""
+    return _parse_digital(sheet, DO_SHEET)
+
+
+def load_device_wiring(
+    data_wiring: WiringSource, control_wiring: WiringSource
+) -> DeviceWiring:
+    """
+    Read and parse every sheet used to configure a device.
+
+    Workbooks given as paths are read through the compiled workbook cache.
+
+    Args:
+        data_wiring: Data wiring workbook (path or open ExcelFile)
+        control_wiring: Control wiring workbook (path or open ExcelFile)
+
+    Returns:
+        DeviceWiring holding the parsed AI, DI and DO tables
+    """
+    ai_sheet = read_sheet(data_wiring, AI_SHEET)
+    di_sheet = read_sheet(data_wiring, DI_SHEET)
+    do_sheet = read_sheet(control_wiring, DO_SHEET)
+
+    return DeviceWiring(
+        analog_inputs=parse_analog_inputs(ai_sheet),
+        digital_inputs=parse_digital_inputs(di_sheet),
+        digital_outputs=parse_digital_outputs(do_sheet),
+    )
@@ -0,0 +1,228 @@
+"""
+Differences between the wiring last applied to a device and its current workbooks.
+
+After a device is set up, its parsed wiring tables and rates are saved as a JSON
+snapshot. Diffing the workbooks against that snapshot shows which rows were
+added, removed or edited, and therefore which tasks need reconfiguring.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_float_dtype
+
+from .wiring import AI_COLUMNS, DIGITAL_COLUMNS, DeviceWiring
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+FLOAT_RTOL = 1e-9
+
+# Wiring table -> (task suffix, table columns)
+TABLES = {
+    "analog_inputs": ("AI", AI_COLUMNS),
+    "digital_inputs": ("DI", DIGITAL_COLUMNS),
+    "digital_outputs": ("DO", DIGITAL_COLUMNS),
+}
+
+
+@dataclass
+class TableDiff:
+    """Row changes in one wiring table, by channel name"""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, List[str]] = field(default_factory=dict)  # name -> columns
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+@dataclass
+class WiringDiff:
+    """Changes needed to bring one device from its snapshot to its workbooks"""
+
+    device_name: str
+    tables: Dict[str, TableDiff]  # Keyed like TABLES
+    rate_changes: Dict[str, List[str]] = field(default_factory=dict)  # suffix -> rates
+    has_snapshot: bool = True
+
+    @property
+    def empty(self) -> bool:
+        return not self.rate_changes and all(t.empty for t in self.tables.values())
+
+    @property
+    def tasks(self) -> List[str]:
+        """Suffixes ("AI", "DI", "DO") of the tasks that need reconfiguring"""
+        return [
+            suffix
+            for table, (suffix, _) in TABLES.items()
+            if not self.tables[table].empty or suffix in self.rate_changes
+        ]
+
+    def describe(self) -> List[str]:
+        """Human-readable plan, one line per change"""
+        if not self.has_snapshot:
+            return [f"{self.device_name}: no applied snapshot, every task will be applied"]
+        if self.empty:
+            return [f"{self.device_name}: up to date"]
+
+        lines = [f"{self.device_name}:"]
+        for table, (suffix, _) in TABLES.items():
+            diff = self.tables[table]
+            lines += [f"  {suffix:<3} + {name}" for name in diff.added]
+            lines += [
+                f"  {suffix:<3} ~ {name}: {', '.join(columns)}"
+                for name, columns in diff.changed.items()
+            ]
+            lines += [
+                f"  {suffix:<3} - {name} (removed from task, channel kept)"
+                for name in diff.removed
+            ]
+        for suffix, rates in self.rate_changes.items():
+            lines.append(f"  {suffix:<3} ~ rates: {', '.join(rates)}")
+        lines.append(
+            "  Tasks to reconfigure: "
+            + ", ".join(f"{self.device_name} {suffix}" for suffix in self.tasks)
+        )
+        return lines
+
+
+def diff_table(old: pd.DataFrame, new: pd.DataFrame) -> TableDiff:
+    """
+    Compare two parsed wiring tables row by row, matching rows on name.
+
+    Args:
+        old: Table from the applied snapshot
+        new: Table parsed from the current workbook
+
+    Returns:
+        TableDiff listing added, removed and changed channel names
+    """
+    old = old.set_index("name")
+    new = new.set_index("name")
+    diff = TableDiff(
+        added=[n for n in new.index if n not in old.index],
+        removed=[n for n in old.index if n not in new.index],
+    )
+
+    common = new.index.intersection(old.index)
+    if len(common):
+        columns = [c for c in new.columns if c in old.columns]
+        before = old.loc[common, columns]
+        after = new.loc[common, columns]
+        # NA on both sides counts as equal
+        unequal = (before.astype(object) != after.astype(object)) & ~(
+            before.isna() & after.isna()
+        )
+        # Floats are compared with a tolerance since the snapshot is JSON text
+        for column in columns:
+            if is_float_dtype(after[column]) and is_float_dtype(before[column]):
+                unequal[column] &= ~np.isclose(
+                    before[column], after[column], rtol=FLOAT_RTOL, equal_nan=True
+                )
+        for name, row in unequal.iterrows():
+            if row.any():
+                diff.changed[name] = list(row.index[row.to_numpy(dtype=bool)])
+    return diff
+
+
+def diff_wiring(
+    device_name: str,
+    old: Optional[DeviceWiring],
+    new: DeviceWiring,
+    old_rates: Optional[Dict[str, dict]] = None,
+    new_rates: Optional[Dict[str, dict]] = None,
+) -> WiringDiff:
+    """
+    Compare the applied wiring and rates of a device with the current ones.
+
+    Args:
+        device_name: Device location, e.g. "Dev5"
+        old: Wiring from the applied snapshot, or None if there is none
+        new: Wiring parsed from the current workbooks
+        old_rates: Rates from the snapshot, keyed by task suffix
+        new_rates: Current rates, keyed by task suffix
+
+    Returns:
+        WiringDiff for the device
+    """
+    if old is None:
+        empty = DeviceWiring(
+            *(pd.DataFrame(columns=list(cols)) for _, cols in TABLES.values())
+        )
+        result = diff_wiring(device_name, empty, new)
+        result.has_snapshot = False
+        result.rate_changes = {suffix: ["all"] for suffix, _ in TABLES.values()}
+        return result
+
+    tables = {
+        table: diff_table(getattr(old, table), getattr(new, table)) for table in TABLES
+    }
+
+    rate_changes: Dict[str, List[str]] = {}
+    old_rates = old_rates or {}
+    for suffix, rates in (new_rates or {}).items():
+        before = old_rates.get(suffix, {})
+        changed = [k for k, v in rates.items() if before.get(k) != v]
+        if changed:
+            rate_changes[suffix] = changed
+
+    return WiringDiff(device_name, tables, rate_changes)
+
+
+def save_snapshot(
+    path: Union[str, os.PathLike], wiring: DeviceWiring, rates: Dict[str, dict]
+) -> None:
+    """Write the applied wiring tables and rates of a device to path (JSON)"""
+    path = Path(path)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "rates": rates,
+        "tables": {
+            table: json.loads(getattr(wiring, table).to_json(orient="records", double_precision=15))
+            for table in TABLES
+        },
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not save applied wiring snapshot {path}: {e}")
+
+
+def load_snapshot(
+    path: Union[str, os.PathLike],
+) -> Optional[Tuple[DeviceWiring, Dict[str, dict]]]:
+    """
+    Read a snapshot written by save_snapshot.
+
+    Returns:
+        (DeviceWiring, rates) or None if there is no readable snapshot
+    """
+    try:
+        snapshot = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable wiring snapshot {path}: {e}")
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    tables = {}
+    for table, (_, columns) in TABLES.items():
+        records = snapshot["tables"].get(table, [])
+        frame = pd.DataFrame.from_records(records, columns=list(columns))
+        tables[table] = frame.astype(columns)
+    return DeviceWiring(**tables), snapshot.get("rates", {})
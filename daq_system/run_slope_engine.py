@@ -0,0 +1,62 @@
+"""
+Publish client-side least-squares slopes of streamed channels until interrupted.
+
+    python -m daq_system.run_slope_engine                  # config.slope_sources
+    python -m daq_system.run_slope_engine --sources "PT_OX_*" --window 2
+"""
+
+import argparse
+from fnmatch import fnmatchcase
+import logging
+import time
+
+from daq_system.config.settings import DAQConfig
+from daq_system.core.daq_system import DAQSystem
+from daq_system.core.discovery import wired_analog_channels
+from daq_system.core.slope_engine import SlopeEngine
+from daq_system.utils.exceptions import DAQError
+from daq_system.utils.logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main():
+    config = DAQConfig()
+    parser = argparse.ArgumentParser(
+        description="Publish <channel>_SLOPE channels at stream rate"
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        default=config.slope_sources,
+        help="Channel names or fnmatch patterns over the wired AI channels",
+    )
+    parser.add_argument(
+        "--window", type=float, default=config.slope_window, help="Window in seconds"
+    )
+    args = parser.parse_args()
+
+    wired = wired_analog_channels(config)
+    sources = [
+        name for name in wired if any(fnmatchcase(name, p) for p in args.sources)
+    ]
+    if not sources:
+        raise DAQError(f"No wired channels match {', '.join(args.sources)}")
+
+    daq_system = DAQSystem(config)
+    engine = SlopeEngine(
+        daq_system.client, daq_system.channel_factory, sources, window=args.window
+    )
+    engine.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+In-process simulation of the Synnax cluster and the NI cards.
+
+Select it with DAQConfig(backend="simulated") or construct SimulatedSynnax
+directly wherever a synnax.Synnax client is expected.
+"""
+
+from .client import SimulatedSynnax
+from .waveforms import generate, select_waveform
+
+__all__ = ["SimulatedSynnax", "generate", "select_waveform"]
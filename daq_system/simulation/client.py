@@ -0,0 +1,709 @@
+"""
+In-process stand-in for the Synnax client.
+
+SimulatedSynnax implements the parts of the synnax.Synnax API used by this
+project: channels, tasks, devices, ranges, streamers, writers, iterators and
+control sessions. Configured NI tasks are run by a simulated driver that
+generates synthetic sensor data, so the full bring-up, export and autosequence
+code paths can run without a cluster or any hardware.
+"""
+
+from typing import Dict, List, Optional, Union
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+
+import numpy as np
+import synnax as sy
+
+from ..config.settings import SimulationConfig
+from .driver import SimulatedDriver
+from .store import ChannelParam, TelemetryStore, as_seconds
+
+logger = logging.getLogger(__name__)
+
+AUTO_SPAN = sy.TimeSpan(-1)
+
+
+def _as_list(params) -> List:
+    if params is None:
+        return []
+    if isinstance(params, (list, tuple, set)):
+        return list(params)
+    return [params]
+
+
+def _is_single(params) -> bool:
+    return not isinstance(params, (list, tuple, set))
+
+
+def _frame(store: TelemetryStore, data: Dict[int, np.ndarray]) -> sy.Frame:
+    return sy.Frame(
+        {
+            key: sy.Series(values, data_type=store.channels[key].data_type)
+            for key, values in data.items()
+            if key in store.channels
+        }
+    )
+
+
+class _SimulatedTask(sy.Task):
+    """Server-side task whose commands are handled by the simulated driver"""
+
+    def __init__(self, sim: "SimulatedSynnax", **kwargs):
+        super().__init__(**kwargs)
+        self._sim = sim
+
+    def execute_command(self, type_: str, args: Optional[dict] = None) -> str:
+        self._sim._rpc()
+        if type_ == "start":
+            self._sim.driver.start(self.key, self.type, self.name, self.config)
+        elif type_ == "stop":
+            self._sim.driver.stop(self.key)
+        return str(uuid.uuid4())
+
+    def execute_command_sync(
+        self, type_: str, args: Optional[dict] = None, timeout=5
+    ) -> None:
+        self.execute_command(type_, args)
+
+
+class SimulatedChannelClient:
+    def __init__(self, sim: "SimulatedSynnax"):
+        self._sim = sim
+        self._store = sim.store
+
+    def create(
+        self,
+        channels: Union[sy.Channel, List[sy.Channel], None] = None,
+        *,
+        data_type=sy.DataType.UNKNOWN,
+        name: str = "",
+        is_index: bool = False,
+        index: int = 0,
+        virtual: Optional[bool] = None,
+        expression: str = "",
+        retrieve_if_name_exists: bool = False,
+        **kwargs,
+    ):
+        self._sim._rpc()
+        if channels is None:
+            if is_index and data_type == sy.DataType.UNKNOWN:
+                data_type = sy.DataType.TIMESTAMP
+            virtual = virtual if virtual is not None else len(expression) > 0
+            requested = [
+                sy.Channel(
+                    name=name,
+                    data_type=data_type,
+                    is_index=is_index,
+                    index=index,
+                    virtual=virtual,
+                    expression=expression,
+                    operations=kwargs.get("operations"),
+                )
+            ]
+        else:
+            requested = _as_list(channels)
+
+        created = []
+        for channel in requested:
+            existing = self._store.find([channel.name]) if retrieve_if_name_exists else []
+            if existing:
+                created.append(existing[0])
+                continue
+            if channel.index and not self._store.find([channel.index]):
+                raise sy.exceptions.ValidationError(
+                    f"Index channel {channel.index} for '{channel.name}' does not exist"
+                )
+            created.append(
+                self._store.add_channel(
+                    channel.name,
+                    channel.data_type,
+                    is_index=channel.is_index,
+                    index=channel.index,
+                    virtual=channel.virtual,
+                    expression=channel.expression or "",
+                    operations=channel.operations,
+                    key=channel.key,
+                )
+            )
+        return created if isinstance(channels, list) else created[0]
+
+    def retrieve(self, channel):
+        self._sim._rpc()
+        found = self._store.find(_as_list(channel))
+        if not _is_single(channel):
+            return found
+        if len(found) == 1:
+            return found[0]
+        if len(found) > 1:
+            raise sy.exceptions.MultipleFoundError(
+                f"Multiple channels matching '{channel}' found"
+            )
+        raise sy.exceptions.NotFoundError(f"Channel matching '{channel}' not found.")
+
+    def delete(self, channels) -> None:
+        self._sim._rpc()
+        self._store.delete(_as_list(channels))
+
+
+class SimulatedDeviceClient:
+    def __init__(self, sim: "SimulatedSynnax"):
+        self._sim = sim
+        self._devices: Dict[str, sy.Device] = {}
+        for location in sim.config.devices:
+            device = sy.Device(
+                key=f"SIM-{location}",
+                location=location,
+                rack=1,
+                name=f"{sim.config.device_model} {location}",
+                make="NI",
+                model=sim.config.device_model,
+                configured=True,
+                properties={"identifier": location, "is_simulated": True},
+            )
+            self._devices[device.key] = device
+
+    def retrieve(
+        self,
+        *,
+        key=None,
+        make=None,
+        model=None,
+        name=None,
+        location=None,
+        keys=None,
+        makes=None,
+        models=None,
+        names=None,
+        locations=None,
+        ignore_not_found: bool = False,
+    ):
+        self._sim._rpc()
+        single = all(p is None for p in (keys, makes, models, names, locations))
+        filters = {
+            "key": _as_list(keys if keys is not None else key),
+            "make": _as_list(makes if makes is not None else make),
+            "model": _as_list(models if models is not None else model),
+            "name": _as_list(names if names is not None else name),
+            "location": _as_list(locations if locations is not None else location),
+        }
+        found = [
+            device
+            for device in self._devices.values()
+            if all(not v or getattr(device, f) in v for f, v in filters.items())
+        ]
+        if not single:
+            return found
+        if not found:
+            if ignore_not_found:
+                return None
+            raise sy.exceptions.NotFoundError(f"Device matching {filters} not found")
+        return found[0]
+
+    def create(self, devices):
+        self._sim._rpc()
+        for device in _as_list(devices):
+            self._devices[device.key] = device
+        return devices
+
+
+class SimulatedTaskClient:
+    def __init__(self, sim: "SimulatedSynnax"):
+        self._sim = sim
+        self._lock = threading.Lock()
+        self._keys = itertools.count((1 << 32) + 1)
+        self._tasks: Dict[int, _SimulatedTask] = {}
+
+    def _save(self, payload) -> _SimulatedTask:
+        # Round trip through JSON, as the config would through the server
+        config = payload.config or {}
+        if not isinstance(config, str):
+            config = json.dumps(config, default=str)
+        config = json.loads(config) if config else {}
+        with self._lock:
+            key = payload.key if payload.key in self._tasks else next(self._keys)
+            task = _SimulatedTask(
+                self._sim,
+                key=key,
+                name=payload.name,
+                type=payload.type,
+                config=config,
+            )
+            self._tasks[key] = task
+        return task
+
+    def create(self, tasks=None, **kwargs):
+        self._sim._rpc()
+        if tasks is None:
+            tasks = sy.Task(**kwargs)
+        created = [self._save(t.to_payload()) for t in _as_list(tasks)]
+        return created if isinstance(tasks, list) else created[0]
+
+    def configure(self, task, timeout: float = 5):
+        """Save the task and have the simulated driver accept its config"""
+        self._sim._rpc()
+        delay = self._sim.config.configure_delay
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(
+                "task - timeout waiting for driver to acknowledge configuration"
+            )
+        time.sleep(delay)
+
+        payload = task.to_payload()
+        device = (payload.config or {}).get("device")
+        if device and device not in self._sim.devices._devices:
+            raise sy.exceptions.ConfigurationError(f"Device {device} not found")
+
+        saved = self._save(payload)
+        task.set_internal(saved)
+
+        # The driver stops a reconfigured task unless it is set to auto start
+        self._sim.driver.stop(saved.key)
+        if saved.config.get("auto_start"):
+            self._sim.driver.start(saved.key, saved.type, saved.name, saved.config)
+        return task
+
+    def delete(self, keys) -> None:
+        self._sim._rpc()
+        for key in _as_list(keys):
+            self._sim.driver.stop(key)
+            with self._lock:
+                self._tasks.pop(key, None)
+
+    def retrieve(
+        self,
+        key=None,
+        name=None,
+        type=None,
+        names=None,
+        keys=None,
+        types=None,
+    ):
+        self._sim._rpc()
+        single = names is None and keys is None and types is None
+        want_keys = _as_list(keys if keys is not None else key)
+        want_names = _as_list(names if names is not None else name)
+        want_types = _as_list(types if types is not None else type)
+        with self._lock:
+            found = [
+                task
+                for task in self._tasks.values()
+                if (not want_keys or task.key in want_keys)
+                and (not want_names or task.name in want_names)
+                and (not want_types or task.type in want_types)
+            ]
+        if not single:
+            return found
+        if not found:
+            raise sy.exceptions.NotFoundError(f"Task matching '{name or key}' not found")
+        return found[0]
+
+    def list(self, rack: Optional[int] = None) -> List[sy.Task]:
+        self._sim._rpc()
+        with self._lock:
+            return list(self._tasks.values())
+
+
+class SimulatedStreamer:
+    """Receives every frame written to its channels after it was opened"""
+
+    def __init__(self, sim: "SimulatedSynnax", channels):
+        self._sim = sim
+        self.channels = sim.store.resolve(_as_list(channels))
+        self._inbox = sim.store.subscribe(self.channels)
+
+    def read(self, timeout=None) -> Optional[sy.Frame]:
+        try:
+            data = self._inbox.get(timeout=as_seconds(timeout))
+        except queue.Empty:
+            return None
+        return _frame(self._sim.store, data)
+
+    def __iter__(self):
+        while True:
+            yield self.read()
+
+    def close(self) -> None:
+        self._sim.store.unsubscribe(self._inbox)
+
+    def __enter__(self) -> "SimulatedStreamer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class SimulatedWriter:
+    """Writes frames straight into the store"""
+
+    def __init__(self, sim: "SimulatedSynnax", channels):
+        self._sim = sim
+        self.channels = sim.store.resolve(_as_list(channels))
+
+    def write(self, channels_or_data, series=None) -> bool:
+        if isinstance(channels_or_data, sy.Frame):
+            data = dict(zip(channels_or_data.channels, channels_or_data.series))
+        elif isinstance(channels_or_data, dict):
+            data = channels_or_data
+        elif series is not None and _is_single(channels_or_data):
+            data = {channels_or_data: series}
+        else:
+            data = dict(zip(channels_or_data, series))
+
+        keys = self._sim.store.resolve(list(data))
+        extra = set(keys) - set(self.channels)
+        if extra:
+            raise sy.exceptions.ValidationError(
+                f"Writer was not opened on channels {sorted(extra)}"
+            )
+        self._sim.store.write(
+            {key: np.asarray(values) for key, values in zip(keys, data.values())}
+        )
+        return True
+
+    def set_authority(self, *args, **kwargs) -> bool:
+        return True
+
+    def commit(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "SimulatedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class SimulatedIterator:
+    """
+    Walks persisted data in time order, at most chunk_size samples at a time.
+    Like the server, a downsample factor keeps every Nth sample of each series.
+    """
+
+    def __init__(
+        self, sim: "SimulatedSynnax", tr: sy.TimeRange, channels, chunk_size, downsample_factor=1
+    ):
+        self._sim = sim
+        self.tr = tr
+        self._chunk_size = int(chunk_size)
+        self._downsample = max(1, int(downsample_factor))
+        keys = sim.store.resolve(_as_list(channels))
+        self._data = {key: sim.store.read(key, int(tr.start), int(tr.end)) for key in keys}
+        self._position = int(tr.start)
+        self._valid = False
+        self.value = sy.Frame()
+
+    def seek_first(self) -> bool:
+        self._position = int(self.tr.start)
+        self._valid = False
+        return any(len(stamps) for stamps, _ in self._data.values())
+
+    def seek_last(self) -> bool:
+        self._position = int(self.tr.end)
+        self._valid = False
+        return any(len(stamps) for stamps, _ in self._data.values())
+
+    def seek_ge(self, stamp) -> bool:
+        self._position = max(int(stamp), int(self.tr.start))
+        self._valid = False
+        return self._position < int(self.tr.end)
+
+    def next(self, span) -> bool:
+        self._sim._rpc()
+        stop = int(self.tr.end)
+        selected: Dict[int, np.ndarray] = {}
+
+        # Skip empty stretches until there is data or the range is exhausted
+        while not selected and self._position < stop:
+            start = self._position
+            if int(span) == int(AUTO_SPAN):
+                # End at the first timestamp past chunk_size samples on any channel
+                end = stop
+                for stamps, _ in self._data.values():
+                    first = np.searchsorted(stamps, start, side="left")
+                    if first + self._chunk_size < len(stamps):
+                        end = min(end, int(stamps[first + self._chunk_size]))
+            else:
+                end = min(start + int(span), stop)
+
+            for key, (stamps, values) in self._data.items():
+                lo, hi = np.searchsorted(stamps, [start, end], side="left")
+                if hi > lo:
+                    selected[key] = values[lo:hi:self._downsample]
+            self._position = end
+
+        self.value = _frame(self._sim.store, selected)
+        self._valid = bool(selected)
+        return self._valid
+
+    def valid(self) -> bool:
+        return self._valid
+
+    def close(self) -> None:
+        pass
+
+    def __iter__(self):
+        self.seek_first()
+        return self
+
+    def __next__(self) -> sy.Frame:
+        if not self.next(AUTO_SPAN):
+            raise StopIteration
+        return self.value
+
+    def __enter__(self) -> "SimulatedIterator":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class SimulatedController:
+    """Control session that writes commands and reads the latest channel values"""
+
+    def __init__(self, sim: "SimulatedSynnax", name: str, write, read):
+        self._sim = sim
+        self.name = name
+        self.write_keys = sim.store.resolve(_as_list(write))
+        self.read_keys = sim.store.resolve(_as_list(read))
+
+    def set(self, ch, value=None) -> None:
+        data = ch if isinstance(ch, dict) else {ch: value}
+        keys = self._sim.store.resolve(list(data))
+        not_held = set(keys) - set(self.write_keys)
+        if not_held:
+            raise sy.exceptions.UnauthorizedError(
+                f"{self.name} does not control channels {sorted(not_held)}"
+            )
+
+        frame: Dict[int, np.ndarray] = {}
+        now = np.array([int(sy.TimeStamp.now())], dtype=np.int64)
+        for key, v in zip(keys, data.values()):
+            channel = self._sim.store.channels[key]
+            if channel.index and not channel.virtual and channel.index != key:
+                frame[channel.index] = now
+            frame[key] = np.asarray([v])
+        self._sim.store.write(frame)
+
+    def __setitem__(self, ch, value) -> None:
+        self.set(ch, value)
+
+    def get(self, ch):
+        key = self._sim.store.resolve([ch])[0]
+        value = self._sim.store.latest(key)
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __getitem__(self, ch):
+        return self.get(ch)
+
+    @property
+    def state(self) -> Dict[int, object]:
+        return {key: self.get(key) for key in self.read_keys}
+
+    def set_authority(self, *args, **kwargs) -> bool:
+        return True
+
+    def wait_until(self, cond, timeout=None) -> bool:
+        """Block until cond(self) is true, re-checking after every write"""
+        seconds = as_seconds(timeout)
+        deadline = None if seconds is None else time.monotonic() + seconds
+        with self._sim.store.changed:
+            while not cond(self):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._sim.store.changed.wait(remaining)
+        return True
+
+    def wait_while(self, cond, timeout=None) -> bool:
+        return self.wait_until(lambda c: not cond(c), timeout)
+
+    def wait_until_defined(self, channels, timeout=None) -> bool:
+        keys = self._sim.store.resolve(_as_list(channels))
+        return self.wait_until(
+            lambda c: all(c._sim.store.latest(k) is not None for k in keys), timeout
+        )
+
+    def sleep(self, dur, precise: bool = False) -> None:
+        time.sleep(as_seconds(dur))
+
+    def release(self) -> None:
+        pass
+
+    def __enter__(self) -> "SimulatedController":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+
+class SimulatedControlClient:
+    def __init__(self, sim: "SimulatedSynnax"):
+        self._sim = sim
+
+    def acquire(self, name: str, read=None, write=None, write_authorities=None):
+        self._sim._rpc()
+        return SimulatedController(self._sim, name, write, read)
+
+
+class SimulatedScopedChannel:
+    """Data of one channel within a range, usable like a numpy array"""
+
+    def __init__(self, channel: sy.Channel, values: np.ndarray):
+        self.key = channel.key
+        self.name = channel.name
+        self.data_type = channel.data_type
+        self.is_index = channel.is_index
+        self.index = channel.index
+        self._values = values
+
+    def to_numpy(self) -> np.ndarray:
+        return self._values
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self._values if dtype is None else self._values.astype(dtype)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+
+class SimulatedRange:
+    def __init__(self, sim: "SimulatedSynnax", name: str, time_range: sy.TimeRange):
+        self._sim = sim
+        self.key = str(uuid.uuid4())
+        self.name = name
+        self.time_range = time_range
+
+    def __getitem__(self, channel: ChannelParam) -> SimulatedScopedChannel:
+        found = self._sim.store.find([channel])
+        if not found:
+            raise sy.exceptions.NotFoundError(f"Channel matching '{channel}' not found.")
+        _, values = self._sim.store.read(
+            found[0].key, int(self.time_range.start), int(self.time_range.end)
+        )
+        return SimulatedScopedChannel(found[0], values)
+
+
+class SimulatedRangeClient:
+    def __init__(self, sim: "SimulatedSynnax"):
+        self._sim = sim
+        self._ranges: Dict[str, SimulatedRange] = {}
+
+    def create(
+        self,
+        name: str = "",
+        time_range: Optional[sy.TimeRange] = None,
+        retrieve_if_name_exists: bool = False,
+        **kwargs,
+    ) -> SimulatedRange:
+        self._sim._rpc()
+        if retrieve_if_name_exists:
+            for rng in self._ranges.values():
+                if rng.name == name:
+                    return rng
+        rng = SimulatedRange(self._sim, name, time_range)
+        self._ranges[rng.key] = rng
+        return rng
+
+    def retrieve(self, key: Optional[str] = None, name: Optional[str] = None, **kwargs):
+        self._sim._rpc()
+        for rng in self._ranges.values():
+            if rng.key == key or (name is not None and rng.name == name):
+                return rng
+        raise sy.exceptions.QueryError(f"Range matching '{name or key}' not found")
+
+
+class SimulatedSynnax:
+    """
+    Drop-in replacement for synnax.Synnax that runs entirely in this process.
+
+    Args:
+        config: Devices, waveforms and timing of the simulation
+    """
+
+    def __init__(self, config: Optional[SimulationConfig] = None, **kwargs):
+        self.config = config if config is not None else SimulationConfig()
+        self.store = TelemetryStore()
+        self.driver = SimulatedDriver(self.store, self.config)
+        self.channels = SimulatedChannelClient(self)
+        self.devices = SimulatedDeviceClient(self)
+        self.tasks = SimulatedTaskClient(self)
+        self.control = SimulatedControlClient(self)
+        self.ranges = SimulatedRangeClient(self)
+        logger.info(
+            f"Using simulated Synnax backend with devices {', '.join(self.config.devices)}"
+        )
+
+    @property
+    def hardware(self) -> "SimulatedSynnax":
+        """Deprecated alias kept by the real client"""
+        return self
+
+    def _rpc(self) -> None:
+        """Stand-in for the network round trip of one client call"""
+        if self.config.rpc_latency > 0:
+            time.sleep(self.config.rpc_latency)
+
+    def open_streamer(self, channels, **kwargs) -> SimulatedStreamer:
+        self._rpc()
+        return SimulatedStreamer(self, channels)
+
+    def open_writer(self, start=None, channels=None, *args, **kwargs) -> SimulatedWriter:
+        self._rpc()
+        return SimulatedWriter(self, channels)
+
+    def open_iterator(
+        self,
+        tr: sy.TimeRange,
+        channels,
+        chunk_size: int = 100_000,
+        downsample_factor: int = 1,
+    ) -> SimulatedIterator:
+        self._rpc()
+        return SimulatedIterator(self, tr, channels, chunk_size, downsample_factor)
+
+    def read(self, tr: sy.TimeRange, channels):
+        self._rpc()
+        keys = self.store.resolve(_as_list(channels))
+        data = {key: self.store.read(key, int(tr.start), int(tr.end))[1] for key in keys}
+        if _is_single(channels):
+            key = keys[0]
+            return sy.Series(data[key], data_type=self.store.channels[key].data_type)
+        return _frame(self.store, data)
+
+    def read_latest(self, channels, n: int = 1):
+        self._rpc()
+        keys = self.store.resolve(_as_list(channels))
+        data = {key: self.store.read(key)[1][-n:] for key in keys}
+        if _is_single(channels):
+            key = keys[0]
+            return sy.Series(data[key], data_type=self.store.channels[key].data_type)
+        return _frame(self.store, data)
+
+    def write(self, start, channels, data=None) -> None:
+        self._rpc()
+        if data is None:
+            payload = channels
+        elif _is_single(channels):
+            payload = {channels: data}
+        else:
+            payload = dict(zip(channels, data))
+        self.store.write(payload)
+
+    def close(self) -> None:
+        self.driver.stop_all()
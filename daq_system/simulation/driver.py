@@ -0,0 +1,232 @@
+"""
+Simulated NI driver: runs configured tasks against the in-memory store.
+
+Read tasks generate synthetic waveforms at their sample rate and write them in
+frames at their stream rate. Digital write tasks echo every command onto the
+matching state channel and publish all states at the task's state rate, and
+optionally as soon as a state changes.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import logging
+import threading
+import time
+
+import numpy as np
+import synnax as sy
+
+from ..config.settings import SimulationConfig
+from .store import TelemetryStore
+from .waveforms import generate, select_waveform
+
+logger = logging.getLogger(__name__)
+
+ANALOG_READ = "ni_analog_read"
+DIGITAL_READ = "ni_digital_read"
+DIGITAL_WRITE = "ni_digital_write"
+
+
+def _rate(value) -> float:
+    """Rates may be dumped as plain numbers or as {"value": ...} objects"""
+    if isinstance(value, dict):
+        value = value.get("value", 0)
+    return float(value or 0)
+
+
+class _RunningTask(ABC):
+    """Background loop for one started task"""
+
+    def __init__(self, name: str, period: float):
+        self.name = name
+        self.period = period
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._loop, name=f"sim-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=max(1.0, 2 * self.period))
+
+    def _loop(self) -> None:
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Simulated task {self.name} stopped: {e}")
+                return
+            next_tick += self.period
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+
+    @abstractmethod
+    def tick(self) -> None:
+        """Do one period of the task's work"""
+
+    def close(self) -> None:
+        self.stop()
+
+
+class _ReadTask(_RunningTask):
+    """Writes synthetic samples for every channel of a read task"""
+
+    def __init__(
+        self,
+        name: str,
+        config: dict,
+        store: TelemetryStore,
+        sim: SimulationConfig,
+        rng: np.random.Generator,
+        digital: bool,
+    ):
+        sample_rate = _rate(config.get("sample_rate")) or 1.0
+        stream_rate = min(_rate(config.get("stream_rate")) or 1.0, sample_rate)
+        super().__init__(name, 1.0 / stream_rate)
+
+        self.store = store
+        self.rng = rng
+        self.digital = digital
+        self.samples_per_frame = max(1, int(round(sample_rate / stream_rate)))
+        self.sample_period = int(1e9 / sample_rate)
+        self.next_stamp = int(sy.TimeStamp.now())
+
+        default = sim.digital_waveform if digital else sim.analog_waveform
+        keys = [c["channel"] for c in config.get("channels", []) if c.get("enabled", True)]
+        self.channels = []
+        for i, channel in enumerate(store.find(keys)):
+            waveform = select_waveform(channel.name, sim.waveforms, default)
+            self.channels.append((channel, waveform, 0.1 * i))
+
+    def tick(self) -> None:
+        stamps = self.next_stamp + self.sample_period * np.arange(
+            self.samples_per_frame, dtype=np.int64
+        )
+        self.next_stamp = int(stamps[-1]) + self.sample_period
+        seconds = stamps / 1e9
+
+        frame: Dict[int, np.ndarray] = {}
+        for channel, waveform, phase in self.channels:
+            values = generate(waveform, seconds, self.rng, phase)
+            if self.digital:
+                values = (values >= 0.5).astype(np.uint8)
+            if channel.index:
+                frame[channel.index] = stamps
+            frame[channel.key] = values
+        if frame:
+            self.store.write(frame)
+
+
+class _DigitalWriteTask(_RunningTask):
+    """Mirrors commands onto state channels and publishes the states"""
+
+    def __init__(
+        self, name: str, config: dict, store: TelemetryStore, sim: SimulationConfig
+    ):
+        state_rate = _rate(config.get("state_rate")) or 1.0
+        super().__init__(name, 1.0 / state_rate)
+
+        self.store = store
+        self.state_latency = sim.state_latency
+        self.emit_on_change = sim.emit_state_on_change
+        self.cmd_to_state: Dict[int, int] = {}
+        for chan in config.get("channels", []):
+            if chan.get("enabled", True):
+                self.cmd_to_state[chan["cmd_channel"]] = chan["state_channel"]
+
+        # NI output lines power up low
+        self.states: Dict[int, int] = {k: 0 for k in self.cmd_to_state.values()}
+        self.state_index = {
+            c.key: c.index for c in store.find(list(self.cmd_to_state.values()))
+        }
+        self.store.add_hook(self._on_write)
+
+    def _on_write(self, frame: Dict[int, np.ndarray]) -> None:
+        updates = {
+            self.cmd_to_state[key]: int(values[-1])
+            for key, values in frame.items()
+            if key in self.cmd_to_state and len(values)
+        }
+        if not updates:
+            return
+        if self.state_latency > 0:
+            timer = threading.Timer(self.state_latency, self._apply, args=(updates,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._apply(updates)
+
+    def _apply(self, updates: Dict[int, int]) -> None:
+        self.states.update(updates)
+        if self.emit_on_change:
+            self._publish(list(updates))
+
+    def _publish(self, state_keys: List[int]) -> None:
+        now = int(sy.TimeStamp.now())
+        frame: Dict[int, np.ndarray] = {}
+        for key in state_keys:
+            index = self.state_index.get(key)
+            if index:
+                frame[index] = np.array([now], dtype=np.int64)
+            frame[key] = np.array([self.states[key]], dtype=np.uint8)
+        if frame:
+            self.store.write(frame)
+
+    def tick(self) -> None:
+        self._publish(list(self.states))
+
+    def close(self) -> None:
+        self.store.remove_hook(self._on_write)
+        super().close()
+
+
+class SimulatedDriver:
+    """Starts and stops the background loops of simulated tasks"""
+
+    def __init__(self, store: TelemetryStore, sim: SimulationConfig):
+        self.store = store
+        self.sim = sim
+        self.rng = np.random.default_rng(sim.seed)
+        self._lock = threading.Lock()
+        self._running: Dict[int, _RunningTask] = {}
+
+    def is_running(self, task_key: int) -> bool:
+        with self._lock:
+            return task_key in self._running
+
+    def start(self, task_key: int, task_type: str, name: str, config: dict) -> None:
+        """Start a task, restarting it if it is already running"""
+        self.stop(task_key)
+
+        if task_type == ANALOG_READ:
+            running = _ReadTask(name, config, self.store, self.sim, self.rng, False)
+        elif task_type == DIGITAL_READ:
+            running = _ReadTask(name, config, self.store, self.sim, self.rng, True)
+        elif task_type == DIGITAL_WRITE:
+            running = _DigitalWriteTask(name, config, self.store, self.sim)
+        else:
+            logger.warning(f"Simulated driver does not run {task_type} tasks")
+            return
+
+        with self._lock:
+            self._running[task_key] = running
+        running.start()
+        logger.debug(f"Simulated task started: {name}")
+
+    def stop(self, task_key: int) -> None:
+        with self._lock:
+            running = self._running.pop(task_key, None)
+        if running is not None:
+            running.close()
+            logger.debug(f"Simulated task stopped: {running.name}")
+
+    def stop_all(self) -> None:
+        with self._lock:
+            keys = list(self._running)
+        for key in keys:
+            self.stop(key)
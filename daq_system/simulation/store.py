@@ -0,0 +1,226 @@
+"""
+In-memory channel and telemetry store behind the simulated Synnax client.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import itertools
+import queue
+import threading
+
+import numpy as np
+import synnax as sy
+
+ChannelParam = Union[int, str]
+WriteHook = Callable[[Dict[int, np.ndarray]], None]
+
+
+def numpy_dtype(data_type: sy.DataType) -> np.dtype:
+    """Numpy dtype used to store samples of a Synnax data type"""
+    data_type = sy.DataType(data_type)
+    if data_type == sy.DataType.TIMESTAMP:
+        return np.dtype(np.int64)
+    try:
+        return np.dtype(data_type.np)
+    except TypeError:
+        # Strings and JSON are kept as Python objects
+        return np.dtype(object)
+
+
+def as_seconds(timeout) -> Optional[float]:
+    """Convert a float, int or TimeSpan timeout to seconds"""
+    if timeout is None:
+        return None
+    if isinstance(timeout, sy.TimeSpan):
+        return sy.TimeSpan(timeout).seconds
+    return float(timeout)
+
+
+class TelemetryStore:
+    """
+    Channels, persisted samples and live subscriptions of the simulated cluster.
+
+    Every write is appended to the channels it touches (unless they are
+    virtual), remembered as each channel's latest value and forwarded to every
+    open streamer that subscribed to one of its channels.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.changed = threading.Condition(self._lock)
+        self._keys = itertools.count(1)
+        self.channels: Dict[int, sy.Channel] = {}
+        self._data: Dict[int, List[Tuple[np.ndarray, np.ndarray]]] = {}
+        self._latest: Dict[int, object] = {}
+        self._subscribers: List[Tuple[frozenset, queue.Queue]] = []
+        self._hooks: List[WriteHook] = []
+
+    # Channels
+
+    def add_channel(
+        self,
+        name: str,
+        data_type: sy.DataType,
+        is_index: bool = False,
+        index: int = 0,
+        virtual: bool = False,
+        expression: str = "",
+        operations=None,
+        key: int = 0,
+    ) -> sy.Channel:
+        """
+        Add a channel. Passing the key of an existing calculated channel
+        replaces its definition, as the server does. Calculated channels are
+        stored but not evaluated.
+        """
+        with self._lock:
+            if key and key in self.channels and self.channels[key].expression:
+                self.channels[key].expression = expression
+                self.channels[key].operations = operations
+                self.channels[key].data_type = sy.DataType(data_type)
+                return self.channels[key]
+
+            key = next(self._keys)
+            channel = sy.Channel(
+                name=name,
+                data_type=sy.DataType(data_type),
+                key=key,
+                is_index=is_index,
+                index=key if is_index else index,
+                virtual=virtual,
+                expression=expression,
+                operations=operations,
+            )
+            self.channels[key] = channel
+            self._data[key] = []
+            return channel
+
+    def find(self, params: Iterable[ChannelParam]) -> List[sy.Channel]:
+        """Channels matching the given keys or names, in the order given"""
+        with self._lock:
+            found = []
+            for param in params:
+                if isinstance(param, sy.Channel):
+                    param = param.key
+                if isinstance(param, (int, np.integer)):
+                    if int(param) in self.channels:
+                        found.append(self.channels[int(param)])
+                else:
+                    found.extend(c for c in self.channels.values() if c.name == param)
+            return found
+
+    def resolve(self, params: Iterable[ChannelParam]) -> List[int]:
+        """Keys of the given channels, raising NotFoundError for unknown ones"""
+        keys = []
+        for param in params:
+            found = self.find([param])
+            if not found:
+                raise sy.exceptions.NotFoundError(f"Channel '{param}' not found")
+            keys.append(found[0].key)
+        return keys
+
+    def delete(self, params: Iterable[ChannelParam]) -> None:
+        with self._lock:
+            for channel in self.find(params):
+                self.channels.pop(channel.key, None)
+                self._data.pop(channel.key, None)
+                self._latest.pop(channel.key, None)
+
+    # Telemetry
+
+    def add_hook(self, hook: WriteHook) -> None:
+        """Call hook with every frame written to the store"""
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: WriteHook) -> None:
+        with self._lock:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+
+    def write(self, data: Dict[ChannelParam, object]) -> None:
+        """
+        Write one frame of samples.
+
+        Data channels take their timestamps from their index channel when it is
+        part of the same frame, and from the current time otherwise.
+        """
+        now = int(sy.TimeStamp.now())
+        with self._lock:
+            frame: Dict[int, np.ndarray] = {}
+            for param, values in data.items():
+                key = self.resolve([param])[0]
+                channel = self.channels[key]
+                values = np.atleast_1d(np.asarray(values))
+                frame[key] = values.astype(numpy_dtype(channel.data_type), copy=False)
+
+            for key, values in frame.items():
+                if len(values) == 0:
+                    continue
+                channel = self.channels[key]
+                if channel.is_index:
+                    stamps = values
+                elif channel.index in frame and len(frame[channel.index]) == len(values):
+                    stamps = frame[channel.index]
+                else:
+                    stamps = now + np.arange(len(values), dtype=np.int64)
+                if not channel.virtual:
+                    self._data[key].append((stamps, values))
+                self._latest[key] = values[-1]
+
+            for keys, inbox in self._subscribers:
+                selected = {k: v for k, v in frame.items() if k in keys}
+                if selected:
+                    inbox.put(selected)
+
+            hooks = list(self._hooks)
+            self.changed.notify_all()
+
+        for hook in hooks:
+            hook(frame)
+
+    def latest(self, key: int):
+        with self._lock:
+            return self._latest.get(key)
+
+    def read(
+        self, key: int, start: int = 0, end: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Persisted (timestamps, values) of a channel in [start, end)"""
+        with self._lock:
+            chunks = list(self._data.get(key, []))
+            dtype = numpy_dtype(self.channels[key].data_type)
+
+        if not chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=dtype)
+
+        stamps = np.concatenate([c[0] for c in chunks])
+        values = np.concatenate([c[1] for c in chunks])
+        mask = stamps >= start
+        if end is not None:
+            mask &= stamps < end
+        return stamps[mask], values[mask]
+
+    def bounds(self, keys: Iterable[int]) -> Tuple[Optional[int], Optional[int]]:
+        """First and last persisted timestamp across the given channels"""
+        with self._lock:
+            stamps = [
+                (chunk[0][0], chunk[0][-1])
+                for key in keys
+                for chunk in self._data.get(key, [])
+                if len(chunk[0])
+            ]
+        if not stamps:
+            return None, None
+        return min(s[0] for s in stamps), max(s[1] for s in stamps)
+
+    # Subscriptions
+
+    def subscribe(self, keys: Iterable[int]) -> queue.Queue:
+        inbox: queue.Queue = queue.Queue()
+        with self._lock:
+            self._subscribers.append((frozenset(keys), inbox))
+        return inbox
+
+    def unsubscribe(self, inbox: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[1] is not inbox]
@@ -0,0 +1,63 @@
+"""
+Synthetic sensor waveforms for the simulated backend.
+"""
+
+from fnmatch import fnmatchcase
+from typing import Dict
+
+import numpy as np
+
+from ..config.settings import WaveformConfig
+
+WAVEFORM_KINDS = ("sine", "square", "ramp", "noise", "constant")
+
+
+def select_waveform(
+    name: str, waveforms: Dict[str, WaveformConfig], default: WaveformConfig
+) -> WaveformConfig:
+    """Return the first waveform whose pattern matches the channel name"""
+    for pattern, waveform in waveforms.items():
+        if fnmatchcase(name, pattern):
+            return waveform
+    return default
+
+
+def generate(
+    waveform: WaveformConfig,
+    seconds: np.ndarray,
+    rng: np.random.Generator,
+    phase: float = 0.0,
+) -> np.ndarray:
+    """
+    Sample a waveform at the given times.
+
+    Args:
+        waveform: Waveform to generate
+        seconds: Sample times in seconds
+        rng: Random generator used for noise
+        phase: Phase offset in cycles, so channels sharing a waveform differ
+
+    Returns:
+        float64 array of samples, one per entry in seconds
+    """
+    cycles = waveform.frequency * seconds + phase
+
+    if waveform.kind == "sine":
+        values = waveform.amplitude * np.sin(2 * np.pi * cycles)
+    elif waveform.kind == "square":
+        values = waveform.amplitude * (np.mod(cycles, 1.0) < 0.5)
+    elif waveform.kind == "ramp":
+        values = waveform.amplitude * np.mod(cycles, 1.0)
+    elif waveform.kind == "noise":
+        values = rng.normal(0.0, waveform.amplitude, len(seconds))
+    elif waveform.kind == "constant":
+        values = np.full(len(seconds), waveform.amplitude, dtype=np.float64)
+    else:
+        raise ValueError(
+            f"Unknown waveform kind '{waveform.kind}', expected one of {WAVEFORM_KINDS}"
+        )
+
+    values = values + waveform.offset
+    if waveform.noise > 0:
+        values = values + rng.normal(0.0, waveform.noise, len(seconds))
+    return values.astype(np.float64)
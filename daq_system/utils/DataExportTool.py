@@ -220,6 +220,8 @@ def export_reduce_process(raw_data_file, range_name):
 
 if __name__ == "__main__":
     range_name = "12-17-Hotfire"
-    raw_data_file = rf"daq_system/utils//{range_name}/datadump_{range_name}.csv"
+    # export_data writes one group file per time index (Parquet by default)
+    # and manifest.json into this directory
+    raw_data_file = rf"daq_system/utils//{range_name}/datadump_{range_name}"
     export_reduce_process(raw_data_file, range_name)
     
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+Compressed binary archive of exported range data.
+
+An archive holds one index group. Its columns are stored in blocks of rows,
+one block per exported chunk:
+
+    b"DQARCH1\\n"
+    block 0: index deltas | channel A | channel B | ...   (each compressed)
+    block 1: ...
+    footer:  JSON block index
+    u64 footer length, b"DQARCH1\\n"
+
+The index column is delta encoded. The block stores its first timestamp and
+the int64 differences, which are almost constant at a fixed sample rate and so
+compress to nearly nothing. Data columns keep their native dtype. The exporter
+pads missing samples with NaN, which an integer column cannot hold. A padded
+integer column in a block therefore also gets a validity bitmap, and reads back
+as float64 with NaN where there was no sample, as it does from Parquet and CSV.
+The footer records every block's time span, row count and the byte range of
+each column and bitmap. A reader can therefore decompress only the blocks and
+columns it needs.
+
+Blocks are compressed with zstd, from the standard library on Python 3.14+ and
+the zstandard package before that, or with lz4 if the lz4 package is installed
+and it is asked for. zlib is only read, for archives written by earlier
+versions, which fell back to it when neither package was installed.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b"DQARCH1\n"
+VERSION = 2  # 2: validity bitmaps for padded integer columns
+_FOOTER_LENGTH = struct.Struct("<Q")
+
+
+def _zstd():
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        import zstandard
+
+        return (
+            lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+    return (lambda data: zstd.compress(data, level=3)), zstd.decompress
+
+
+def _lz4():
+    import lz4.frame
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+def _zlib():
+    return (lambda data: zlib.compress(data, 6)), zlib.decompress
+
+
+_CODECS = {"zstd": _zstd, "lz4": _lz4, "zlib": _zlib}
+WRITE_CODECS = ("zstd", "lz4")  # zlib is only read
+
+
+def _codec(name: str):
+    if name not in _CODECS:
+        raise ValueError(f"Unknown archive codec {name}; choose from {', '.join(_CODECS)}")
+    try:
+        return name, _CODECS[name]()
+    except ImportError as e:
+        raise ImportError(f"The {name} codec needs its package installed: {e}") from e
+
+
+class ArchiveWriter:
+    """Appends blocks of columns to an archive file"""
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        index: str,
+        dtypes: Dict[str, np.dtype],
+        metadata: Optional[Dict[str, str]] = None,
+        codec: str = "zstd",
+    ):
+        """
+        Args:
+            path: File to create
+            index: Name of the timestamp column (int64 ns)
+            dtypes: NumPy dtype of every column, index first
+            metadata: String key/value pairs stored in the footer
+            codec: "zstd" or "lz4"
+        """
+        if codec not in WRITE_CODECS:
+            raise ValueError(
+                f"Cannot write archive codec {codec}; choose from {', '.join(WRITE_CODECS)}"
+            )
+        self.codec, (self._compress, _) = _codec(codec)
+        self.index = index
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in dtypes.items()}
+        self.metadata = metadata or {}
+        self.blocks: List[Dict] = []
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def _put(self, data: bytes) -> List[int]:
+        offset = self._file.tell()
+        compressed = self._compress(data)
+        self._file.write(compressed)
+        return [offset, len(compressed)]
+
+    def write_block(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append one block. Timestamps must be sorted within and across blocks."""
+        stamps = np.asarray(columns[self.index], dtype=np.int64)
+        if len(stamps) == 0:
+            return
+        block = {
+            "start": int(stamps[0]),
+            "end": int(stamps[-1]),
+            "rows": len(stamps),
+            "columns": {self.index: self._put(np.diff(stamps).tobytes())},
+        }
+        for name, dtype in self.dtypes.items():
+            if name == self.index:
+                continue
+            values = np.asarray(columns[name])
+            if values.dtype != dtype:
+                if dtype.kind in "iub" and values.dtype.kind == "f":
+                    # Keep NaN padding as "no sample" rather than a real 0
+                    valid = ~np.isnan(values)
+                    if not valid.all():
+                        block.setdefault("valid", {})[name] = self._put(
+                            np.packbits(valid).tobytes()
+                        )
+                        values = np.where(valid, values, 0)
+                values = values.astype(dtype)
+            block["columns"][name] = self._put(np.ascontiguousarray(values).tobytes())
+        self.blocks.append(block)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        footer = json.dumps(
+            {
+                "version": VERSION,
+                "codec": self.codec,
+                "index": self.index,
+                "dtypes": {name: dtype.str for name, dtype in self.dtypes.items()},
+                "metadata": self.metadata,
+                "blocks": self.blocks,
+            }
+        ).encode()
+        self._file.write(footer)
+        self._file.write(_FOOTER_LENGTH.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+
+class ArchiveReader:
+    """
+    Random access to an archive by time.
+
+    Usage:
+        reader = ArchiveReader("Dev5_BCLS_ai_time.dqa")
+        data = reader.read(["PT_OX_02"], start=t0, end=t0 + 10**9)
+        data["Dev5_BCLS_ai_time"], data["PT_OX_02"]
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a DAQ archive")
+            tail = len(MAGIC) + _FOOTER_LENGTH.size
+            f.seek(-tail, os.SEEK_END)
+            (length,) = _FOOTER_LENGTH.unpack(f.read(_FOOTER_LENGTH.size))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is truncated")
+            f.seek(-(tail + length), os.SEEK_END)
+            footer = json.loads(f.read(length))
+
+        _, (_, self._decompress) = _codec(footer["codec"])
+        self.codec = footer["codec"]
+        self.index: str = footer["index"]
+        self.dtypes = {name: np.dtype(s) for name, s in footer["dtypes"].items()}
+        self.metadata: Dict[str, str] = footer["metadata"]
+        self.blocks: List[Dict] = footer["blocks"]
+        self._starts = np.array([b["start"] for b in self.blocks], dtype=np.int64)
+        self._ends = np.array([b["end"] for b in self.blocks], dtype=np.int64)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.dtypes)
+
+    @property
+    def rows(self) -> int:
+        return sum(b["rows"] for b in self.blocks)
+
+    def _column(self, f, block: Dict, name: str) -> np.ndarray:
+        offset, length = block["columns"][name]
+        f.seek(offset)
+        data = self._decompress(f.read(length))
+        if name == self.index:
+            deltas = np.frombuffer(data, dtype=np.int64)
+            return np.cumsum(np.r_[np.int64(block["start"]), deltas], dtype=np.int64)
+        values = np.frombuffer(data, dtype=self.dtypes[name])
+        if name in block.get("valid", {}):
+            offset, length = block["valid"][name]
+            f.seek(offset)
+            bits = np.frombuffer(self._decompress(f.read(length)), dtype=np.uint8)
+            valid = np.unpackbits(bits, count=block["rows"]).astype(bool)
+            values = np.where(valid, values, np.nan)
+        return values
+
+    def iter_blocks(
+        self,
+        channels: Optional[List[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yield the blocks overlapping [start, end) as columns, index first.
+
+        Args:
+            channels: Data columns to decode; default all
+            start: Inclusive start in ns; default the first sample
+            end: Exclusive end in ns; default past the last sample
+        """
+        names = [c for c in self.columns if c != self.index] if channels is None else channels
+        unknown = [n for n in names if n not in self.dtypes]
+        if unknown:
+            raise KeyError(f"Not in {self.path.name}: {', '.join(unknown)}")
+
+        selected = np.ones(len(self.blocks), dtype=bool)
+        if start is not None:
+            selected &= self._ends >= start
+        if end is not None:
+            selected &= self._starts < end
+
+        with open(self.path, "rb") as f:
+            for i in np.flatnonzero(selected):
+                block = self.blocks[i]
+                stamps = self._column(f, block, self.index)
+                lo = 0 if start is None else int(np.searchsorted(stamps, start, "left"))
+                hi = len(stamps) if end is None else int(np.searchsorted(stamps, end, "left"))
+                if hi <= lo:
+                    continue
+                out = {self.index: stamps[lo:hi]}
+                for name in names:
+                    if name != self.index:
+                        out[name] = self._column(f, block, name)[lo:hi]
+                yield out
+
+    def read(
+        self,
+        channels: Optional[List[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Columns over [start, end), concatenated across blocks"""
+        names = [self.index] + [
+            c for c in (channels if channels is not None else self.columns) if c != self.index
+        ]
+        parts = list(self.iter_blocks(channels, start, end))
+        if not parts:
+            return {name: np.empty(0, dtype=self.dtypes[name]) for name in names}
+        return {name: np.concatenate([p[name] for p in parts]) for name in names}
@@ -4,6 +4,8 @@ import re
 import os
 import argparse
 from collections import defaultdict
+from daq_system.utils.export_formats import load_manifest, manifest_files, read_group_columns
+from daq_system.utils.reduce_engine import TimeBucketMeans, scan_groups
 # uv pip install pandas pyarrow fastparquet
 
 def find_column_groups(columns):
@@ -91,74 +93,85 @@ def find_column_groups(columns):
         )
     return time_col_map
 
-def process_data_reduction(input_filepath, range_name):
-    RESAMPLE_FREQ = "10ms"
+# Export formats the reducer reads, in order of preference when an index was
+# exported in several formats
+GROUP_FILE_SUFFIXES = (".parquet", ".arrow", ".dqa", ".csv")
+
+def process_data_reduction(input_filepath, range_name, start=None, end=None, channels=None, resample_freq="10ms"):
+    RESAMPLE_FREQ = resample_freq
     CHUNKSIZE = 1_000_000
     os.makedirs(rf"daq_system/utils/{range_name}", exist_ok=True)
     OUTPUT_CSV_FILEPATH = rf"daq_system/utils/{range_name}/reduced_{range_name}.csv"
     OUTPUT_PARQUET_FILEPATH = rf"daq_system/utils/{range_name}/reduced_{range_name}.parquet"
     """
-    Processes a large CSV file in chunks, applies time corrections, resamples
-    the data to a consistent frequency, and saves the result to Parquet and CSV files.
+    Reduces exported data to the mean of each channel per RESAMPLE_FREQ bucket,
+    applies time corrections, and saves the result to Parquet and CSV files.
+
+    The input is scanned lazily (see reduce_engine): only the needed columns
+    and, where the format allows, only the rows between `start` and `end` are
+    read. Buckets are merged across chunks and files, so memory stays bounded
+    by the size of the reduced output. `channels` limits the reduction to those
+    data channels.
     """
     print(f"Reading header from '{input_filepath}' to determine column structure...")
     try:
-        header_df = pd.read_csv(input_filepath, nrows=0)
-        column_groups = find_column_groups(header_df.columns)
+        # A directory holds one file per time index, as written by export_data.
+        # Its manifest names each file's index and channels; without one, the
+        # first column is the index and the rest are its data channels
+        if os.path.isdir(input_filepath) and load_manifest(input_filepath) is not None:
+            manifest = load_manifest(input_filepath)
+            input_files = {
+                str(path): {index: manifest["indexes"][index]["channels"]}
+                for index, path in manifest_files(manifest, input_filepath).items()
+            }
+        elif os.path.isdir(input_filepath):
+            by_index = {}
+            for name in sorted(os.listdir(input_filepath)):
+                stem, suffix = os.path.splitext(name)
+                if suffix in GROUP_FILE_SUFFIXES:
+                    by_index.setdefault(stem, []).append(name)
+            input_files = {}
+            for names in by_index.values():
+                name = min(names, key=lambda n: GROUP_FILE_SUFFIXES.index(os.path.splitext(n)[1]))
+                path = os.path.join(input_filepath, name)
+                columns = read_group_columns(path)
+                input_files[path] = {columns[0]: columns[1:]}
+        else:
+            header_df = pd.read_csv(input_filepath, nrows=0)
+            input_files = {input_filepath: find_column_groups(header_df.columns)}
     except FileNotFoundError:
         print(f"Error: Input file not found at '{input_filepath}'")
         return
+    if channels is not None:
+        wanted = set(channels)
+        input_files = {
+            path: {t: [c for c in cols if c in wanted] for t, cols in groups.items() if wanted & set(cols)}
+            for path, groups in input_files.items()
+        }
+        input_files = {path: groups for path, groups in input_files.items() if groups}
+    column_groups = {t: cols for groups in input_files.values() for t, cols in groups.items()}
     print("Identified the following data groups:")
     for time_col, data_cols in column_groups.items():
         print(f" - Time Column: '{time_col}' -> Data Columns: {len(data_cols)}")
     # --- Time Correction Configuration ---
     time_offset = pd.Timedelta(seconds=10.614)
     time_cols_to_shift = {"PT-HE-201_time", "PT-FU-201_time", "PT-OX-201_time"}
-    shifted_cols_reported = (
-        set()
-    )  # Used to print the correction message only once per column
-    all_resampled_chunks = []
-    print(f"\nStarting to process file in chunks of {CHUNKSIZE:,} rows...")
-    chunk_num = 1
-    with pd.read_csv(input_filepath, chunksize=CHUNKSIZE, low_memory=False) as reader:
-        for chunk in reader:
-            print(f"  Processing chunk {chunk_num}...")
-            chunk_num += 1
-            resampled_groups_in_chunk = []
-            for time_col, data_cols in column_groups.items():
-                cols_to_load = [time_col] + data_cols
-                group_df = chunk[cols_to_load].copy()
-                group_df.dropna(subset=[time_col], inplace=True)
-                if group_df.empty:
-                    continue
-                group_df[time_col] = pd.to_datetime(group_df[time_col], errors="coerce")
-                # --- Apply Time Correction for specific sensors ---
-                if time_col in time_cols_to_shift:
-                    if time_col not in shifted_cols_reported:
-                        print(
-                            f"Applying -{time_offset.total_seconds()}s time correction to '{time_col}'."
-                        )
-                        shifted_cols_reported.add(time_col)
-                    group_df[time_col] = group_df[time_col] - time_offset
-                group_df.dropna(subset=[time_col], inplace=True)
-                group_df.set_index(time_col, inplace=True)
-                # Ensure data columns are numeric, coercing errors
-                for col in data_cols:
-                    group_df[col] = pd.to_numeric(group_df[col], errors="coerce")
-                if not group_df.empty:
-                    resampled = group_df.resample(RESAMPLE_FREQ).mean()
-                    resampled_groups_in_chunk.append(resampled)
-            if resampled_groups_in_chunk:
-                combined_chunk = pd.concat(resampled_groups_in_chunk, axis=1)
-                all_resampled_chunks.append(combined_chunk)
-    if not all_resampled_chunks:
+    shifts = {col: time_offset.value for col in time_cols_to_shift if col in column_groups}
+    for time_col in shifts:
+        print(f"Applying -{time_offset.total_seconds()}s time correction to '{time_col}'.")
+    means = TimeBucketMeans(RESAMPLE_FREQ)
+    print(f"\nScanning input in chunks of {CHUNKSIZE:,} rows...")
+    for input_file, file_groups in input_files.items():
+        print(f"  Scanning {os.path.basename(input_file)}...")
+        for time_col, stamps, values in scan_groups(input_file, file_groups, start, end, shifts, CHUNKSIZE):
+            means.add(time_col, stamps, values)
+    if means.samples == 0:
         print(
             "No data was processed. The input file might be empty or in an unexpected format."
         )
         return
-    print("\nAll chunks processed. Combining results...")
-    final_df = pd.concat(all_resampled_chunks)
-    final_df = final_df.groupby(final_df.index).mean()
+    print(f"\nAll chunks processed ({means.samples:,} samples). Combining results...")
+    final_df = means.result()
     final_df.dropna(axis=1, how="all", inplace=True)
     print(f"\nData reduction complete.")
     print(f"Reduced data has {len(final_df)} rows.")
@@ -1,149 +1,168 @@
-from daq_system.config.settings import DAQConfig, DEFAULT_DEVICE_PATHS
+from daq_system.config.settings import DAQConfig
+from daq_system.core.discovery import DeviceDiscovery, find_wiring_files
+from daq_system.utils.synnax_client import connect
+from daq_system.utils.exceptions import ConfigurationError
+from daq_system.utils.export_formats import has_pyarrow
+from daq_system.utils.export_options import load_decimation, load_window
+from daq_system.utils.export_plan import plan_export
+from daq_system.utils.export_stream import DEFAULT_CHUNK_SIZE, DEFAULT_FORMATS, TRANSFORMS, export_groups
 from colorama import Fore, Style
 import synnax as sy
-import pandas as pd
+from pathlib import Path
 import colorama
 import yaml
-import csv
-import os
 
-pd.set_option("display.float_format", "{:.20f}".format)
 
-def safe_series_retrieve(the_range, channel_key, dtype=None):
-    """Safely retrieves a series from the Synnax range, handling IndexError if empty."""
+def export_device_paths(client, config):
+    """Wiring files of the devices on the rack, or every wiring file if the rack is offline."""
     try:
-        data = the_range[channel_key]
-        if not data or len(data) == 0:
-            print(Fore.YELLOW + f"WARNING: Data for '{channel_key}' is empty (length 0). Skipping." + Style.RESET_ALL)
-            return None
-        
-        series = pd.Series(data).reset_index(drop=True)
-        if dtype:
-            series = series.astype(dtype)
-        return series
-    except sy.exceptions.KeyError:
-        print(Fore.YELLOW + f"WARNING: Channel '{channel_key}' not found in range. Skipping." + Style.RESET_ALL)
-        return None
-    except IndexError:
-        # This catches the deep synnax error from calling len(data) == 0, though safe_series_retrieve should prevent it.
-        # It's a fallback for safety.
-        print(Fore.YELLOW + f"WARNING: An IndexError occurred for '{channel_key}', data likely empty. Skipping." + Style.RESET_ALL)
-        return None
-
-
-def export_data(range_name):
+        device_paths = DeviceDiscovery(client, config).wiring_paths()
+    except Exception as e:
+        print(Fore.YELLOW + f"WARNING: Device discovery failed ({e}). Using every wiring file." + Style.RESET_ALL)
+        device_paths = {}
+    return device_paths or find_wiring_files(config)
+
+
+def export_plan(client, config, yaml_data):
+    """Resolve the channels listed in export.yaml to their index, device and transform."""
+    plan = plan_export(export_device_paths(client, config), yaml_data['channels'])
+    if plan.missing:
+        print(Fore.YELLOW + f"WARNING: Not in any wiring file: {', '.join(plan.missing)}" + Style.RESET_ALL)
+    return plan
+
+
+def export_formats(yaml_data, formats=None):
+    """Formats to write: the argument, else export.yaml `formats`, else Parquet (CSV without pyarrow)."""
+    if formats is None:
+        formats = yaml_data.get('formats')
+        if isinstance(formats, str):
+            formats = [formats]
+        if formats is None:
+            formats = list(DEFAULT_FORMATS)
+            if not has_pyarrow():
+                print(Fore.YELLOW + "WARNING: pyarrow is not installed. Exporting CSV instead of Parquet." + Style.RESET_ALL)
+                formats = ['csv']
+        if yaml_data.get('csv') and 'csv' not in formats:
+            formats = [*formats, 'csv']
+    return list(formats)
+
+
+def export_data(range_name, chunk_size=None, formats=None, window=None, decimate=None, label=None):
+    """
+    Export the channels listed in export.yaml over a range, one file per time index.
+
+    Files are written to daq_system/utils/<range>/datadump_<range>/<index>.parquet,
+    chunk by chunk, so the range never has to fit in memory. Set `formats` (or
+    `formats:` in export.yaml) to any of parquet, arrow and csv; `csv: true` in
+    export.yaml adds CSV copies next to the Parquet files. Index groups are read
+    `workers` at a time (export.yaml, else DAQConfig.export_workers).
+
+    With `shard_span` set (export.yaml, else DAQConfig.export_shard_span), the
+    range is exported in shards of that many seconds with a progress journal, so
+    if the export is interrupted, running it again for the same range continues
+    where it stopped. The default of 0 writes straight to the final files.
+
+    `window` and `decimate` (dicts, else the same keys in export.yaml; see
+    export_options) restrict the export to a span around an event and thin the
+    samples. A `label` is appended to the output directory name.
+
+    Returns:
+        Path of the output directory, or None if the range does not exist
+    """
     colorama.init()
 
-    export_client = sy.Synnax(
-        host=DAQConfig.host,
-        port=DAQConfig.port,
-        username=DAQConfig.username,
-        password=DAQConfig.password,
-    )
-
-    output_df = pd.DataFrame()
+    config = DAQConfig()
+    export_client = connect(config)
 
     # File of channels to export.
     with open('daq_system/utils/export.yaml') as f:
         yaml_data = yaml.safe_load(f)
-        os.makedirs(rf"daq_system/utils/{range_name}", exist_ok=True)
-        try:
-            the_range = export_client.ranges.retrieve(name = range_name)
-        except sy.exceptions.QueryError:
-            print(Style.BRIGHT + Fore.RED + 'That range does not exist!!' + Style.RESET_ALL)
-            return
-
-        # -------------------------------------------------------------
-        # ANALOG INPUT (AI) CHANNELS
-        # -------------------------------------------------------------
-        for j in DEFAULT_DEVICE_PATHS.values():
-            ai_excel_file = pd.read_excel(j.data_wiring, sheet_name='AI_slope-offset')
-            di_excel_file = pd.read_excel(j.data_wiring, sheet_name='DI')
-            do_excel_file = pd.read_excel(j.control_wiring, sheet_name = 'DO')
-            
-            device_name = next(
-                key for key, value in DEFAULT_DEVICE_PATHS.items() if value == j
+
+    try:
+        the_range = export_client.ranges.retrieve(name = range_name)
+    except sy.exceptions.QueryError:
+        print(Style.BRIGHT + Fore.RED + 'That range does not exist!!' + Style.RESET_ALL)
+        return None
+
+    plan = export_plan(export_client, config, yaml_data)
+    groups = plan.groups()
+    time_range = the_range.time_range
+    try:
+        window = load_window(yaml_data.get('window') if window is None else window)
+        decimation = load_decimation(yaml_data.get('decimate') if decimate is None else decimate)
+        export_range = time_range
+        if window:
+            # An anchor in the plan is read as exported, e.g. DO states inverted
+            anchor = plan.channels.get(window.anchor)
+            export_range = window.resolve(
+                export_client,
+                time_range,
+                anchor.channel if anchor else None,
+                TRANSFORMS[anchor.transform] if anchor and anchor.transform else None,
             )
+    except ConfigurationError as e:
+        print(Style.BRIGHT + Fore.RED + f'Cannot export {range_name}: {e}' + Style.RESET_ALL)
+        return None
+
+    suffix = f"_{label}" if label else ""
+    out_dir = Path(rf"daq_system/utils/{range_name}/datadump_{range_name}{suffix}")
+    metadata = {
+        'range': range_name,
+        'range_key': str(the_range.key),
+        'start_ns': str(int(time_range.start)),
+        'end_ns': str(int(time_range.end)),
+        'export_start_ns': str(int(export_range.start)),
+        'export_end_ns': str(int(export_range.end)),
+        'exported_at': sy.TimeStamp.now().datetime().isoformat(),
+    }
+    if decimation is not None:
+        print(f"Decimating: {decimation.method}")
+    written = export_groups(
+        export_client,
+        export_range,
+        groups,
+        out_dir,
+        chunk_size or yaml_data.get('chunk_size', DEFAULT_CHUNK_SIZE),
+        export_formats(yaml_data, formats),
+        metadata,
+        workers=yaml_data.get('workers', config.export_workers),
+        retries=config.export_retries,
+        retry_delay=config.export_retry_delay,
+        annotations=plan.annotations(),
+        shard_span=yaml_data.get('shard_span', config.export_shard_span),
+        decimation=decimation,
+    )
 
-            print(device_name)
-            for i, ch_name in enumerate(ai_excel_file['Name']):
-                row = ai_excel_file.iloc[i]
-                if ch_name in yaml_data['channels']:
-                    # Retrieve the main AI time series once
-                    ai_time_key = f"{device_name}_BCLS_ai_time"
-                    if ai_time_key not in output_df.columns:
-                        time_series = safe_series_retrieve(the_range, ai_time_key, dtype='int64')
-                        if time_series is not None:
-                             output_df[ai_time_key] = time_series
-                             #print(ai_time_key)
-
-                    # Retrieve the AI data series
-                    data_series = safe_series_retrieve(the_range, ch_name)
-                    if data_series is not None:
-                        output_df[ch_name] = data_series
-                        print(ch_name)
-
-
-            # -------------------------------------------------------------
-            # DIGITAL INPUT (DI) CHANNELS
-            # -------------------------------------------------------------
-            for i, ch_name in enumerate(di_excel_file['Name']):
-                row = di_excel_file.iloc[i]
-                if ch_name in yaml_data['channels']:
-                    # Retrieve DI Time
-                    di_time_key = f"BCLS_di_time_{ch_name}"
-                    time_series = safe_series_retrieve(the_range, di_time_key, dtype='int64')
-                    if time_series is not None:
-                         output_df[di_time_key] = time_series
-                         #print(di_time_key)
-
-                    # Retrieve DI Data
-                    data_series = safe_series_retrieve(the_range, ch_name)
-                    if data_series is not None:
-                        output_df[ch_name] = data_series
-                        print(ch_name)
-
-            #Do state channels
-            for i, ch_name in enumerate(do_excel_file['Name']):
-                row = do_excel_file.iloc[i]
-                if ch_name in yaml_data['channels']:
-                    # Retrieve State Time
-                    do_time_key = f"{device_name}_state_time"
-                    time_series = safe_series_retrieve(the_range, do_time_key, dtype='int64')
-                    if time_series is not None:
-                        output_df[do_time_key] = time_series
-                        #print(do_time_key)
-
-                    # Retrieve DO Data
-                    state_data_series = safe_series_retrieve(the_range, f'{ch_name}_state')
-                    if state_data_series is not None:
-                        output_df[f'{ch_name}_state'] = 1 - state_data_series
-                        print(f'{ch_name}_state')
-        
-        # -------------------------------------------------------------
-        # AVIONICS CHANNELS
-        # -------------------------------------------------------------
-        avi_excel_file = pd.read_excel('daq_system/inputs/CMS_Avionics_Channels.xlsx', sheet_name='telem_channels')
-        for ch_name in avi_excel_file['Name']:
-            if ch_name in yaml_data['channels']:
-                #print(f'supposed to export {ch_name}')
-                # Retrieve Avionics Time
-                avi_time_key = f"{ch_name}_time"
-                time_series = safe_series_retrieve(the_range, avi_time_key)
-                if time_series is not None:
-                    output_df[avi_time_key] = time_series
-                    #print(avi_time_key)
-                    
-                # Retrieve Avionics Data
-                data_series = safe_series_retrieve(the_range, ch_name)
-                if data_series is not None:
-                    output_df[ch_name] = data_series
-                    print(ch_name)
-
-    print(output_df)
-    
-    output_df.to_csv(rf"daq_system/utils//{range_name}/datadump_{range_name}.csv", index=False, float_format='%.19f')
+    for index, paths in written.items():
+        print(f"{index}: {', '.join(groups[index].channels)} -> {', '.join(str(p) for p in paths)}")
+    if not written:
+        print(Fore.YELLOW + "WARNING: Nothing was exported." + Style.RESET_ALL)
+    return out_dir
+
+
+def export_variants(range_name):
+    """
+    Run every export listed under `variants` in export.yaml, e.g. a tight hotfire
+    window at full rate plus the whole fill decimated. Without variants, runs a
+    single export_data.
+
+    Returns:
+        Output directory of each variant, keyed by label
+    """
+    with open('daq_system/utils/export.yaml') as f:
+        variants = (yaml.safe_load(f) or {}).get('variants')
+    if not variants:
+        return {None: export_data(range_name)}
+    return {
+        v['label']: export_data(
+            range_name,
+            window=v.get('window', {}),
+            decimate=v.get('decimate', {}),
+            label=v['label'],
+        )
+        for v in variants
+    }
 
 if __name__ == '__main__':
     range_name = "12-17-Hotfire"
-    export_data(range_name)
\ No newline at end of file
+    export_variants(range_name)
@@ -0,0 +1,304 @@
+"""
+File formats for exported index groups.
+
+Every writer receives one chunk of a group at a time, as a dict of NumPy
+columns, and streams it straight into its file. Parquet and Arrow IPC keep each
+channel's native dtype (float32 data, uint8 states, int64 ns timestamps) and
+carry the range metadata in the file schema. The archive format (see archive)
+is meant for long-term storage: it is compressed and delta-encoded, and can be
+read back by time without decoding the whole file. CSV is kept for tools that
+need text.
+
+pyarrow is only imported when a Parquet or Arrow file is written.
+
+Next to the group files, every export writes `manifest.json`, which maps each
+data channel to its index and to the files holding it:
+
+    {
+      "version": 1,
+      "metadata": {"range": "12-17-Hotfire", "start_ns": "...", ...},
+      "formats": ["parquet"],
+      "indexes": {
+        "Dev5_BCLS_ai_time": {
+          "channels": ["PT_OX_02", ...],
+          "rows": 1200000,
+          "files": {"parquet": "Dev5_BCLS_ai_time.parquet"}
+        }
+      },
+      "channels": {
+        "PT_OX_02": {"index": "Dev5_BCLS_ai_time", "data_type": "float32"},
+        "SV_HE_01_state": {"index": "Dev5_state_time", "data_type": "uint8",
+                           "transform": "invert_state"}
+      }
+    }
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from daq_system.utils.archive import ArchiveReader, ArchiveWriter
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Arrow files need pyarrow, a project dependency: run uv sync"
+        ) from e
+    return pyarrow
+
+
+def has_pyarrow() -> bool:
+    try:
+        require_pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+class GroupWriter(ABC):
+    """
+    Writes the chunks of one index group to `path`.
+
+    Data goes to a temporary `.partial` file that is renamed on close(), so an
+    interrupted export never leaves a truncated file under the final name.
+    """
+
+    suffix = ""
+
+    def __init__(
+        self,
+        path: Path,
+        columns: List[str],
+        dtypes: Dict[str, np.dtype],
+        metadata: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            path: Final file path
+            columns: Column order; the first column is the index
+            dtypes: NumPy dtype of every column
+            metadata: String key/value pairs describing the export
+        """
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".partial")
+        self.columns = columns
+        self.dtypes = dtypes
+        self.metadata = metadata or {}
+        self.rows = 0
+
+    def write(self, chunk: Dict[str, np.ndarray]) -> None:
+        self._write(chunk)
+        self.rows += len(chunk[self.columns[0]])
+
+    @abstractmethod
+    def _write(self, chunk: Dict[str, np.ndarray]) -> None:
+        """Append one chunk to the partial file"""
+
+    @abstractmethod
+    def _close(self) -> None:
+        """Flush and close the partial file; called again after an abort"""
+
+    def close(self) -> Optional[Path]:
+        """Finish the file. Returns its path, or None if nothing was written."""
+        self._close()
+        if self.rows == 0:
+            self.tmp_path.unlink(missing_ok=True)
+            return None
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        """Discard the partial file after a failure"""
+        try:
+            self._close()
+        finally:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+class CsvGroupWriter(GroupWriter):
+    suffix = ".csv"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._file = open(self.tmp_path, "w", newline="")
+
+    def _write(self, chunk: Dict[str, np.ndarray]) -> None:
+        pd.DataFrame(chunk, columns=self.columns).to_csv(
+            self._file, header=self.rows == 0, index=False
+        )
+
+    def _close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class _ArrowGroupWriter(GroupWriter):
+    """Shared schema handling of the Parquet and Arrow IPC writers"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        pa = require_pyarrow()
+        self._pa = pa
+        fields = [pa.field(name, pa.from_numpy_dtype(self.dtypes[name])) for name in self.columns]
+        metadata = {**self.metadata, "index": self.columns[0]}
+        metadata["dtypes"] = json.dumps({n: np.dtype(self.dtypes[n]).name for n in self.columns})
+        self.schema = pa.schema(fields, metadata=metadata)
+        self._writer = None
+
+    def _table(self, chunk: Dict[str, np.ndarray]):
+        pa = self._pa
+        arrays = []
+        for field in self.schema:
+            values = np.asarray(chunk[field.name])
+            # NaN padding of integer columns becomes null
+            array = pa.array(values, from_pandas=True)
+            arrays.append(array.cast(field.type, safe=False))
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetGroupWriter(_ArrowGroupWriter):
+    """One Parquet row group per chunk"""
+
+    suffix = ".parquet"
+
+    def __init__(self, *args, compression: str = "zstd", **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer = self._pa.parquet.ParquetWriter(
+            self.tmp_path, self.schema, compression=compression
+        )
+
+    def _write(self, chunk: Dict[str, np.ndarray]) -> None:
+        self._writer.write_table(self._table(chunk))
+
+
+class ArrowGroupWriter(_ArrowGroupWriter):
+    """Arrow IPC (Feather v2) file, one record batch per chunk"""
+
+    suffix = ".arrow"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer = self._pa.ipc.new_file(str(self.tmp_path), self.schema)
+
+    def _write(self, chunk: Dict[str, np.ndarray]) -> None:
+        self._writer.write_table(self._table(chunk))
+
+
+class ArchiveGroupWriter(GroupWriter):
+    """Compressed archive, one block per chunk"""
+
+    suffix = ".dqa"
+
+    def __init__(self, *args, codec: str = "zstd", **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer = ArchiveWriter(
+            self.tmp_path, self.columns[0], self.dtypes, self.metadata, codec
+        )
+
+    def _write(self, chunk: Dict[str, np.ndarray]) -> None:
+        self._writer.write_block(chunk)
+
+    def _close(self) -> None:
+        self._writer.close()
+
+
+def read_group_columns(path: Path) -> List[str]:
+    """Column names of a group file, index first"""
+    path = Path(path)
+    if path.suffix == ".csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if path.suffix == ArchiveGroupWriter.suffix:
+        return ArchiveReader(path).columns
+    pa = require_pyarrow()
+    if path.suffix == ".parquet":
+        return pa.parquet.read_schema(path).names
+    with pa.ipc.open_file(path) as reader:
+        return reader.schema.names
+
+
+def read_group_file(path: Path, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Read a group file back as DataFrames of at most batch_size rows"""
+    path = Path(path)
+    if path.suffix == ".csv":
+        with pd.read_csv(path, chunksize=batch_size, low_memory=False) as reader:
+            yield from reader
+        return
+    if path.suffix == ArchiveGroupWriter.suffix:
+        for block in ArchiveReader(path).iter_blocks():
+            table = pd.DataFrame(block)
+            for start in range(0, len(table), batch_size):
+                yield table.iloc[start : start + batch_size]
+        return
+    pa = require_pyarrow()
+    if path.suffix == ".parquet":
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+        return
+    with pa.ipc.open_file(path) as reader:
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
+
+
+WRITERS = {
+    "parquet": ParquetGroupWriter,
+    "arrow": ArrowGroupWriter,
+    "csv": CsvGroupWriter,
+    "archive": ArchiveGroupWriter,
+}
+
+
+def write_manifest(out_dir: Path, manifest: Dict) -> Path:
+    """Write `manifest.json` into an export directory, replacing it atomically"""
+    path = Path(out_dir) / MANIFEST_NAME
+    tmp_path = path.with_name(path.name + ".partial")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, **manifest}, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_manifest(out_dir: Path) -> Optional[Dict]:
+    """The manifest of an export directory, or None if it has none"""
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def manifest_files(
+    manifest: Dict,
+    out_dir: Path,
+    prefer: Tuple[str, ...] = ("parquet", "arrow", "archive", "csv"),
+) -> Dict[str, Path]:
+    """
+    One file per index from a manifest, in the first available preferred format.
+
+    Returns:
+        File paths keyed by index channel name
+    """
+    files = {}
+    for index, entry in manifest["indexes"].items():
+        for fmt in prefer:
+            if fmt in entry["files"]:
+                files[index] = Path(out_dir) / entry["files"][fmt]
+                break
+    return files
@@ -0,0 +1,145 @@
+"""
+Progress journal of a resumable export.
+
+A sharded export splits the range into fixed time spans and writes every span
+of every group to its own shard file. Each finished shard, and each group
+whose shards have been consolidated into its final files, gets one JSON line
+in the journal, which is flushed to disk at once. When the export is rerun with
+the same range, groups, shard span and formats, finished work is skipped. If anything
+differs, the journal and shards are discarded and the export starts over.
+
+    {"header": {"start": ..., "end": ..., "shard_ns": ..., "formats": [...], "groups": {...}}}
+    {"index": "Dev5_BCLS_ai_time", "shard": 1734451200000000000, "rows": 300000, "phase": 3}
+    {"index": "Dev5_BCLS_ai_time", "consolidated": true, "rows": 3600000}
+
+`phase` is the every_nth decimation phase at the end of the shard, from which
+the next shard continues.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import shutil
+import threading
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = ".export_journal.jsonl"
+SHARD_DIR_NAME = ".shards"
+
+
+class ExportJournal:
+    """Shards and groups finished by earlier runs of the same export"""
+
+    def __init__(self, out_dir: Path, header: Dict):
+        """
+        Open the journal in `out_dir`, keeping its progress only if it was
+        written for the same `header`.
+
+        Args:
+            out_dir: Export output directory
+            header: JSON-serializable description of the export (range, shard
+                span, groups). Progress is only reused for an identical header.
+        """
+        self.path = Path(out_dir) / JOURNAL_NAME
+        self.shard_dir = Path(out_dir) / SHARD_DIR_NAME
+        self.header = json.loads(json.dumps(header))  # As it reads back from disk
+        self._lock = threading.Lock()
+        self._shards: Dict[Tuple[str, int], Tuple[int, int]] = {}  # (index, shard start) -> (rows, phase)
+        self._groups: Dict[str, int] = {}  # index -> consolidated rows
+
+        if self._load():
+            logger.info(
+                f"Resuming export: {len(self._shards)} shards and "
+                f"{len(self._groups)} groups already done"
+            )
+        else:
+            self._reset()
+
+    def _load(self) -> bool:
+        """Read earlier progress. Returns False if there is none to reuse."""
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path) as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+        except (OSError, json.JSONDecodeError) as e:
+            # A torn last line means the process died mid-write; drop the lot
+            # rather than guess which shards are whole
+            logger.warning(f"Discarding unreadable export journal {self.path}: {e}")
+            return False
+        if not lines or lines[0].get("header") != self.header:
+            logger.warning("Export settings changed since the last run; starting over")
+            return False
+
+        for entry in lines[1:]:
+            if entry.get("consolidated"):
+                self._groups[entry["index"]] = entry["rows"]
+            else:
+                self._shards[(entry["index"], entry["shard"])] = (
+                    entry["rows"],
+                    entry.get("phase", 0),
+                )
+        return True
+
+    def _reset(self) -> None:
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"header": self.header}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append(self, entry: Dict) -> None:
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def shard_rows(self, index: str, start: int) -> Optional[int]:
+        """Rows of a finished shard, or None if it still has to be exported"""
+        with self._lock:
+            done = self._shards.get((index, start))
+        return None if done is None else done[0]
+
+    def shard_phase(self, index: str, start: int) -> int:
+        """every_nth decimation phase at the end of a finished shard"""
+        with self._lock:
+            return self._shards[(index, start)][1]
+
+    def record_shard(self, index: str, start: int, rows: int, phase: int = 0) -> None:
+        self._append({"index": index, "shard": start, "rows": rows, "phase": phase})
+        with self._lock:
+            self._shards[(index, start)] = (rows, phase)
+
+    def group_rows(self, index: str, paths: List[Path]) -> Optional[int]:
+        """
+        Rows of a consolidated group, or None if it is not finished.
+
+        A group whose final files in `paths` are missing, e.g. deleted since
+        the last run, is not finished and its shards are exported again.
+        """
+        with self._lock:
+            rows = self._groups.get(index)
+            if rows and not all(Path(path).exists() for path in paths):
+                logger.warning(f"{index}: consolidated files are missing, exporting it again")
+                del self._groups[index]
+                # Its shards were removed when it was consolidated
+                for key in [key for key in self._shards if key[0] == index]:
+                    del self._shards[key]
+                return None
+            return rows
+
+    def record_group(self, index: str, rows: int) -> None:
+        self._append({"index": index, "consolidated": True, "rows": rows})
+        with self._lock:
+            self._groups[index] = rows
+        shutil.rmtree(self.shard_dir / index, ignore_errors=True)
+
+    def finish(self) -> None:
+        """Remove the journal and the shards once the export is complete"""
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+        self.path.unlink(missing_ok=True)
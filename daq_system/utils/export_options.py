@@ -0,0 +1,307 @@
+"""
+Time window and decimation options of a range export.
+
+ExportWindow narrows the export to a span around an anchor, which can be an
+absolute time or the first time a channel changes to a value. For example, this is
+T-30 s to T+30 s around the actuator being energized:
+
+    window:
+      anchor: ACTUATOR
+      value: 1
+      start: -30
+      end: 30
+
+A valve anchor is read from its `_state` channel through the export plan, so
+the value is compared after the DO inversion (1 means energized).
+
+Decimation reduces the samples written:
+
+    every_nth  keep every Nth sample (factor). With server: true the Synnax
+               server drops the samples, so they are never transferred.
+    mean       mean of each channel per time bucket (bucket, seconds)
+    minmax     min and max of each channel per time bucket, written as
+               {channel}_min and {channel}_max, so peaks survive plotting
+
+Buckets are aligned to the start of the export and stamped with their start
+time. A Decimator carries a partial bucket and the every_nth phase over to the
+next chunk, so chunk boundaries do not change the result. A sharded export
+starts each shard's decimator at the phase the previous shard ended with, so
+shard boundaries do not change it either. The exception is every_nth with
+server: true. The server starts counting again in every iterator, so with a
+shard_span it keeps different samples than an unsharded export.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+import synnax as sy
+
+from daq_system.utils.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+EVERY_NTH = "every_nth"
+MEAN = "mean"
+MINMAX = "minmax"
+
+Chunk = Dict[str, np.ndarray]
+
+
+@dataclass
+class ExportWindow:
+    """Export from `start` to `end` seconds relative to `anchor`"""
+
+    start: Optional[float] = None  # None: beginning of the range
+    end: Optional[float] = None  # None: end of the range
+    anchor: Optional[str] = None  # Channel name or ISO time; None: range start
+    value: float = 1  # The anchor is the first change of the channel to this value
+
+    def resolve(
+        self,
+        client: sy.Synnax,
+        time_range: sy.TimeRange,
+        channel: Optional[str] = None,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> sy.TimeRange:
+        """
+        The absolute window, clipped to the range.
+
+        Args:
+            client: Synnax client
+            time_range: Range being exported
+            channel: Synnax channel to read for a channel anchor, if it is not
+                the anchor name itself
+            transform: Applied to the anchor channel before comparing with value
+
+        Raises:
+            ConfigurationError: If the anchor event is not in the range, or the
+                window does not overlap it
+        """
+        range_start, range_end = int(time_range.start), int(time_range.end)
+        anchor = range_start
+        if self.anchor is not None:
+            anchor = _parse_time(self.anchor)
+            if anchor is None:
+                anchor = find_event(
+                    client, time_range, channel or self.anchor, self.value, transform
+                )
+                if anchor is None:
+                    raise ConfigurationError(
+                        f"{self.anchor} never changes to {self.value:g} in the range"
+                    )
+
+        start = range_start if self.start is None else anchor + int(self.start * 1e9)
+        end = range_end if self.end is None else anchor + int(self.end * 1e9)
+        start, end = max(start, range_start), min(end, range_end)
+        if start >= end:
+            raise ConfigurationError("The export window does not overlap the range")
+        return sy.TimeRange(sy.TimeStamp(start), sy.TimeStamp(end))
+
+
+def _parse_time(text: str) -> Optional[int]:
+    try:
+        return int(sy.TimeStamp(datetime.fromisoformat(text)))
+    except ValueError:
+        return None
+
+
+def find_event(
+    client: sy.Synnax,
+    time_range: sy.TimeRange,
+    channel: str,
+    value: float,
+    transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Optional[int]:
+    """
+    Time at which `channel` first changes to `value` in the range, after
+    `transform` if one is given. A value held since the start of the range is
+    not a change.
+
+    Only the channel and its index are read, chunk by chunk, stopping at the
+    first match.
+
+    Returns:
+        Timestamp in ns, or None if the channel never changes to the value
+    """
+    found = client.channels.retrieve([channel])
+    if not found:
+        raise ConfigurationError(f"Anchor channel {channel} does not exist")
+    ch = found[0]
+    if not ch.index or ch.is_index:
+        raise ConfigurationError(f"Anchor channel {channel} is not stored against an index")
+
+    previous = None  # Last value of the previous chunk
+    with client.open_iterator(time_range, [ch.index, ch.key]) as iterator:
+        for frame in iterator:
+            if ch.key not in frame.channels or ch.index not in frame.channels:
+                continue
+            values = np.asarray(frame[ch.key])
+            if len(values) == 0:
+                continue
+            if transform is not None:
+                values = transform(values)
+            stamps = np.asarray(frame[ch.index])
+            before = np.r_[value if previous is None else previous, values[:-1]]
+            hits = np.flatnonzero((values == value) & (before != value))
+            if len(hits) and hits[0] < len(stamps):
+                return int(stamps[hits[0]])
+            previous = values[-1]
+    return None
+
+
+@dataclass
+class Decimation:
+    """How to thin the exported samples"""
+
+    method: str  # EVERY_NTH, MEAN or MINMAX
+    factor: int = 1  # every_nth: keep one sample in `factor`
+    bucket: float = 0.0  # mean/minmax: bucket length in seconds
+    server: bool = False  # every_nth: let the server drop the samples
+
+    def __post_init__(self):
+        if self.method not in (EVERY_NTH, MEAN, MINMAX):
+            raise ConfigurationError(
+                f"Unknown decimation {self.method}; use {EVERY_NTH}, {MEAN} or {MINMAX}"
+            )
+        if self.method == EVERY_NTH and self.factor < 1:
+            raise ConfigurationError("every_nth decimation needs a factor of at least 1")
+        if self.method != EVERY_NTH and self.bucket <= 0:
+            raise ConfigurationError(f"{self.method} decimation needs a positive bucket")
+        if self.server and self.method != EVERY_NTH:
+            raise ConfigurationError("The server can only decimate every_nth")
+
+    @property
+    def bucket_ns(self) -> int:
+        return int(self.bucket * 1e9)
+
+    @property
+    def downsample_factor(self) -> int:
+        """Factor for the server iterator; 1 when decimating client side"""
+        return self.factor if self.server else 1
+
+    def columns(self, channels: List[str]) -> List[Tuple[str, str, Optional[str]]]:
+        """Output data columns as (column, source channel, aggregate)"""
+        if self.method == MINMAX:
+            return [
+                (f"{name}_{agg}", name, agg) for name in channels for agg in ("min", "max")
+            ]
+        if self.method == MEAN:
+            return [(name, name, "mean") for name in channels]
+        return [(name, name, None) for name in channels]
+
+    def dtypes(self, index: str, source: Dict[str, np.dtype]) -> Dict[str, np.dtype]:
+        """Output dtypes; means are float64 whatever the source type"""
+        out = {index: source[index]}
+        for column, name, agg in self.columns([n for n in source if n != index]):
+            out[column] = np.dtype(np.float64) if agg == "mean" else source[name]
+        return out
+
+    def decimator(
+        self, index: str, channels: List[str], origin: int, phase: int = 0
+    ) -> Optional["Decimator"]:
+        """A streaming decimator, or None if the server does all the work"""
+        if self.server or (self.method == EVERY_NTH and self.factor == 1):
+            return None
+        return Decimator(self, index, channels, origin, phase)
+
+
+class Decimator:
+    """Decimates the chunks of one group as they stream past"""
+
+    def __init__(
+        self,
+        decimation: Decimation,
+        index: str,
+        channels: List[str],
+        origin: int,
+        phase: int = 0,
+    ):
+        """
+        Args:
+            decimation: Method and parameters
+            index: Index column name
+            channels: Data column names
+            origin: Time in ns that buckets are aligned to
+            phase: every_nth: samples already seen by an earlier decimator of
+                the same group, modulo factor, so a shard continues its count
+        """
+        self.decimation = decimation
+        self.index = index
+        self.channels = channels
+        self.origin = origin
+        self._phase = phase % decimation.factor  # every_nth: samples seen so far, modulo factor
+        self._pending: Optional[Chunk] = None  # Rows of the last, open bucket
+
+    def process(self, chunk: Chunk) -> Optional[Chunk]:
+        """Decimate one chunk. Returns None if nothing is complete yet."""
+        if self.decimation.method == EVERY_NTH:
+            n = len(chunk[self.index])
+            keep = (self._phase + np.arange(n)) % self.decimation.factor == 0
+            self._phase = (self._phase + n) % self.decimation.factor
+            return {name: values[keep] for name, values in chunk.items()}
+
+        if self._pending is not None:
+            chunk = {
+                name: np.concatenate([self._pending[name], values])
+                for name, values in chunk.items()
+            }
+        buckets = (chunk[self.index] - self.origin) // self.decimation.bucket_ns
+        # The last bucket may continue in the next chunk
+        split = int(np.searchsorted(buckets, buckets[-1], side="left"))
+        self._pending = {name: values[split:] for name, values in chunk.items()}
+        if split == 0:
+            return None
+        return self._reduce({name: values[:split] for name, values in chunk.items()}, buckets[:split])
+
+    @property
+    def phase(self) -> int:
+        """every_nth: where the next decimator of the group continues counting"""
+        return self._phase
+
+    def flush(self) -> Optional[Chunk]:
+        """Reduce the last open bucket at the end of the data"""
+        pending, self._pending = self._pending, None
+        if pending is None or len(pending[self.index]) == 0:
+            return None
+        buckets = (pending[self.index] - self.origin) // self.decimation.bucket_ns
+        return self._reduce(pending, buckets)
+
+    def _reduce(self, chunk: Chunk, buckets: np.ndarray) -> Chunk:
+        starts = np.flatnonzero(np.r_[True, np.diff(buckets) != 0])
+        out = {self.index: self.origin + buckets[starts] * self.decimation.bucket_ns}
+        for name in self.channels:
+            values = np.asarray(chunk[name], dtype=np.float64)
+            valid = ~np.isnan(values)
+            if self.decimation.method == MEAN:
+                sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+                counts = np.add.reduceat(valid.astype(np.int64), starts)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[name] = sums / counts
+            else:
+                with np.errstate(invalid="ignore"):
+                    out[f"{name}_min"] = np.fmin.reduceat(values, starts)
+                    out[f"{name}_max"] = np.fmax.reduceat(values, starts)
+        return out
+
+
+def load_decimation(config: Union[Dict, None]) -> Optional[Decimation]:
+    """Decimation from an export.yaml `decimate` entry, if there is one"""
+    if not config:
+        return None
+    try:
+        return Decimation(**config)
+    except TypeError as e:
+        raise ConfigurationError(f"Invalid decimate option: {e}")
+
+
+def load_window(config: Union[Dict, None]) -> Optional[ExportWindow]:
+    """ExportWindow from an export.yaml `window` entry, if there is one"""
+    if not config:
+        return None
+    try:
+        return ExportWindow(**config)
+    except TypeError as e:
+        raise ConfigurationError(f"Invalid window option: {e}")
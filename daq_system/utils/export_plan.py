@@ -0,0 +1,166 @@
+"""
+Export selection as a reusable plan.
+
+build_export_plan resolves the channels requested in export.yaml against the
+parsed wiring of every device and the avionics channel list, once, using set
+lookups. Each requested channel becomes a PlannedChannel naming the Synnax
+channel to read, its index channel, the device it is wired to, its expected
+data type and any transform applied on export. ExportPlan.groups() then
+drives retrieval, and the same plan can be inspected or saved by other tools.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from daq_system.config.settings import DeviceWiringPaths
+from daq_system.processing.wiring import DeviceWiring, load_device_wiring
+from daq_system.utils.export_stream import TRANSFORMS, ExportGroup
+from daq_system.utils.workbook_cache import read_sheet
+
+logger = logging.getLogger(__name__)
+
+AVIONICS_WORKBOOK = "daq_system/inputs/CMS_Avionics_Channels.xlsx"
+AVIONICS_SHEET = "telem_channels"
+AVIONICS = "avionics"  # Device name of the avionics channels
+
+# Kinds of planned channel
+AI = "ai"
+DI = "di"
+DO_STATE = "do_state"
+TELEMETRY = "telemetry"
+
+
+@dataclass
+class PlannedChannel:
+    """How one requested channel is exported"""
+
+    requested: str  # Name as listed in export.yaml
+    channel: str  # Synnax channel read
+    index: str  # Index channel it is stored against
+    device: str
+    kind: str  # AI, DI, DO_STATE or TELEMETRY
+    data_type: Optional[str] = None  # NumPy dtype name, None if only the server knows
+    transform: Optional[str] = None  # Key of TRANSFORMS
+
+
+@dataclass
+class ExportPlan:
+    """Every requested channel resolved to its index, device, dtype and transform"""
+
+    channels: Dict[str, PlannedChannel] = field(default_factory=dict)  # by requested
+    missing: List[str] = field(default_factory=list)  # Requested, but not wired
+
+    def groups(self) -> Dict[str, ExportGroup]:
+        """Export groups keyed by index channel, in plan order"""
+        groups: Dict[str, ExportGroup] = {}
+        for planned in self.channels.values():
+            group = groups.setdefault(planned.index, ExportGroup(planned.index))
+            transform = TRANSFORMS[planned.transform] if planned.transform else None
+            group.add(planned.channel, transform)
+        return groups
+
+    def annotations(self) -> Dict[str, Dict[str, str]]:
+        """Per-channel details for the export manifest, keyed by Synnax channel"""
+        return {
+            p.channel: {"requested": p.requested, "device": p.device, "kind": p.kind}
+            for p in self.channels.values()
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "channels": {name: asdict(p) for name, p in self.channels.items()},
+            "missing": self.missing,
+        }
+
+
+def build_export_plan(
+    requested: Iterable[str],
+    wiring: Dict[str, DeviceWiring],
+    avionics: Iterable[str] = (),
+) -> ExportPlan:
+    """
+    Resolve requested channel names against device wiring and avionics names.
+
+    AI channels share their device's `{device}_BCLS_ai_time` index, DI channels
+    each have `BCLS_di_time_{name}`, DO valves export their `{name}_state`
+    against `{device}_state_time`, inverted so 1 means energized, and avionics
+    channels use `{name}_time`. A channel wired on several devices is taken
+    from the first.
+
+    Args:
+        requested: Channel names, as listed in export.yaml
+        wiring: Parsed wiring keyed by device name
+        avionics: Avionics telemetry channel names
+
+    Returns:
+        ExportPlan in the order of `requested`
+    """
+    requested = list(dict.fromkeys(requested))
+    wanted = set(requested)
+    found: Dict[str, PlannedChannel] = {}
+
+    def plan(planned: PlannedChannel) -> None:
+        existing = found.get(planned.requested)
+        if existing is not None:
+            if existing.device != planned.device:
+                logger.warning(
+                    f"{planned.requested} is wired on {existing.device} and "
+                    f"{planned.device}; exporting it from {existing.device}"
+                )
+            return
+        found[planned.requested] = planned
+
+    for device, tables in wiring.items():
+        for name in wanted.intersection(tables.analog_inputs["name"]):
+            plan(PlannedChannel(name, name, f"{device}_BCLS_ai_time", device, AI, "float32"))
+        for name in wanted.intersection(tables.digital_inputs["name"]):
+            plan(PlannedChannel(name, name, f"BCLS_di_time_{name}", device, DI, "uint8"))
+        for name in wanted.intersection(tables.digital_outputs["name"]):
+            plan(
+                PlannedChannel(
+                    name,
+                    f"{name}_state",
+                    f"{device}_state_time",
+                    device,
+                    DO_STATE,
+                    "uint8",
+                    "invert_state",
+                )
+            )
+
+    for name in wanted.intersection(avionics):
+        plan(PlannedChannel(name, name, f"{name}_time", AVIONICS, TELEMETRY))
+
+    return ExportPlan(
+        channels={name: found[name] for name in requested if name in found},
+        missing=[name for name in requested if name not in found],
+    )
+
+
+def plan_export(
+    device_paths: Dict[str, DeviceWiringPaths],
+    requested: Iterable[str],
+    avionics_workbook: Optional[str] = AVIONICS_WORKBOOK,
+) -> ExportPlan:
+    """
+    Build an export plan from wiring workbooks.
+
+    Every sheet is read once, through the workbook cache.
+
+    Args:
+        device_paths: Wiring files keyed by device name
+        requested: Channel names, as listed in export.yaml
+        avionics_workbook: Avionics channel list, or None to skip avionics
+
+    Returns:
+        ExportPlan for the requested channels
+    """
+    wiring = {
+        device: load_device_wiring(paths.data_wiring, paths.control_wiring)
+        for device, paths in device_paths.items()
+    }
+    avionics: Iterable[str] = ()
+    if avionics_workbook is not None:
+        avionics = read_sheet(avionics_workbook, AVIONICS_SHEET)["Name"].dropna()
+    return build_export_plan(requested, wiring, avionics)
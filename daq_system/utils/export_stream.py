@@ -0,0 +1,549 @@
+"""
+Streaming range export.
+
+Channels are exported in groups that share a time index. Each group is read
+through a Synnax iterator one chunk at a time, and every chunk is appended to
+the group's file(s) as soon as it arrives. Only one chunk is ever held in
+memory, so the size of the range does not matter.
+
+Groups are independent, so export_groups reads several of them at once on a
+bounded worker pool and retries a group from scratch if its read fails.
+
+The file formats are in export_formats: Parquet by default, with Arrow IPC and
+CSV available and any combination written in the same pass.
+
+With a shard span, every group is exported span by span into shard files and
+the progress is journaled (export_journal), so a rerun after a crash picks up
+at the first unfinished shard. The shards of a group are consolidated into its
+final files once all of them are done.
+
+A Decimation (export_options) thins the samples as they stream, or has the
+server do it for every-Nth decimation.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import time
+
+import numpy as np
+import synnax as sy
+
+from daq_system.utils.export_formats import (
+    WRITERS,
+    GroupWriter,
+    has_pyarrow,
+    read_group_file,
+    require_pyarrow,
+    write_manifest,
+)
+from daq_system.utils.export_journal import ExportJournal
+from daq_system.utils.export_options import EVERY_NTH, Decimation, Decimator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100_000  # samples per channel per iterator chunk
+DEFAULT_FORMATS = ("parquet",)
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 1.0  # seconds, doubled after each failed attempt
+
+Transform = Callable[[np.ndarray], np.ndarray]
+
+
+def invert_state(values: np.ndarray) -> np.ndarray:
+    """DO states are reported active-low; flip them so 1 means energized"""
+    return 1 - values
+
+
+# Transforms by the name used in export plans and manifests
+TRANSFORMS: Dict[str, Transform] = {"invert_state": invert_state}
+
+
+@dataclass
+class ExportGroup:
+    """Data channels that share one index channel"""
+
+    index: str
+    channels: List[str] = field(default_factory=list)
+    transforms: Dict[str, Transform] = field(default_factory=dict)  # channel -> fn
+
+    def add(self, channel: str, transform: Optional[Transform] = None) -> None:
+        if channel not in self.channels:
+            self.channels.append(channel)
+        if transform is not None:
+            self.transforms[channel] = transform
+
+
+def _values(frame: sy.Frame, key: int) -> Optional[np.ndarray]:
+    if key not in frame.channels:
+        return None
+    return np.asarray(frame[key])
+
+
+def _chunk_columns(
+    frame: sy.Frame, group: ExportGroup, keys: Dict[str, int]
+) -> Optional[Dict[str, np.ndarray]]:
+    """One iterator chunk of a group as columns: index first, then data channels"""
+    stamps = _values(frame, keys[group.index])
+    if stamps is None or len(stamps) == 0:
+        return None
+
+    columns = {group.index: stamps.astype(np.int64)}
+    for name in group.channels:
+        values = _values(frame, keys[name])
+        if values is None or len(values) == 0:
+            values = np.full(len(stamps), np.nan)
+        elif len(values) != len(stamps):
+            logger.warning(
+                f"{name}: {len(values)} samples for {len(stamps)} timestamps of "
+                f"{group.index} in one chunk; padding/truncating to match"
+            )
+            padded = np.full(len(stamps), np.nan)
+            n = min(len(values), len(stamps))
+            padded[:n] = values[:n]
+            values = padded
+        transform = group.transforms.get(name)
+        columns[name] = transform(values) if transform is not None else values
+    return columns
+
+
+def export_group(
+    client: sy.Synnax,
+    time_range: sy.TimeRange,
+    group: ExportGroup,
+    keys: Dict[str, int],
+    writers: List[GroupWriter],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    decimator: Optional[Decimator] = None,
+    downsample_factor: int = 1,
+) -> int:
+    """
+    Stream one index group into one or more group writers.
+
+    Every chunk read from the iterator goes to all writers, so writing several
+    formats costs a single read of the range. If anything fails, the partial
+    files are discarded.
+
+    Args:
+        decimator: Thins each chunk before it is written
+        downsample_factor: Keep every Nth sample, dropped by the server
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    iterator = client.open_iterator(
+        time_range,
+        [keys[group.index]] + [keys[n] for n in group.channels],
+        chunk_size,
+        **({"downsample_factor": downsample_factor} if downsample_factor > 1 else {}),
+    )
+
+    def write(chunk: Optional[Dict[str, np.ndarray]]) -> int:
+        if chunk is None or len(chunk[group.index]) == 0:
+            return 0
+        for writer in writers:
+            writer.write(chunk)
+        return len(chunk[group.index])
+
+    try:
+        for frame in iterator:
+            chunk = _chunk_columns(frame, group, keys)
+            if chunk is not None and decimator is not None:
+                chunk = decimator.process(chunk)
+            rows += write(chunk)
+        if decimator is not None:
+            rows += write(decimator.flush())
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    finally:
+        iterator.close()
+
+    for writer in writers:
+        writer.close()
+    return rows
+
+
+def _export_with_retry(
+    client: sy.Synnax,
+    time_range: sy.TimeRange,
+    group: ExportGroup,
+    keys: Dict[str, int],
+    make_writers: Callable[[], List[GroupWriter]],
+    chunk_size: int,
+    retries: int,
+    retry_delay: float,
+    decimation: Optional[Decimation] = None,
+    origin: int = 0,
+    phase: int = 0,
+) -> Tuple[int, List[Path], int]:
+    """
+    Export one group, starting over with fresh writers after a failure.
+
+    Args:
+        phase: every_nth decimation phase to start from
+
+    Returns:
+        Rows written, the paths of the written files and the every_nth phase
+        at the end of the data
+    """
+    retries = max(1, retries)  # Always at least one attempt
+    for attempt in range(retries):
+        writers = make_writers()
+        decimator = None
+        downsample_factor = 1
+        if decimation is not None:
+            decimator = decimation.decimator(group.index, group.channels, origin, phase)
+            downsample_factor = decimation.downsample_factor
+        try:
+            rows = export_group(
+                client,
+                time_range,
+                group,
+                keys,
+                writers,
+                chunk_size,
+                decimator,
+                downsample_factor,
+            )
+            return rows, [w.path for w in writers], decimator.phase if decimator else 0
+        except Exception as e:
+            if attempt == retries - 1:
+                raise
+            delay = retry_delay * 2**attempt
+            logger.warning(
+                f"{group.index}: export attempt {attempt + 1} failed ({e}), "
+                f"retrying in {delay:g} seconds..."
+            )
+            time.sleep(delay)
+
+
+def _export_sharded(
+    client: sy.Synnax,
+    time_range: sy.TimeRange,
+    group: ExportGroup,
+    keys: Dict[str, int],
+    make_writers: Callable[[], List[GroupWriter]],
+    paths: List[Path],
+    columns: List[str],
+    dtypes: Dict[str, np.dtype],
+    journal: ExportJournal,
+    shard_ns: int,
+    chunk_size: int,
+    retries: int,
+    retry_delay: float,
+    decimation: Optional[Decimation] = None,
+) -> int:
+    """
+    Export one group span by span into shard files, skipping the shards the
+    journal has, then consolidate the shards into the group's final files.
+
+    Args:
+        paths: The group's final files, which must exist for the journal's
+            record of a consolidated group to be trusted
+
+    Returns:
+        Number of rows written
+    """
+    rows = journal.group_rows(group.index, paths)
+    if rows is not None:
+        return rows
+
+    shard_type = WRITERS["parquet"] if has_pyarrow() else WRITERS["csv"]
+    shard_dir = journal.shard_dir / group.index
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    start, end = int(time_range.start), int(time_range.end)
+
+    shard_files: List[Path] = []
+    phase = 0  # every_nth: carried from shard to shard like from chunk to chunk
+    for shard in range(start, end, shard_ns):
+        path = shard_dir / f"{shard}{shard_type.suffix}"
+        rows = journal.shard_rows(group.index, shard)
+        if rows and not path.exists():
+            logger.warning(f"{group.index}: shard {path.name} is missing, exporting it again")
+            rows = None
+        if rows is not None:
+            phase = journal.shard_phase(group.index, shard)
+        else:
+            span = sy.TimeRange(sy.TimeStamp(shard), sy.TimeStamp(min(shard + shard_ns, end)))
+            rows, _, phase = _export_with_retry(
+                client,
+                span,
+                group,
+                keys,
+                lambda: [shard_type(path, columns, dtypes)],
+                chunk_size,
+                retries,
+                retry_delay,
+                decimation,
+                start,
+                phase,
+            )
+            journal.record_shard(group.index, shard, rows, phase)
+        if rows:
+            shard_files.append(path)
+
+    writers = make_writers()
+    rows = 0
+    try:
+        for path in shard_files:
+            for table in read_group_file(path, chunk_size):
+                chunk = {name: table[name].to_numpy() for name in columns}
+                for writer in writers:
+                    writer.write(chunk)
+                rows += len(table)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.close()
+    journal.record_group(group.index, rows)
+    return rows
+
+
+def export_groups(
+    client: sy.Synnax,
+    time_range: sy.TimeRange,
+    groups: Dict[str, ExportGroup],
+    out_dir: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    formats: Iterable[str] = DEFAULT_FORMATS,
+    metadata: Optional[Dict[str, str]] = None,
+    workers: int = DEFAULT_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    retry_delay: float = DEFAULT_RETRY_DELAY,
+    annotations: Optional[Dict[str, Dict[str, str]]] = None,
+    shard_span: Optional[float] = None,
+    decimation: Optional[Decimation] = None,
+) -> Dict[str, List[Path]]:
+    """
+    Stream every group to `<out_dir>/<index>.<format>`.
+
+    All channel names are resolved in a single request. Channels that do not
+    exist on the server are skipped with a warning, as are groups whose index
+    is missing. Columns keep the channels' data types in Parquet and Arrow
+    files, whose schema also carries `metadata`.
+
+    `<out_dir>/manifest.json` maps every exported channel to its index and
+    files, so readers join on real timestamps instead of parsing column names.
+
+    Each group is one iterator over all of its channels, and up to `workers`
+    groups are read at the same time, so export time follows bandwidth rather
+    than the round trip of every channel.
+
+    Args:
+        client: Synnax client
+        time_range: Time range to export
+        groups: Groups keyed by index channel name
+        out_dir: Directory for the group files
+        chunk_size: Samples per channel read per iterator chunk
+        formats: Any of "parquet", "arrow" and "csv"
+        metadata: String key/value pairs stored with every file, e.g. the range
+        workers: Groups read concurrently
+        retries: Attempts per group before the export fails (at least 1)
+        retry_delay: Seconds before the first retry, doubled after each one
+        annotations: Extra manifest fields per channel, e.g. from ExportPlan
+        shard_span: Seconds of range per shard for a resumable export. None or
+            0 streams each group straight to its files.
+        decimation: Thin the samples; buckets are aligned to the range start
+
+    Returns:
+        Written file paths keyed by index channel name
+
+    Raises:
+        Exception: The last error of a group that failed every attempt, after
+            the other groups have finished
+    """
+    formats = list(formats)
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown or not formats:
+        raise ValueError(
+            f"Unknown export format(s) {unknown}; choose from {', '.join(WRITERS)}"
+        )
+    if {"parquet", "arrow"} & set(formats):
+        require_pyarrow()
+
+    names = sorted({n for g in groups.values() for n in [g.index, *g.channels]})
+    found = {ch.name: ch for ch in client.channels.retrieve(names)} if names else {}
+    keys = {name: ch.key for name, ch in found.items()}
+    missing = [n for n in names if n not in keys]
+    if missing:
+        logger.warning(f"Channels not found, skipping: {', '.join(missing)}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs: Dict[str, ExportGroup] = {}
+    for index, group in groups.items():
+        if index not in keys:
+            continue
+        present = ExportGroup(
+            index,
+            [n for n in group.channels if n in keys],
+            {n: fn for n, fn in group.transforms.items() if n in keys},
+        )
+        if present.channels:
+            jobs[index] = present
+
+    origin = int(time_range.start)
+    journal = None
+    if shard_span:
+        shard_ns = int(shard_span * 1e9)
+        if decimation is not None and decimation.method != EVERY_NTH:
+            # Whole buckets per shard, so no bucket is split between two shards
+            shard_ns = max(1, shard_ns // decimation.bucket_ns) * decimation.bucket_ns
+        elif decimation is not None and decimation.server:
+            logger.warning(
+                "The server restarts every_nth in each shard, so the samples kept "
+                "differ from an unsharded export; set server: false to keep them exact"
+            )
+        journal = ExportJournal(
+            out_dir,
+            {
+                "start": origin,
+                "end": int(time_range.end),
+                "shard_ns": shard_ns,
+                "formats": list(formats),
+                "groups": {index: group.channels for index, group in jobs.items()},
+                "decimation": asdict(decimation) if decimation is not None else None,
+            },
+        )
+
+    layouts: Dict[str, Tuple[List[str], Dict[str, np.dtype]]] = {}
+
+    def run(group: ExportGroup) -> Tuple[int, List[Path]]:
+        dtypes = {n: np.dtype(sy.DataType(found[n].data_type).np) for n in group.channels}
+        dtypes = {group.index: np.dtype(np.int64), **dtypes}  # index: ns since the epoch
+        if decimation is not None:
+            dtypes = decimation.dtypes(group.index, dtypes)
+        columns = list(dtypes)
+        layouts[group.index] = (columns, dtypes)
+        paths = [out_dir / f"{group.index}{WRITERS[fmt].suffix}" for fmt in formats]
+
+        def make_writers() -> List[GroupWriter]:
+            return [
+                WRITERS[fmt](path, columns, dtypes, metadata)
+                for fmt, path in zip(formats, paths)
+            ]
+
+        if journal is None:
+            rows, paths, _ = _export_with_retry(
+                client,
+                time_range,
+                group,
+                keys,
+                make_writers,
+                chunk_size,
+                retries,
+                retry_delay,
+                decimation,
+                origin,
+            )
+            return rows, paths
+        rows = _export_sharded(
+            client,
+            time_range,
+            group,
+            keys,
+            make_writers,
+            paths,
+            columns,
+            dtypes,
+            journal,
+            shard_ns,
+            chunk_size,
+            retries,
+            retry_delay,
+            decimation,
+        )
+        return rows, paths
+
+    written: Dict[str, List[Path]] = {}
+    rows_written: Dict[str, int] = {}
+    errors: Dict[str, Exception] = {}
+    if not jobs:
+        return written
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(workers, len(jobs))), thread_name_prefix="export"
+    ) as executor:
+        futures = {index: executor.submit(run, group) for index, group in jobs.items()}
+        for index, future in futures.items():
+            try:
+                rows, paths = future.result()
+            except Exception as e:
+                logger.error(f"{index}: export failed: {e}")
+                errors[index] = e
+                continue
+            if rows:
+                written[index] = paths
+                rows_written[index] = rows
+                logger.info(
+                    f"{index}: {rows} rows x {len(jobs[index].channels)} channels -> "
+                    f"{', '.join(str(p) for p in paths)}"
+                )
+            else:
+                logger.warning(f"{index}: no data in range")
+
+    manifest = _manifest(
+        jobs, layouts, written, rows_written, formats, metadata, annotations, decimation
+    )
+    write_manifest(out_dir, manifest)
+    if errors:
+        raise next(iter(errors.values()))
+    if journal is not None:
+        journal.finish()
+    return written
+
+
+def _manifest(
+    groups: Dict[str, ExportGroup],
+    layouts: Dict[str, Tuple[List[str], Dict[str, np.dtype]]],
+    written: Dict[str, List[Path]],
+    rows: Dict[str, int],
+    formats: List[str],
+    metadata: Optional[Dict[str, str]],
+    annotations: Optional[Dict[str, Dict[str, str]]] = None,
+    decimation: Optional[Decimation] = None,
+) -> Dict:
+    """Manifest of the written groups (see export_formats)"""
+    indexes = {}
+    channels = {}
+    for index, paths in written.items():
+        group = groups[index]
+        columns, dtypes = layouts[index]
+        indexes[index] = {
+            "channels": columns[1:],
+            "rows": rows[index],
+            "files": {fmt: path.name for fmt, path in zip(formats, paths)},
+        }
+        outputs = (
+            decimation.columns(group.channels)
+            if decimation is not None
+            else [(name, name, None) for name in group.channels]
+        )
+        for column, name, aggregate in outputs:
+            entry = {
+                "index": index,
+                "data_type": dtypes[column].name,
+                **(annotations or {}).get(name, {}),
+            }
+            if column != name:
+                entry["source"] = name
+            if aggregate is not None:
+                entry["aggregate"] = aggregate
+            transform = group.transforms.get(name)
+            if transform is not None:
+                entry["transform"] = getattr(transform, "__name__", repr(transform))
+            channels[column] = entry
+    return {
+        "metadata": metadata or {},
+        "formats": formats,
+        "decimation": asdict(decimation) if decimation is not None else None,
+        "indexes": indexes,
+        "channels": channels,
+    }
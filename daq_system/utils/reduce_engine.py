@@ -0,0 +1,296 @@
+"""
+Out-of-core reduction of exported range data to time-bucketed means.
+
+Group files are scanned lazily, one batch at a time. The scan reads only the
+columns being reduced (column pushdown) and only the rows in the requested time
+span (predicate pushdown):
+
+    .parquet, .arrow  pyarrow.dataset with a filter on the index column, so
+                      Parquet row groups whose statistics fall outside the
+                      span are never decoded
+    .dqa              the archive block index
+    .csv              usecols, with the span applied to each chunk
+
+Each batch is reduced to partial aggregates at once: a sum and a count per
+channel per bucket. Partials are merged by adding sums and counts, so a bucket
+that is split across batches or files gets the same mean as if it had been read
+whole. Only the partials are kept, compacted as they grow. Memory therefore
+scales with the reduced output, not with the size of the export.
+
+Usage:
+    means = TimeBucketMeans("10ms")
+    for index, stamps, values in scan_groups(path, {"Dev5_BCLS_ai_time": ["PT_OX_02"]}):
+        means.add(index, stamps, values)
+    df = means.result()
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from daq_system.utils.archive import ArchiveReader
+from daq_system.utils.export_formats import ArchiveGroupWriter, require_pyarrow
+
+DEFAULT_BATCH_SIZE = 1_000_000
+DEFAULT_COMPACT_ROWS = 1_000_000  # Partial buckets held per group before merging them
+
+Time = Union[int, str, pd.Timestamp, None]
+Batch = Tuple[str, np.ndarray, Dict[str, np.ndarray]]
+
+
+def _ns(value: Time) -> Optional[int]:
+    """A time bound in ns, from ns or anything pd.Timestamp parses"""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert("UTC").tz_localize(None)
+    return stamp.value
+
+
+def _stamps(column: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Timestamps of an index column in ns, and a mask of the valid ones"""
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return column.to_numpy(np.int64), np.ones(len(column), dtype=bool)
+    if pd.api.types.is_float_dtype(column.dtype):
+        # Integer ns read back with gaps, e.g. a CSV with several groups
+        values = column.to_numpy(np.float64)
+        valid = ~np.isnan(values)
+        return np.where(valid, values, 0).astype(np.int64), valid
+    times = pd.to_datetime(column, errors="coerce")
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+    valid = times.notna().to_numpy()
+    return times.to_numpy("datetime64[ns]").view(np.int64), valid
+
+
+def _time_filter(schema, groups: Dict[str, List[str]], start, end, shifts):
+    """Row filter on the raw index columns, or None if the file cannot be filtered"""
+    if start is None and end is None:
+        return None
+    pa = require_pyarrow()
+    import pyarrow.dataset as ds
+
+    expression = None
+    for index in groups:
+        if index not in schema.names or not pa.types.is_integer(schema.field(index).type):
+            return None
+        shift = shifts.get(index, 0)
+        terms = []
+        if start is not None:
+            terms.append(ds.field(index) >= start + shift)
+        if end is not None:
+            terms.append(ds.field(index) < end + shift)
+        term = terms[0] if len(terms) == 1 else terms[0] & terms[1]
+        # A row is needed if any of its groups is in the span
+        expression = term if expression is None else expression | term
+    return expression
+
+
+def _read(
+    path: Path,
+    groups: Dict[str, List[str]],
+    start: Optional[int],
+    end: Optional[int],
+    shifts: Dict[str, int],
+    batch_size: int,
+) -> Iterator[pd.DataFrame]:
+    """Batches of the needed columns of a group file, pruned to the span where the format allows"""
+    columns = list(dict.fromkeys(c for index, channels in groups.items() for c in [index, *channels]))
+    if path.suffix == ".csv":
+        with pd.read_csv(path, usecols=columns, chunksize=batch_size, low_memory=False) as reader:
+            yield from reader
+        return
+    if path.suffix == ArchiveGroupWriter.suffix:
+        reader = ArchiveReader(path)
+        shift = shifts.get(reader.index, 0)
+        for block in reader.iter_blocks(
+            [c for c in columns if c != reader.index],
+            None if start is None else start + shift,
+            None if end is None else end + shift,
+        ):
+            yield pd.DataFrame(block)
+        return
+    require_pyarrow()
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet" if path.suffix == ".parquet" else "ipc")
+    for batch in dataset.to_batches(
+        columns=columns,
+        filter=_time_filter(dataset.schema, groups, start, end, shifts),
+        batch_size=batch_size,
+    ):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def scan_groups(
+    path: Union[str, Path],
+    groups: Dict[str, List[str]],
+    start: Time = None,
+    end: Time = None,
+    shifts: Optional[Dict[str, int]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Batch]:
+    """
+    Stream the samples of each index group in a file that fall in [start, end).
+
+    Args:
+        path: Group file (.parquet, .arrow, .dqa or .csv)
+        groups: Channels to read, keyed by their index column
+        start: Inclusive start (ns or a time string); None: from the first sample
+        end: Exclusive end; None: to the last sample
+        shifts: ns subtracted from an index's timestamps before the span is
+            applied, e.g. to correct a sensor's clock offset
+        batch_size: Rows read at a time
+
+    Yields:
+        (index, timestamps in ns, float64 values keyed by channel)
+    """
+    path = Path(path)
+    start, end = _ns(start), _ns(end)
+    shifts = shifts or {}
+    for frame in _read(path, groups, start, end, shifts, batch_size):
+        for index, channels in groups.items():
+            stamps, valid = _stamps(frame[index])
+            stamps = stamps - shifts.get(index, 0)
+            if start is not None:
+                valid &= stamps >= start
+            if end is not None:
+                valid &= stamps < end
+            if not valid.any():
+                continue
+            values = {
+                name: pd.to_numeric(frame[name], errors="coerce").to_numpy(np.float64)[valid]
+                for name in channels
+            }
+            yield index, stamps[valid], values
+
+
+def _sum_by(inverse: np.ndarray, n: int, matrix: np.ndarray) -> np.ndarray:
+    """Sum the rows of `matrix` into `n` rows by the bucket numbers in `inverse`"""
+    out = np.empty((n, matrix.shape[1]))
+    for j in range(matrix.shape[1]):
+        out[:, j] = np.bincount(inverse, weights=matrix[:, j], minlength=n)
+    return out
+
+
+class _Partials:
+    """Per-bucket sums and counts of one group, as unmerged parts"""
+
+    def __init__(self, channels: List[str], compact_rows: int):
+        self.channels = list(channels)
+        self.parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []  # (buckets, sums, counts)
+        self.rows = 0
+        self.limit = compact_rows
+
+    def add(self, buckets: np.ndarray, sums: np.ndarray, counts: np.ndarray) -> None:
+        self.parts.append((buckets, sums, counts))
+        self.rows += len(buckets)
+        if self.rows > self.limit:
+            self.compact()
+            # Grow the limit with the output so compaction stays amortized O(n log n)
+            self.limit = max(self.limit, 2 * self.rows)
+
+    def compact(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Merge all parts into one, with every bucket once and in order"""
+        if not self.parts:
+            n = len(self.channels)
+            return np.empty(0, dtype=np.int64), np.empty((0, n)), np.empty((0, n))
+        if len(self.parts) > 1:
+            buckets = np.concatenate([p[0] for p in self.parts])
+            merged, inverse = np.unique(buckets, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            self.parts = [
+                (
+                    merged,
+                    _sum_by(inverse, len(merged), np.concatenate([p[1] for p in self.parts])),
+                    _sum_by(inverse, len(merged), np.concatenate([p[2] for p in self.parts])),
+                )
+            ]
+        self.rows = len(self.parts[0][0])
+        return self.parts[0]
+
+
+class TimeBucketMeans:
+    """Mean of every channel per time bucket, accumulated batch by batch"""
+
+    def __init__(self, bucket: Union[str, pd.Timedelta], compact_rows: int = DEFAULT_COMPACT_ROWS):
+        """
+        Args:
+            bucket: Bucket length, e.g. "10ms". Buckets are aligned to the Unix
+                epoch and stamped with their start time, like pandas resample.
+            compact_rows: Partial buckets held per group before they are merged
+        """
+        self.bucket_ns = pd.Timedelta(bucket).value
+        if self.bucket_ns <= 0:
+            raise ValueError(f"Bucket must be positive, got {bucket}")
+        self.compact_rows = compact_rows
+        self.samples = 0
+        self._groups: Dict[str, _Partials] = {}
+
+    def add(self, index: str, stamps: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """Fold one batch of a group into the running sums and counts"""
+        if len(stamps) == 0:
+            return
+        partials = self._groups.get(index)
+        if partials is None:
+            partials = self._groups[index] = _Partials(list(values), self.compact_rows)
+        elif list(values) != partials.channels:
+            raise ValueError(f"{index} was scanned with different channels")
+
+        buckets = np.asarray(stamps, dtype=np.int64) // self.bucket_ns
+        matrix = np.empty((len(buckets), len(partials.channels)))
+        for j, name in enumerate(partials.channels):
+            matrix[:, j] = values[name]
+        valid = ~np.isnan(matrix)
+        filled = np.where(valid, matrix, 0.0)
+
+        steps = np.diff(buckets)
+        if (steps >= 0).all():
+            # Sorted, as exported: one pass over runs of equal buckets
+            starts = np.flatnonzero(np.r_[True, steps != 0])
+            keys = buckets[starts]
+            sums = np.add.reduceat(filled, starts, axis=0)
+            counts = np.add.reduceat(valid.astype(np.float64), starts, axis=0)
+        else:
+            keys, inverse = np.unique(buckets, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            sums = _sum_by(inverse, len(keys), filled)
+            counts = _sum_by(inverse, len(keys), valid.astype(np.float64))
+        partials.add(keys, sums, counts)
+        self.samples += len(buckets)
+
+    def result(self) -> pd.DataFrame:
+        """
+        Means of all groups joined on their buckets.
+
+        Returns:
+            DataFrame indexed by bucket start time, one column per channel.
+            Like pandas resample, every group has a row for each bucket from
+            its first to its last, with NaN where it has no samples.
+        """
+        frames = []
+        for partials in self._groups.values():
+            buckets, sums, counts = partials.compact()
+            if len(buckets) == 0:
+                continue
+            dense = np.full((buckets[-1] - buckets[0] + 1, len(partials.channels)), np.nan)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                dense[buckets - buckets[0]] = sums / counts
+            frames.append(
+                pd.DataFrame(
+                    dense,
+                    index=pd.to_datetime(np.arange(buckets[0], buckets[-1] + 1) * self.bucket_ns),
+                    columns=partials.channels,
+                )
+            )
+        if not frames:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name="timestamp"))
+        out = pd.concat(frames, axis=1, sort=True)
+        out.index.name = "timestamp"
+        return out
@@ -3,6 +3,8 @@ from collections import defaultdict
 import numpy as np, pandas as pd, plotly.graph_objects as go, plotly.io as pio
 import random
 from pathlib import Path
+from daq_system.utils.archive import ArchiveReader
+from daq_system.utils.export_formats import load_manifest, manifest_files
 
 THEME = "plotly_white"
 
@@ -554,6 +556,47 @@ def ConvertCSVToParquet(input_csv: str) -> str:
     return parquet_path
 
 
+def ConvertExportToParquet(export_dir: str) -> str:
+    """Join the per-index files of an export directory on their timestamps, using its manifest"""
+    manifest = load_manifest(export_dir)
+    if manifest is None:
+        raise ValueError(f"{export_dir} has no export manifest")
+
+    all_frames = []
+    for time_column, path in manifest_files(manifest, export_dir).items():
+        data_columns = manifest["indexes"][time_column]["channels"]
+        if path.suffix == ".csv":
+            subset = pd.read_csv(path, usecols=[time_column] + data_columns)
+        elif path.suffix == ".arrow":
+            subset = pd.read_feather(path, columns=[time_column] + data_columns)
+        elif path.suffix == ".dqa":
+            subset = pd.DataFrame(ArchiveReader(path).read(data_columns))
+        else:
+            subset = pd.read_parquet(path, columns=[time_column] + data_columns)
+
+        subset[time_column] = pd.to_datetime(subset[time_column], utc=True)
+        subset = subset.set_index(time_column)
+        if subset.index.duplicated().any():
+            subset = subset.groupby(level=0).mean()
+        all_frames.append(subset)
+        print(f"  Processed {time_column}: {len(subset)} rows, {len(subset.columns)} sensors")
+
+    if not all_frames:
+        raise ValueError("No data found in the export")
+
+    print("Combining data frames...")
+    combined = pd.concat(all_frames, axis=1, join="outer").sort_index()
+    combined = combined.rename_axis("timestamp").reset_index()
+
+    parquet_path = f"{os.path.normpath(export_dir)}.parquet"
+    print(f"Saving to {parquet_path}...")
+    combined.to_parquet(parquet_path, index=False, engine="pyarrow")
+    print(
+        f"✓ Conversion complete: {len(combined)} rows, {len(combined.columns)} columns"
+    )
+    return parquet_path
+
+
 def _thin(x, y, maxn):
     if maxn is None:
         raise ValueError
@@ -1223,12 +1266,14 @@ def main():
     path_to_input_file = args.input_path
     input_file_name = os.path.splitext(os.path.basename(path_to_input_file))[0]
 
-    if path_to_input_file.lower().endswith(".csv"):
+    if os.path.isdir(path_to_input_file):
+        parquet_path = ConvertExportToParquet(path_to_input_file)
+    elif path_to_input_file.lower().endswith(".csv"):
         parquet_path = ConvertCSVToParquet(path_to_input_file)
     elif path_to_input_file.lower().endswith((".parquet", ".pq")):
         parquet_path = path_to_input_file
     else:
-        raise SystemExit("input must be .csv or .parquet")
+        raise SystemExit("input must be an export directory, .csv or .parquet")
 
     range_name = "12-17-Hotfire"
     html_output_path = rf"daq_system/utils//{range_name}/datadump_{range_name}.html"
@@ -0,0 +1,39 @@
+"""
+Client construction for the configured Synnax backend.
+"""
+
+import synnax as sy
+
+from daq_system.config.settings import DAQConfig
+from daq_system.utils.exceptions import ConfigurationError
+
+BACKENDS = ("synnax", "simulated")
+
+
+def connect(config: DAQConfig) -> sy.Synnax:
+    """
+    Create a client for config.backend.
+
+    Args:
+        config: System configuration
+
+    Returns:
+        A synnax.Synnax client, or a SimulatedSynnax for the "simulated" backend
+
+    Raises:
+        ConfigurationError: If the backend is not one of BACKENDS
+    """
+    if config.backend == "simulated":
+        from daq_system.simulation import SimulatedSynnax
+
+        return SimulatedSynnax(config.simulation)
+    if config.backend != "synnax":
+        raise ConfigurationError(
+            f"Unknown backend '{config.backend}', expected one of {BACKENDS}"
+        )
+    return sy.Synnax(
+        host=config.host,
+        port=config.port,
+        username=config.username,
+        password=config.password,
+    )
@@ -0,0 +1,153 @@
+"""
+Compiled cache for the Excel wiring and channel workbooks.
+
+Opening a workbook through openpyxl takes seconds. The first read of a workbook
+parses every sheet once and stores them in a pickle next to it, under
+.wiring_cache/. Later reads load the pickle instead, and the workbook is only
+parsed again when its contents change (checked by mtime/size, then SHA-256).
+"""
+
+from pathlib import Path
+from typing import Dict, Union
+import hashlib
+import logging
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = ".wiring_cache"
+CACHE_VERSION = 1
+
+_lock = threading.Lock()  # Guards _memory and _workbook_locks
+_memory: Dict[Path, dict] = {}  # Caches already loaded by this process
+_workbook_locks: Dict[Path, threading.Lock] = {}
+
+
+def _workbook_lock(key: Path) -> threading.Lock:
+    """Lock of one workbook, so different workbooks are compiled concurrently"""
+    with _lock:
+        return _workbook_locks.setdefault(key, threading.Lock())
+
+
+def _remember(key: Path, cached: dict) -> Dict[str, pd.DataFrame]:
+    """Keep a loaded cache for this process and return its sheets"""
+    with _lock:
+        _memory[key] = cached
+    return cached["sheets"]
+
+
+def _cache_path(workbook: Path) -> Path:
+    return workbook.parent / CACHE_DIR_NAME / f"{workbook.name}.pkl"
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: Path) -> Union[dict, None]:
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable workbook cache {cache_path}: {e}")
+        return None
+
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return None
+    return cached
+
+
+def _write_cache(cache_path: Path, cached: dict) -> None:
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # A read-only checkout still works, it just doesn't get faster
+        logger.warning(f"Could not write workbook cache {cache_path}: {e}")
+
+
+def load_workbook(path: Union[str, os.PathLike]) -> Dict[str, pd.DataFrame]:
+    """
+    Return every sheet of a workbook, using the compiled cache when it is current.
+
+    Args:
+        path: Path to the .xlsx workbook
+
+    Returns:
+        Dictionary mapping sheet name to its DataFrame. The frames are shared
+        with the cache; use read_sheet for a copy that is safe to modify.
+    """
+    workbook = Path(path)
+    cache_path = _cache_path(workbook)
+    key = workbook.resolve()
+
+    # Only this workbook is locked, so one slow compile does not hold up the
+    # other devices; threads wanting the same workbook wait and reuse it
+    with _workbook_lock(key):
+        stat = workbook.stat()
+
+        with _lock:
+            cached = _memory.get(key)
+        if cached is None:
+            cached = _read_cache(cache_path)
+
+        if cached is not None:
+            # Fast path: the file has not been touched since the cache was built
+            current = (stat.st_mtime_ns, stat.st_size)
+            if (cached["mtime_ns"], cached["size"]) == current:
+                return _remember(key, cached)
+
+            # Touched but possibly unchanged (e.g. a fresh git checkout)
+            digest = _file_hash(workbook)
+            if cached["sha256"] == digest:
+                cached.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                _write_cache(cache_path, cached)
+                return _remember(key, cached)
+        else:
+            digest = _file_hash(workbook)
+
+        logger.info(f"Compiling workbook cache for {workbook.name}")
+        cached = {
+            "version": CACHE_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "sheets": pd.read_excel(workbook, sheet_name=None),
+        }
+        _write_cache(cache_path, cached)
+        return _remember(key, cached)
+
+
+def read_sheet(
+    source: Union[str, os.PathLike, pd.ExcelFile], sheet_name: str
+) -> pd.DataFrame:
+    """
+    Read one sheet of a workbook through the compiled cache.
+
+    Args:
+        source: Path to the workbook, or an already open ExcelFile
+        sheet_name: Name of the sheet to read
+
+    Returns:
+        The sheet as a DataFrame (a copy, safe to modify)
+    """
+    if isinstance(source, pd.ExcelFile):
+        return source.parse(sheet_name)
+
+    sheets = load_workbook(source)
+    if sheet_name not in sheets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found in {source}")
+    return sheets[sheet_name].copy()
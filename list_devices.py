@@ -1,17 +1,20 @@
-import synnax as sy
-import json
+from daq_system.config.settings import DAQConfig
+from daq_system.core.discovery import DeviceDiscovery, device_properties
+from daq_system.utils.synnax_client import connect
 
 
 def main():
     try:
         # Connect to Synnax
         print("Connecting to Synnax...")
-        client = sy.Synnax(
+        config = DAQConfig(
             host="128.46.118.59",
             port=9090,
             username="Bill",
             password="Bill",
         )
+        client = connect(config)
+        discovery = DeviceDiscovery(client, config)
 
         print("\nRetrieving devices...")
         print("\nListing all hardware devices:")
@@ -20,17 +23,16 @@ def main():
         # Print information about hardware devices
         print("NI Devices:")
         try:
-            # Retrieve devices by specific locations
-            device_5 = client.hardware.devices.retrieve(location="Dev5")
-            device_6 = client.hardware.devices.retrieve(location="Dev6")
+            # Retrieve every device on the rack in one query
+            devices = discovery.devices()
+            wiring = discovery.wiring_paths()
 
-            # Function to print device information
-            def print_device_info(device, device_num):
-                if not device:
-                    print(f"\nDevice {device_num} not found.")
-                    return
+            if not devices:
+                print(f"\nNo {config.device_model} devices found.")
 
-                print(f"\nDevice {device_num}:")
+            # Function to print device information
+            def print_device_info(device):
+                print(f"\nDevice {device.location}:")
                 print("-" * 50)
                 print(f"Device Name: {device.name}")
                 print(f"Location: {device.location}")
@@ -39,20 +41,26 @@ def main():
                 print(f"Key: {device.key}")
                 print(f"Rack: {device.rack}")
 
-                # Parse and print properties if they exist
-                if hasattr(device, "properties"):
-                    try:
-                        props = json.loads(device.properties)
-                        print("\nProperties:")
-                        for key, value in props.items():
-                            print(f"  {key}: {value}")
-                    except json.JSONDecodeError:
-                        print(f"Raw properties: {device.properties}")
+                # Print properties if they exist
+                props = device_properties(device)
+                if props:
+                    print("\nProperties:")
+                    for key, value in props.items():
+                        print(f"  {key}: {value}")
+                elif getattr(device, "properties", None):
+                    print(f"Raw properties: {device.properties}")
+
+                paths = wiring.get(device.location)
+                if paths is not None:
+                    print("\nWiring:")
+                    print(f"  Data: {paths.data_wiring}")
+                    print(f"  Control: {paths.control_wiring}")
+                else:
+                    print("\nWiring: none found")
                 print("-" * 50)
 
-            # Print information for both devices
-            print_device_info(device_5, "5")
-            print_device_info(device_6, "6")
+            for device in devices:
+                print_device_info(device)
 
         except Exception as e:
             print(f"Error retrieving devices: {e}")